@@ -1,19 +1,26 @@
 import os
 import pandas as pd
 
+from .read_FLiESANN_table import read_FLiESANN_table
+
 def load_ECOv002_calval_FLiESANN_inputs() -> pd.DataFrame:
     """
     Load the input data for the FLiES-ANN model from the ECOSTRESS Collection 2 Cal-Val dataset.
 
+    The typed Parquet copy of the table is read when it is available, falling back to the CSV.
+
     Returns:
         pd.DataFrame: A DataFrame containing the reference input data.
     """
 
-    # Define the path to the output CSV file relative to this module's directory
+    # Define the path to the input table relative to this module's directory
     module_dir = os.path.dirname(os.path.abspath(__file__))
-    load_file_path = os.path.join(module_dir, "ECOv002-cal-val-FLiESANN-inputs.csv")
+    load_file_path = os.path.join(module_dir, "ECOv002-cal-val-FLiESANN-inputs.parquet")
+
+    if not os.path.exists(load_file_path):
+        load_file_path = os.path.join(module_dir, "ECOv002-cal-val-FLiESANN-inputs.csv")
 
-    # Load the output data into a DataFrame
-    inputs_df = pd.read_csv(load_file_path)
+    # Load the input data into a DataFrame
+    inputs_df = read_FLiESANN_table(load_file_path)
 
-    return inputs_df
\ No newline at end of file
+    return inputs_df
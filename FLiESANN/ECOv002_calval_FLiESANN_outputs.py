@@ -1,19 +1,26 @@
 import os
 import pandas as pd
 
+from .read_FLiESANN_table import read_FLiESANN_table
+
 def load_ECOv002_calval_FLiESANN_outputs() -> pd.DataFrame:
     """
     Load the output data for the FLiESANN model from the ECOSTRESS Collection 2 Cal-Val dataset.
 
+    The typed Parquet copy of the table is read when it is available, falling back to the CSV.
+
     Returns:
         pd.DataFrame: A DataFrame containing the reference output data.
     """
 
-    # Define the path to the output CSV file relative to this module's directory
+    # Define the path to the output table relative to this module's directory
     module_dir = os.path.dirname(os.path.abspath(__file__))
-    output_file_path = os.path.join(module_dir, "ECOv002-cal-val-FLiESANN-outputs.csv")
+    output_file_path = os.path.join(module_dir, "ECOv002-cal-val-FLiESANN-outputs.parquet")
+
+    if not os.path.exists(output_file_path):
+        output_file_path = os.path.join(module_dir, "ECOv002-cal-val-FLiESANN-outputs.csv")
 
     # Load the output data into a DataFrame
-    outputs_df = pd.read_csv(output_file_path)
+    outputs_df = read_FLiESANN_table(output_file_path)
 
-    return outputs_df
\ No newline at end of file
+    return outputs_df
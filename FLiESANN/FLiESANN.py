@@ -6,11 +6,43 @@ from .determine_ctype import determine_ctype
 from .prepare_FLiESANN_inputs import prepare_FLiESANN_inputs
 from .run_FLiESANN_inference import run_FLiESANN_inference
 from .process_FLiESANN import FLiESANN
+from .process_FLiESANN_point import FLiESANN_point
+from .FLiESANN_point_results import FLiESANNPointResults
+from .FLiESANN_point_engine import FLiESANNPointEngine
+from .calculate_point_solar_geometry import calculate_point_solar_geometry
+from .FLiESANN_server import FLiESANNServer
+from .FLiESANN_results import FLiESANNResults
+from .FLiESANN_profiler import FLiESANNProfiler
+from .FLiESANN_cache import FLiESANNCache
+from .FLiESANN_LUT import FLiESANNLUT
+from .build_FLiESANN_LUT import build_FLiESANN_LUT
+from .FLiESANN_reduced_precision import FLiESANNReducedPrecision
+from .predict_FLiESANN_model import predict_FLiESANN_model
+from .FLiESANN_precision_accuracy_report import FLiESANN_precision_accuracy_report
+from .FLiESANN_LUT_accuracy_report import FLiESANN_LUT_accuracy_report
+from .FLiESANN_tracing import FLiESANNHook, register_FLiESANN_hook, unregister_FLiESANN_hook, FLiESANN_hooks
+from .FLiESANN_sink import FLiESANNSink
+from .GeoTIFF_sink import GeoTIFFSink
+from .Zarr_sink import ZarrSink
+from .process_FLiESANN_tiled import FLiESANN_tiled
+from .process_FLiESANN_dask import FLiESANN_dask
+from .process_FLiESANN_time_stack import FLiESANN_time_stack
+from .process_FLiESANN_daily import FLiESANN_daily
+from .FLiESANN_daily_accuracy_report import FLiESANN_daily_accuracy_report
+from .process_FLiESANN_sensitivity import FLiESANN_sensitivity
+from .process_FLiESANN_ensemble import FLiESANN_ensemble
 from .generate_FLiESANN_inputs_table_deprecated import generate_FLiES_inputs_table
 from .process_FLiESANN_table import process_FLiESANN_table
+from .run_FLiESANN_table_partitions import create_FLiESANN_worker_pool, FLiESANNWorkerError
+from .hash_FLiESANN_model import hash_FLiESANN_model
+from .read_FLiESANN_table import read_FLiESANN_table
+from .write_FLiESANN_table import write_FLiESANN_table
 from .ECOv002_static_tower_FLiESANN_inputs import load_ECOv002_static_tower_FLiESANN_inputs
 from .ECOv002_calval_FLiESANN_inputs import load_ECOv002_calval_FLiESANN_inputs
 from .ECOv002_calval_FLiESANN_outputs import load_ECOv002_calval_FLiESANN_outputs
 from .verify import verify
+from .fake_GEOS5FP import FakeGEOS5FP
+from .fake_NASADEM import FakeNASADEM
+from .benchmark_FLiESANN import benchmark_FLiESANN, compare_FLiESANN_benchmark
 from .retrieve_FLiESANN_GEOS5FP_inputs import retrieve_FLiESANN_GEOS5FP_inputs
 from .generate_FLiESANN_inputs_table import generate_FLiESANN_inputs_table
\ No newline at end of file
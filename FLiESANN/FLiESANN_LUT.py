@@ -0,0 +1,123 @@
+import json
+import logging
+from os.path import expanduser, splitext
+
+import numpy as np
+
+from .constants import *
+from .load_FLiESANN_model import load_FLiESANN_model
+from .hash_FLiESANN_model import hash_FLiESANN_model
+
+logger = logging.getLogger(__name__)
+
+class FLiESANNLUT:
+    """
+    Lookup table emulator of the FLiES ANN, interpolating tabulated ANN outputs instead of running the network.
+
+    A table built by `build_FLiESANN_LUT` holds the seven ANN outputs on a grid of the continuous features
+    (LUT_INPUTS) for each cloud type. The table is memory-mapped from its `.npy` file and described by a
+    `.json` file of the same name. `predict` takes the same feature matrix as the ANN, selects the table
+    of each row by its one-hot type columns and interpolates multilinearly between the 2^7 surrounding
+    grid nodes. Features outside the grid are clamped to its edges.
+
+    On load, the model hash recorded with the table is checked against the model the table stands in
+    for, given by `ANN_model` or `model_filename`.
+
+    Args:
+        filename (str): Filename of the table, with or without the `.npy` extension.
+        ANN_model (optional): Loaded ANN model the table must have been built from. Defaults to None
+            (loaded from model_filename).
+        model_filename (str, optional): Filename of the ANN model the table must have been built from if
+            ANN_model is not provided, or None to skip the check. Defaults to MODEL_FILENAME.
+
+    Raises:
+        ValueError: If the table was built from a different model.
+    """
+    def __init__(self, filename: str, ANN_model=None, model_filename: str = MODEL_FILENAME):
+        filename = expanduser(filename)
+        base, extension = splitext(filename)
+
+        if extension != ".npy":
+            base = filename
+
+        with open(f"{base}.json") as file:
+            self.metadata = json.load(file)
+
+        self.table = np.load(f"{base}.npy", mmap_mode="r")
+        self.inputs = self.metadata["inputs"]
+        self.nodes = [np.asarray(self.metadata["nodes"][name], dtype=np.float32) for name in self.inputs]
+        self.ctypes = self.metadata["ctypes"]
+        self.patterns = np.asarray(self.metadata["patterns"], dtype=np.float32)
+        self.outputs = self.metadata["outputs"]
+
+        if ANN_model is None and model_filename is not None:
+            ANN_model = load_FLiESANN_model(model_filename)
+
+        if ANN_model is not None and self.metadata.get("model_hash") != hash_FLiESANN_model(ANN_model):
+            raise ValueError(f"lookup table {base}.npy was built from a different ANN model, rebuild it with build_FLiESANN_LUT")
+
+        # flat table of one row per grid node, and the row offsets of the corners of a grid cell
+        self._rows = self.table.reshape(-1, self.table.shape[-1])
+        strides = np.cumprod([1] + [len(nodes) for nodes in self.nodes[::-1]])[::-1]
+        self._category_stride = int(strides[0])
+        self._strides = strides[1:]
+        corners = np.array(np.meshgrid(*[[0, 1]] * len(self.inputs), indexing="ij")).reshape(len(self.inputs), -1)
+        self._corner_offsets = self._strides @ corners
+
+    @property
+    def n_outputs(self) -> int:
+        return self.table.shape[-1]
+
+    def predict(self, features: np.ndarray, chunk_size: int = DEFAULT_LUT_CHUNK_SIZE) -> np.ndarray:
+        """
+        Interpolate the ANN outputs of a feature matrix.
+
+        Args:
+            features (np.ndarray): Feature matrix of shape (rows, 14) as prepared by `prepare_FLiESANN_inputs`
+                with split aerosol and cloud types.
+            chunk_size (int, optional): Number of rows interpolated at once. Defaults to DEFAULT_LUT_CHUNK_SIZE.
+
+        Returns:
+            np.ndarray: Interpolated outputs of shape (rows, 7), in ANN output order.
+
+        Raises:
+            ValueError: If the feature matrix does not have the tabulated columns or a row has a cloud type
+                that was not tabulated.
+        """
+        features = np.asarray(features, dtype=np.float32)
+        n_types = self.patterns.shape[1]
+
+        if features.ndim != 2 or features.shape[1] != n_types + len(self.inputs):
+            raise ValueError(f"expected a feature matrix of {n_types + len(self.inputs)} columns, got shape {features.shape}")
+
+        matches = (features[:, None, :n_types] == self.patterns[None]).all(axis=2)
+
+        if not matches.any(axis=1).all():
+            raise ValueError(f"feature rows with cloud types outside the lookup table types {self.ctypes}")
+
+        category = matches.argmax(axis=1)
+        outputs = np.empty((features.shape[0], self.n_outputs), dtype=np.float32)
+
+        for start in range(0, features.shape[0], chunk_size):
+            stop = min(start + chunk_size, features.shape[0])
+            rows = stop - start
+            base = category[start:stop].astype(np.int64) * self._category_stride
+            weights = np.empty((rows, len(self.inputs)), dtype=np.float32)
+
+            for dimension, nodes in enumerate(self.nodes):
+                x = np.clip(features[start:stop, n_types + dimension], nodes[0], nodes[-1])
+                index = np.clip(np.searchsorted(nodes, x, side="right") - 1, 0, len(nodes) - 2)
+                weights[:, dimension] = (x - nodes[index]) / (nodes[index + 1] - nodes[index])
+                base += index * self._strides[dimension]
+
+            # gather the corners of each cell and collapse one dimension at a time
+            values = np.take(self._rows, base[:, None] + self._corner_offsets[None, :], axis=0)
+            values = values.reshape((rows,) + (2,) * len(self.inputs) + (self.n_outputs,))
+
+            for dimension in range(len(self.inputs)):
+                weight = weights[:, dimension].reshape((rows,) + (1,) * (len(self.inputs) - dimension))
+                values = values[:, 0] + weight * (values[:, 1] - values[:, 0])
+
+            outputs[start:stop] = values
+
+        return outputs
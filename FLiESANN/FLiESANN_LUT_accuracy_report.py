@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+
+from .constants import *
+from .load_FLiESANN_model import load_FLiESANN_model
+from .predict_FLiESANN_model import predict_FLiESANN_model
+from .prepare_FLiESANN_table_features import prepare_FLiESANN_table_features
+from .ECOv002_calval_FLiESANN_inputs import load_ECOv002_calval_FLiESANN_inputs
+from .FLiESANN_LUT import FLiESANNLUT
+
+def FLiESANN_LUT_accuracy_report(
+        LUT: FLiESANNLUT,
+        input_df: pd.DataFrame = None,
+        ANN_model=None,
+        model_filename: str = MODEL_FILENAME) -> pd.DataFrame:
+    """
+    Compare the outputs of a lookup table emulator against the ANN it tabulates.
+
+    The feature matrix of `input_df` is prepared by `prepare_FLiESANN_table_features` and evaluated by
+    both the ANN and the lookup table. Rows with missing inputs are skipped.
+
+    Args:
+        LUT (FLiESANNLUT): Lookup table emulator to assess.
+        input_df (pd.DataFrame, optional): Table of COT, AOT, vapor_gccm, ozone_cm, albedo, elevation_m,
+            SZA_deg and KG_climate. Defaults to the ECOv002 cal/val inputs.
+        ANN_model (optional): Pre-loaded ANN model object. Defaults to None.
+        model_filename (str, optional): Filename of the ANN model to load. Defaults to MODEL_FILENAME.
+
+    Returns:
+        pd.DataFrame: One row per ANN output with the number of rows compared, the mean ANN output, and
+            the maximum absolute and root mean square errors of the lookup table.
+    """
+    if ANN_model is None:
+        ANN_model = load_FLiESANN_model(model_filename)
+
+    if input_df is None:
+        input_df = load_ECOv002_calval_FLiESANN_inputs()
+
+    features = prepare_FLiESANN_table_features(input_df)
+    inputs_array = features[:, None, :] if len(ANN_model.input_shape) == 3 else features
+    reference = predict_FLiESANN_model(ANN_model, inputs_array).reshape(len(features), -1).astype(np.float64)
+    error = LUT.predict(features).astype(np.float64) - reference
+
+    return pd.DataFrame({
+        "variable": LUT.outputs,
+        "rows": len(features),
+        "mean_ANN": reference.mean(axis=0),
+        "max_absolute_error": np.abs(error).max(axis=0),
+        "RMS_error": np.sqrt((error ** 2).mean(axis=0))
+    })
@@ -0,0 +1,183 @@
+import logging
+import os
+import sqlite3
+from collections import OrderedDict
+from threading import Lock
+
+import numpy as np
+
+from .constants import *
+from .load_FLiESANN_model import load_FLiESANN_model
+from .hash_FLiESANN_model import hash_FLiESANN_model
+
+logger = logging.getLogger(__name__)
+
+class FLiESANNCache:
+    """
+    Bounded cache of ANN outputs keyed by quantized feature rows, shared across FLiESANN calls.
+
+    Feature rows are rounded to multiples of `quantization_step` and the rounded row is the key, so
+    rows within the step of a cached row reuse its outputs. Up to `max_entries` rows are kept in
+    memory with least-recently-used eviction. With a `directory`, every predicted row is also written
+    to an SQLite database there, named after the model hash and quantization step, which serves memory
+    misses and persists across processes; the disk tier is not evicted.
+
+    A cache holds the float32 outputs of one model, identified by the hash of its weights in
+    `model_hash`; `run_FLiESANN_inference` rejects a cache built for another model or combined with
+    reduced precision. Hits, misses and disk hits are counted for sizing the cache, see `statistics`.
+
+    Args:
+        max_entries (int, optional): Number of rows kept in memory. Defaults to DEFAULT_CACHE_SIZE.
+        quantization_step (float, optional): Quantization step of the features. Defaults to
+            DEFAULT_CACHE_QUANTIZATION_STEP.
+        directory (str, optional): Directory of the on-disk tier. Defaults to None (memory only).
+        ANN_model (optional): Loaded ANN model whose outputs are cached. Defaults to None (loaded from model_filename).
+        model_filename (str, optional): Filename of the model whose outputs are cached if ANN_model is not
+            provided. Defaults to MODEL_FILENAME.
+    """
+    def __init__(
+            self,
+            max_entries: int = DEFAULT_CACHE_SIZE,
+            quantization_step: float = DEFAULT_CACHE_QUANTIZATION_STEP,
+            directory: str = None,
+            ANN_model=None,
+            model_filename: str = MODEL_FILENAME):
+        if ANN_model is None:
+            ANN_model = load_FLiESANN_model(model_filename)
+
+        self.model_hash = hash_FLiESANN_model(ANN_model)
+        self.max_entries = max_entries
+        self.quantization_step = quantization_step
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self._lock = Lock()
+        self._database = None
+
+        if directory is not None:
+            directory = os.path.expanduser(directory)
+            os.makedirs(directory, exist_ok=True)
+            filename = os.path.join(directory, f"FLiESANN_cache_{self.model_hash[:16]}_{quantization_step:g}.sqlite")
+            self._database = sqlite3.connect(filename, check_same_thread=False)
+            self._database.execute("CREATE TABLE IF NOT EXISTS outputs (key BLOB PRIMARY KEY, value BLOB)")
+
+    def _keys(self, features: np.ndarray) -> tuple:
+        quantized = np.ascontiguousarray(np.round(np.asarray(features, dtype=np.float64) / self.quantization_step).astype(np.int64))
+        # view each quantized row as one opaque element so unique rows are found in a single pass
+        rows = quantized.view(np.dtype((np.void, quantized.dtype.itemsize * quantized.shape[1]))).ravel()
+        unique_rows, index, inverse = np.unique(rows, return_index=True, return_inverse=True)
+
+        return unique_rows.tolist(), index, inverse.ravel()
+
+    def lookup(self, features: np.ndarray) -> tuple:
+        """
+        Look up the outputs of feature rows.
+
+        Args:
+            features (np.ndarray): Feature matrix of shape (rows, features).
+
+        Returns:
+            tuple: Outputs of shape (rows, outputs) with NaN rows for misses, or None if every row
+                missed, and the boolean mask of missed rows.
+        """
+        keys, _, inverse = self._keys(features)
+
+        with self._lock:
+            values = [self.entries.get(key) for key in keys]
+
+            for key, value in zip(keys, values):
+                if value is not None:
+                    self.entries.move_to_end(key)
+
+            found = np.array([value is not None for value in values], dtype=bool)
+
+            if self._database is not None and not found.all():
+                missing_keys = [key for key, value in zip(keys, values) if value is None]
+                from_disk = np.zeros(len(keys), dtype=bool)
+
+                for start in range(0, len(missing_keys), 500):
+                    batch = missing_keys[start:start + 500]
+                    rows = self._database.execute(f"SELECT key, value FROM outputs WHERE key IN ({','.join('?' * len(batch))})", batch).fetchall()
+
+                    for key, blob in rows:
+                        self._insert(key, np.frombuffer(blob, dtype=np.float32))
+
+                for unique_index in np.flatnonzero(~found):
+                    value = self.entries.get(keys[unique_index])
+
+                    if value is not None:
+                        values[unique_index] = value
+                        from_disk[unique_index] = True
+
+                found |= from_disk
+                self.disk_hits += int(from_disk[inverse].sum())
+
+            missing = ~found[inverse]
+            self.hits += int((~missing).sum())
+            self.misses += int(missing.sum())
+
+        if missing.all():
+            return None, missing
+
+        found_values = np.stack([value for value in values if value is not None])
+        unique_outputs = np.full((len(keys), found_values.shape[1]), np.nan, dtype=np.float32)
+        unique_outputs[found] = found_values
+
+        return unique_outputs[inverse], missing
+
+    def _insert(self, key: bytes, value: np.ndarray):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def store(self, features: np.ndarray, outputs: np.ndarray):
+        """
+        Store the outputs predicted for feature rows.
+
+        Args:
+            features (np.ndarray): Feature matrix of shape (rows, features).
+            outputs (np.ndarray): ANN outputs of shape (rows, outputs).
+        """
+        keys, index, _ = self._keys(features)
+        # one copy of the unique rows, whose row views become the entries
+        values = np.array(outputs, dtype=np.float32)[index]
+
+        with self._lock:
+            for key, value in zip(keys, values):
+                self._insert(key, value)
+
+            if self._database is not None:
+                self._database.executemany("INSERT OR REPLACE INTO outputs VALUES (?, ?)", zip(keys, map(np.ndarray.tobytes, values)))
+                self._database.commit()
+
+    def statistics(self) -> dict:
+        """
+        Hit-rate statistics of the cache.
+
+        Returns:
+            dict: hits, misses, disk_hits (hits served from the disk tier), hit_rate and entries (rows in memory).
+        """
+        lookups = self.hits + self.misses
+
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self.entries)
+        }
+
+    def clear(self):
+        """
+        Remove every entry from memory and disk and reset the statistics.
+        """
+        with self._lock:
+            self.entries.clear()
+            self.hits = self.misses = self.disk_hits = 0
+
+            if self._database is not None:
+                self._database.execute("DELETE FROM outputs")
+                self._database.commit()
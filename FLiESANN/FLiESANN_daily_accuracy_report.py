@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+from rasters import Raster
+
+from .constants import *
+from .load_FLiESANN_model import load_FLiESANN_model
+from .process_FLiESANN_daily import FLiESANN_daily, DAILY_VARIABLES, daily_variable_name
+
+def FLiESANN_daily_accuracy_report(
+        n_nodes: int = DEFAULT_DAILY_QUADRATURE_NODES,
+        dense_nodes: int = DEFAULT_DAILY_DENSE_NODES,
+        method: str = "gauss-legendre",
+        ANN_model=None,
+        model_filename: str = MODEL_FILENAME,
+        **kwargs) -> pd.DataFrame:
+    """
+    Compare daily totals from quadrature against dense sampling of the diurnal cycle.
+
+    `FLiESANN_daily` is run twice on the same inputs, once with `n_nodes` quadrature nodes and once
+    with `dense_nodes` midpoint samples over the same daylight period, and the differences of the
+    daily totals are summarized for each variable.
+
+    Args:
+        n_nodes (int, optional): Number of quadrature nodes. Defaults to DEFAULT_DAILY_QUADRATURE_NODES.
+        dense_nodes (int, optional): Number of dense reference samples. Defaults to DEFAULT_DAILY_DENSE_NODES.
+        method (str, optional): Quadrature method being assessed. Defaults to "gauss-legendre".
+        ANN_model (optional): Pre-loaded ANN model object, shared by both runs. Defaults to None.
+        model_filename (str, optional): Filename of the ANN model to load. Defaults to MODEL_FILENAME.
+        **kwargs: Inputs passed to `FLiESANN_daily` (albedo, geometry, date_UTC, ...).
+
+    Returns:
+        pd.DataFrame: One row per daily variable with the quadrature and dense evaluation counts,
+            the mean dense daily total, and the mean absolute, maximum absolute and maximum relative
+            differences of the quadrature totals (MJ/m²/day).
+    """
+    if ANN_model is None:
+        ANN_model = load_FLiESANN_model(model_filename)
+
+    quadrature = FLiESANN_daily(n_nodes=n_nodes, method=method, ANN_model=ANN_model, **kwargs)
+    dense = FLiESANN_daily(n_nodes=dense_nodes, method="midpoint", ANN_model=ANN_model, **kwargs)
+
+    rows = []
+
+    for variable in DAILY_VARIABLES:
+        key = daily_variable_name(variable)
+        estimate = np.asarray(quadrature[key].array if isinstance(quadrature[key], Raster) else quadrature[key], dtype=np.float64)
+        reference = np.asarray(dense[key].array if isinstance(dense[key], Raster) else dense[key], dtype=np.float64)
+        error = np.abs(estimate - reference)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            relative_error = np.where(reference > 0, error / reference, np.nan)
+
+        rows.append({
+            "variable": key,
+            "method": method,
+            "nodes": n_nodes,
+            "dense_nodes": dense_nodes,
+            "mean_dense_MJm2": np.nanmean(reference),
+            "mean_absolute_error_MJm2": np.nanmean(error),
+            "max_absolute_error_MJm2": np.nanmax(error),
+            "max_relative_error": np.nanmax(relative_error) if np.any(np.isfinite(relative_error)) else np.nan
+        })
+
+    return pd.DataFrame(rows)
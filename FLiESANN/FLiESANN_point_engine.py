@@ -0,0 +1,105 @@
+from threading import Lock
+
+import numpy as np
+
+from .constants import *
+from .load_FLiESANN_model import load_FLiESANN_model
+from .prepare_FLiESANN_inputs import prepare_FLiESANN_inputs
+from .fold_FLiESANN_categories import FLiESANN_category_codes
+from .FLiESANN_reduced_precision import FLiESANNReducedPrecision
+
+def _sigmoid(z: np.ndarray) -> np.ndarray:
+    np.negative(z, out=z)
+    np.exp(z, out=z)
+    z += 1
+    return np.reciprocal(z, out=z)
+
+def _relu(z: np.ndarray) -> np.ndarray:
+    return np.maximum(z, 0, out=z)
+
+def _tanh(z: np.ndarray) -> np.ndarray:
+    return np.tanh(z, out=z)
+
+# in-place activations of the single-row forward pass
+IN_PLACE_ACTIVATIONS = {
+    "linear": lambda z: z,
+    "relu": _relu,
+    "sigmoid": _sigmoid,
+    "tanh": _tanh
+}
+
+class FLiESANNPointEngine:
+    """
+    Warm single-row evaluator of the FLiES ANN for interactive point queries.
+
+    The float32 weights of `FLiESANNReducedPrecision` are evaluated with one preallocated vector per
+    layer, and the first-layer bias of each cloud type is precomputed, so a query costs a few small
+    in-place NumPy operations. The buffers are guarded by a lock, so one engine can serve several threads.
+
+    Args:
+        ANN_model (optional): Pre-loaded ANN model object. Defaults to None.
+        model_filename (str, optional): Filename of the ANN model to load. Defaults to MODEL_FILENAME.
+    """
+    def __init__(self, ANN_model=None, model_filename: str = MODEL_FILENAME):
+        if ANN_model is None:
+            ANN_model = load_FLiESANN_model(model_filename)
+
+        layers = FLiESANNReducedPrecision(ANN_model, "float32").layers
+        continuous_weights, _, _, category_biases, activation = layers[0]
+
+        # first-layer bias of each cloud type, through the one-hot columns built by prepare_FLiESANN_inputs
+        self.ctype_biases = {}
+
+        for ctype in range(6):
+            features = prepare_FLiESANN_inputs(*([np.array([ctype])] * 2 + [np.zeros(1)] * 7)).astype(np.float32).values
+            self.ctype_biases[ctype] = category_biases[FLiESANN_category_codes(features)[0]]
+
+        self.layers = [(continuous_weights, None, IN_PLACE_ACTIVATIONS[activation])]
+        self.layers += [(weights, bias, IN_PLACE_ACTIVATIONS[activation]) for weights, _, _, bias, activation in layers[1:]]
+        self._features = np.zeros(continuous_weights.shape[0], dtype=np.float32)
+        self._buffers = [np.zeros(weights.shape[1], dtype=np.float32) for weights, _, _ in self.layers]
+        self._lock = Lock()
+
+    def predict(
+            self,
+            ctype: int,
+            COT: float,
+            AOT: float,
+            vapor_gccm: float,
+            ozone_cm: float,
+            albedo: float,
+            elevation_km: float,
+            SZA: float) -> list:
+        """
+        Evaluate the ANN for one row of inputs.
+
+        Args:
+            ctype (int): Cloud type, which also sets the aerosol type columns as in `prepare_FLiESANN_inputs`.
+            COT (float): Cloud optical thickness.
+            AOT (float): Aerosol optical thickness.
+            vapor_gccm (float): Water vapor in grams per square centimeter.
+            ozone_cm (float): Ozone concentration in centimeters.
+            albedo (float): Surface albedo.
+            elevation_km (float): Elevation in kilometers.
+            SZA (float): Solar zenith angle in degrees.
+
+        Returns:
+            list: The seven unclipped ANN outputs, in model output order.
+        """
+        with self._lock:
+            x = self._features
+            x[0] = COT
+            x[1] = AOT
+            x[2] = vapor_gccm
+            x[3] = ozone_cm
+            x[4] = albedo
+            x[5] = elevation_km
+            x[6] = SZA
+            bias = self.ctype_biases[ctype]
+
+            for (weights, layer_bias, activation), buffer in zip(self.layers, self._buffers):
+                np.dot(x, weights, out=buffer)
+                buffer += bias if layer_bias is None else layer_bias
+                x = activation(buffer)
+
+            return x.tolist()
@@ -0,0 +1,23 @@
+from typing import NamedTuple
+
+class FLiESANNPointResults(NamedTuple):
+    """
+    Outputs of `FLiESANN_point` for one location and time, named as in FLIESANN_OUTPUT_VARIABLES.
+    """
+    SWin_Wm2: float
+    SWin_TOA_Wm2: float
+    SWout_Wm2: float
+    UV_Wm2: float
+    PAR_Wm2: float
+    NIR_Wm2: float
+    PAR_diffuse_Wm2: float
+    NIR_diffuse_Wm2: float
+    PAR_direct_Wm2: float
+    NIR_direct_Wm2: float
+    atmospheric_transmittance: float
+    UV_proportion: float
+    PAR_proportion: float
+    NIR_proportion: float
+    UV_diffuse_fraction: float
+    PAR_diffuse_fraction: float
+    NIR_diffuse_fraction: float
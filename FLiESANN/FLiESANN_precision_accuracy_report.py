@@ -0,0 +1,61 @@
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from .constants import *
+from .load_FLiESANN_model import load_FLiESANN_model
+from .predict_FLiESANN_model import predict_FLiESANN_model
+from .prepare_FLiESANN_table_features import prepare_FLiESANN_table_features
+from .ECOv002_calval_FLiESANN_inputs import load_ECOv002_calval_FLiESANN_inputs
+from .FLiESANN_reduced_precision import FLiESANNReducedPrecision
+
+def FLiESANN_precision_accuracy_report(
+        precisions: List[str] = None,
+        input_df: pd.DataFrame = None,
+        ANN_model=None,
+        model_filename: str = MODEL_FILENAME) -> pd.DataFrame:
+    """
+    Compare reduced-precision inference engines against the float32 Keras model.
+
+    The feature matrix of `input_df` is prepared by `prepare_FLiESANN_table_features` and evaluated
+    by the Keras model and by a `FLiESANNReducedPrecision` engine of each precision.
+
+    Args:
+        precisions (List[str], optional): Precisions to assess. Defaults to REDUCED_PRECISIONS.
+        input_df (pd.DataFrame, optional): Table of FLiESANN inputs. Defaults to the ECOv002 cal/val inputs.
+        ANN_model (optional): Pre-loaded ANN model object. Defaults to None.
+        model_filename (str, optional): Filename of the ANN model to load. Defaults to MODEL_FILENAME.
+
+    Returns:
+        pd.DataFrame: One row per precision and ANN output with the number of rows compared, the bytes
+            of the stored weights, and the maximum absolute and root mean square errors.
+    """
+    if precisions is None:
+        precisions = REDUCED_PRECISIONS
+
+    if ANN_model is None:
+        ANN_model = load_FLiESANN_model(model_filename)
+
+    if input_df is None:
+        input_df = load_ECOv002_calval_FLiESANN_inputs()
+
+    features = prepare_FLiESANN_table_features(input_df)
+    inputs_array = features[:, None, :] if len(ANN_model.input_shape) == 3 else features
+    reference = predict_FLiESANN_model(ANN_model, inputs_array).reshape(len(features), -1).astype(np.float64)
+    reports = []
+
+    for precision in precisions:
+        engine = FLiESANNReducedPrecision(ANN_model, precision)
+        error = engine.predict(features).astype(np.float64) - reference
+
+        reports.append(pd.DataFrame({
+            "precision": precision,
+            "variable": ANN_OUTPUT_VARIABLES,
+            "rows": len(features),
+            "weight_bytes": engine.weight_bytes,
+            "max_absolute_error": np.abs(error).max(axis=0),
+            "RMS_error": np.sqrt((error ** 2).mean(axis=0))
+        }))
+
+    return pd.concat(reports, ignore_index=True)
@@ -0,0 +1,105 @@
+import logging
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from time import perf_counter, process_time
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+class FLiESANNProfiler:
+    """
+    Records wall time, CPU time and peak allocated memory for each stage of a FLiESANN run.
+
+    Memory is measured with `tracemalloc`, which the profiler starts when it is created (unless
+    tracing is already active) and stops in `stop`. The peak is reported relative to the memory
+    allocated when the stage started, and covers allocations made through Python and NumPy, not
+    memory allocated internally by TensorFlow. Stages may be nested; the peak of a stage includes
+    the peaks of the stages nested inside it.
+    """
+    def __init__(self):
+        self.records = []
+        self._stack = []
+        self._started_tracemalloc = not tracemalloc.is_tracing()
+
+        if self._started_tracemalloc:
+            tracemalloc.start()
+
+    @contextmanager
+    def stage(self, name: str, size: int = None):
+        """
+        Measure one stage.
+
+        Args:
+            name (str): Name of the stage.
+            size (int, optional): Number of rows or pixels processed by the stage.
+        """
+        current_bytes, peak_bytes = tracemalloc.get_traced_memory()
+
+        # the peak reached so far belongs to the enclosing stage before it is reset for this one
+        if self._stack:
+            self._stack[-1]["peak"] = max(self._stack[-1]["peak"], peak_bytes)
+
+        tracemalloc.reset_peak()
+        frame = {"peak": current_bytes}
+        self._stack.append(frame)
+        wall_start = perf_counter()
+        CPU_start = process_time()
+
+        try:
+            yield
+        finally:
+            wall_seconds = perf_counter() - wall_start
+            CPU_seconds = process_time() - CPU_start
+            peak_bytes = max(frame["peak"], tracemalloc.get_traced_memory()[1])
+            self._stack.pop()
+
+            if self._stack:
+                self._stack[-1]["peak"] = max(self._stack[-1]["peak"], peak_bytes)
+
+            record = {
+                "stage": name,
+                "wall_seconds": wall_seconds,
+                "CPU_seconds": CPU_seconds,
+                "peak_allocated_bytes": peak_bytes - current_bytes,
+                "size": size
+            }
+
+            self.records.append(record)
+            logger.info(f"FLiESANN stage {name}: {wall_seconds:.4f} s wall, {CPU_seconds:.4f} s CPU, {record['peak_allocated_bytes'] / 1e6:.1f} MB peak, size {size}")
+
+    def stop(self):
+        """
+        Stop memory tracing if this profiler started it.
+        """
+        if self._started_tracemalloc and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+        self._started_tracemalloc = False
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        Stage measurements in the order the stages completed.
+
+        Returns:
+            pd.DataFrame: One row per stage with stage, wall_seconds, CPU_seconds,
+                peak_allocated_bytes and size columns.
+        """
+        return pd.DataFrame(self.records, columns=["stage", "wall_seconds", "CPU_seconds", "peak_allocated_bytes", "size"])
+
+def profile_stage(profiler: FLiESANNProfiler, name: str, size: int = None):
+    """
+    Measure a stage with the given profiler, or do nothing when profiling is disabled.
+
+    Args:
+        profiler (FLiESANNProfiler): Active profiler, or None.
+        name (str): Name of the stage.
+        size (int, optional): Number of rows or pixels processed by the stage.
+
+    Returns:
+        Context manager measuring the stage.
+    """
+    if profiler is None:
+        return nullcontext()
+
+    return profiler.stage(name, size)
@@ -0,0 +1,145 @@
+from threading import Lock
+from weakref import WeakKeyDictionary
+
+import numpy as np
+
+from .constants import *
+from .load_FLiESANN_model import load_FLiESANN_model
+from .calculate_MLP_jacobian import MLP_dense_layers
+from .fold_FLiESANN_categories import fold_FLiESANN_categories, FLiESANN_category_codes
+
+ACTIVATIONS = {
+    "linear": lambda z: z,
+    "relu": lambda z: np.maximum(z, 0, out=z),
+    "sigmoid": lambda z: 1 / (1 + np.exp(-z)),
+    "tanh": np.tanh
+}
+
+class FLiESANNReducedPrecision:
+    """
+    NumPy inference engine of the FLiES ANN, optionally with weights stored in reduced precision.
+
+    The one-hot aerosol and cloud type columns of the features are folded into per-category biases of the
+    first layer (see `fold_FLiESANN_categories`), so the first layer multiplies only the continuous features.
+    With "float32", the engine reproduces the Keras model up to float32 rounding. With "float16", the weights
+    are stored as float16. With "int8", the weights of each hidden and output layer are quantized
+    symmetrically to int8 with float32 scales per row and per column of the layer, quartering their size,
+    while the small first layer, which takes the unscaled features, is stored as float16.
+
+    Only the reduced-precision weights are held by the engine, and each chunk reads them from that storage.
+    NumPy has no fast float16 or int8 matrix product, so each layer's weights are widened to a transient
+    float32 copy for the chunk being evaluated, and the activations and accumulation stay in float32. The
+    weight memory and weight traffic are therefore halved or quartered, while the activation traffic is
+    that of the "float32" engine. Use `for_model` to reuse the engine of a loaded model, and
+    `FLiESANN_precision_accuracy_report` to measure the error against the float32 Keras model.
+
+    Args:
+        ANN_model (optional): Pre-loaded ANN model object, a sequential model of Dense layers. Defaults to None.
+        precision (str, optional): "float32", "float16" or "int8". Defaults to "float16".
+        model_filename (str, optional): Filename of the ANN model to load. Defaults to MODEL_FILENAME.
+
+    Raises:
+        ValueError: If the precision is not one of NUMPY_PRECISIONS or the model has layers other than Dense.
+    """
+    def __init__(self, ANN_model=None, precision: str = "float16", model_filename: str = MODEL_FILENAME):
+        if precision not in NUMPY_PRECISIONS:
+            raise ValueError(f"unrecognized precision: {precision} (expected one of {', '.join(NUMPY_PRECISIONS)})")
+
+        if ANN_model is None:
+            ANN_model = load_FLiESANN_model(model_filename)
+
+        self.precision = precision
+        self.layers = []
+
+        for index, (weights, bias, activation) in enumerate(MLP_dense_layers(ANN_model)):
+            if activation not in ACTIVATIONS:
+                raise ValueError(f"unsupported activation for reduced-precision inference: {activation}")
+
+            if index == 0 and weights.shape[0] > N_CATEGORY_FEATURES:
+                weights, bias = fold_FLiESANN_categories(weights, bias)
+
+            if precision == "float32":
+                self.layers.append((weights, None, None, bias, activation))
+                continue
+
+            if precision == "float16" or index == 0:
+                # the first layer takes the unscaled features and is small, so int8 keeps it in float16
+                self.layers.append((weights.astype(np.float16), None, None, bias, activation))
+                continue
+
+            # balance the rows before taking one scale per column, W = row_scale * stored * column_scale
+            row_scale = np.sqrt(np.maximum(np.abs(weights).max(axis=1), np.finfo(np.float32).tiny)).astype(np.float32)
+            balanced = weights / row_scale[:, None]
+            column_scale = (np.maximum(np.abs(balanced).max(axis=0), np.finfo(np.float32).tiny) / 127).astype(np.float32)
+            stored = np.clip(np.round(balanced / column_scale), -127, 127).astype(np.int8)
+            self.layers.append((stored, row_scale, column_scale, bias, activation))
+
+    # engines of each loaded model by precision, released with the model
+    _engines = WeakKeyDictionary()
+    _engines_lock = Lock()
+
+    @classmethod
+    def for_model(cls, ANN_model, precision: str = "float16") -> "FLiESANNReducedPrecision":
+        """
+        Engine of a loaded model at a precision, built on first use and reused by later calls.
+
+        Args:
+            ANN_model: Loaded ANN model object, a sequential model of Dense layers.
+            precision (str, optional): "float32", "float16" or "int8". Defaults to "float16".
+
+        Returns:
+            FLiESANNReducedPrecision: The engine of the model at the precision.
+        """
+        with cls._engines_lock:
+            engines = cls._engines.setdefault(ANN_model, {})
+
+            if precision not in engines:
+                engines[precision] = cls(ANN_model, precision)
+
+            return engines[precision]
+
+    @property
+    def weight_bytes(self) -> int:
+        """
+        Bytes of the stored weights and biases.
+        """
+        return sum(sum(array.nbytes for array in layer[:4] if array is not None) for layer in self.layers)
+
+    def predict(self, features: np.ndarray, chunk_size: int = DEFAULT_REDUCED_PRECISION_CHUNK_SIZE) -> np.ndarray:
+        """
+        Evaluate the ANN on a feature matrix.
+
+        Args:
+            features (np.ndarray): Feature matrix of shape (rows, features), or (rows, 1, features).
+            chunk_size (int, optional): Number of rows evaluated at once. Defaults to DEFAULT_REDUCED_PRECISION_CHUNK_SIZE.
+
+        Returns:
+            np.ndarray: Outputs of shape (rows, outputs) in float32.
+        """
+        features = np.asarray(features).reshape(len(features), -1)
+        outputs = np.empty((len(features), len(self.layers[-1][3])), dtype=np.float32)
+
+        for start in range(0, len(features), chunk_size):
+            x = features[start:start + chunk_size].astype(np.float32, copy=False)
+
+            for stored, row_scale, column_scale, bias, activation in self.layers:
+                # widen the stored weights for this chunk only, W = row_scale * stored * column_scale for int8
+                weights = stored.astype(np.float32, copy=False)
+
+                if row_scale is not None:
+                    weights *= row_scale[:, None]
+                    weights *= column_scale
+
+                if bias.ndim == 2:
+                    # folded first layer: continuous features and the bias of each row's categories
+                    z = x[:, N_CATEGORY_FEATURES:] @ weights
+                    z += bias[FLiESANN_category_codes(x)]
+                else:
+                    z = x @ weights
+                    z += bias
+
+                x = ACTIVATIONS[activation](z)
+
+            outputs[start:start + chunk_size] = x
+
+        return outputs
@@ -0,0 +1,104 @@
+from collections.abc import Mapping
+from typing import List, Union
+
+import numpy as np
+import rasters as rt
+from rasters import Raster, RasterGeometry
+
+from .constants import *
+
+class FLiESANNResults(Mapping):
+    """
+    FLiESANN outputs stored in one contiguous float32 block of shape (bands, ...).
+
+    Each output variable is a band of the block, and indexing by variable name returns a view of
+    that band rather than a copy. All bands share a single geometry. Passing the same container as
+    `out=` to repeated calls on the same grid reuses the block instead of allocating new output
+    arrays and Raster objects on every call.
+
+    Args:
+        data (np.ndarray): Float32 array with one band per variable along the first axis.
+        variables (List[str]): Names of the bands, in order.
+        geometry (RasterGeometry, optional): Geometry shared by all bands. Defaults to None.
+
+    Raises:
+        ValueError: If the data is not float32 or the number of bands does not match the variables.
+    """
+    def __init__(self, data: np.ndarray, variables: List[str], geometry: RasterGeometry = None):
+        if data.dtype != np.float32:
+            raise ValueError(f"FLiESANN results must be float32, not {data.dtype}")
+
+        if data.ndim < 2 or data.shape[0] != len(variables):
+            raise ValueError(f"cannot store {len(variables)} variables in array of shape {data.shape}")
+
+        self.data = data
+        self.variables = list(variables)
+        self.geometry = geometry
+        self.profile = None
+        self._band_indices = {variable: band for band, variable in enumerate(self.variables)}
+
+    @classmethod
+    def allocate(
+            cls,
+            shape: Union[tuple, RasterGeometry],
+            variables: List[str] = None) -> "FLiESANNResults":
+        """
+        Allocate a NaN-filled result container.
+
+        Args:
+            shape (Union[tuple, RasterGeometry]): Shape of each band, or the geometry of the outputs.
+            variables (List[str], optional): Output variables. Defaults to FLIESANN_OUTPUT_VARIABLES.
+
+        Returns:
+            FLiESANNResults: Empty container for the given shape and variables.
+        """
+        if variables is None:
+            variables = FLIESANN_OUTPUT_VARIABLES
+
+        geometry = shape if isinstance(shape, RasterGeometry) else None
+        shape = tuple(geometry.shape) if geometry is not None else tuple(np.atleast_1d(shape))
+        data = np.full((len(variables),) + shape, np.nan, dtype=np.float32)
+
+        return cls(data, variables, geometry)
+
+    @property
+    def shape(self) -> tuple:
+        return self.data.shape[1:]
+
+    def __getitem__(self, variable: str) -> np.ndarray:
+        return self.data[self._band_indices[variable]]
+
+    def __iter__(self):
+        return iter(self.variables)
+
+    def __len__(self) -> int:
+        return len(self.variables)
+
+    def __repr__(self) -> str:
+        return f"FLiESANNResults(variables={self.variables}, shape={self.shape})"
+
+    def update(self, results: dict):
+        """
+        Copy outputs into the bands of the container, ignoring variables it does not hold.
+
+        Args:
+            results (dict): FLiESANN outputs as Rasters, arrays or scalars, broadcast to the band shape.
+        """
+        for variable, value in results.items():
+            if variable in self._band_indices:
+                np.copyto(self[variable], value.array if isinstance(value, Raster) else value, casting="unsafe")
+
+    def raster(self, variable: str) -> Raster:
+        """
+        Wrap one band as a Raster on the shared geometry.
+        """
+        return rt.Raster(self[variable], geometry=self.geometry)
+
+    def to_dict(self) -> dict:
+        """
+        Convert to the dictionary form returned by `FLiESANN`, with Rasters if a raster geometry is set.
+        """
+        if isinstance(self.geometry, RasterGeometry):
+            return {variable: self.raster(variable) for variable in self.variables}
+
+        return {variable: self[variable] for variable in self.variables}
@@ -0,0 +1,443 @@
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+from .constants import *
+from .calculate_point_solar_geometry import calculate_point_solar_geometry
+from .FLiESANN_tracing import trace_span
+from .load_FLiESANN_model import load_FLiESANN_model
+from .process_FLiESANN import FLiESANN
+
+logger = logging.getLogger(__name__)
+
+HTTP_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    500: "Internal Server Error"
+}
+
+class FLiESANNServer:
+    """
+    Local inference server coalescing concurrent point requests into vectorised FLiESANN calls.
+
+    The server holds a warm model and a request queue. A batcher takes the first waiting request,
+    keeps collecting requests until `max_batch_size` are waiting or `max_latency_seconds` have passed
+    since the first one, and evaluates the batch as one geometry-free `FLiESANN` call (a single
+    `run_FLiESANN_inference` call) before fanning the outputs back out to the waiting requests.
+    Batches are evaluated one at a time off the event loop, so requests arriving during a batch
+    form the next one.
+
+    Requests are served over HTTP on a TCP port or a Unix socket:
+
+        POST /FLiESANN   JSON object of FLiESANN_point inputs, time_UTC as an ISO 8601 string
+        GET  /metrics    JSON object of throughput, batch size and latency metrics
+
+    Args:
+        max_batch_size (int, optional): Largest number of requests per batch. Defaults to DEFAULT_SERVER_BATCH_SIZE.
+        max_latency_seconds (float, optional): Longest wait for a batch to fill after its first request.
+            Defaults to DEFAULT_SERVER_LATENCY_SECONDS.
+        ANN_model (optional): Pre-loaded ANN model object. Defaults to None (loaded from model_filename).
+        model_filename (str, optional): Filename of the ANN model. Defaults to MODEL_FILENAME.
+        metrics_window (int, optional): Number of recent requests the latency percentiles cover.
+            Defaults to DEFAULT_SERVER_METRICS_WINDOW.
+    """
+    def __init__(
+            self,
+            max_batch_size: int = DEFAULT_SERVER_BATCH_SIZE,
+            max_latency_seconds: float = DEFAULT_SERVER_LATENCY_SECONDS,
+            ANN_model=None,
+            model_filename: str = MODEL_FILENAME,
+            metrics_window: int = DEFAULT_SERVER_METRICS_WINDOW):
+        if max_batch_size < 1:
+            raise ValueError(f"max_batch_size must be positive: {max_batch_size}")
+
+        if max_latency_seconds < 0:
+            raise ValueError(f"max_latency_seconds must not be negative: {max_latency_seconds}")
+
+        if ANN_model is None:
+            ANN_model = load_FLiESANN_model(model_filename)
+
+        self.max_batch_size = max_batch_size
+        self.max_latency_seconds = max_latency_seconds
+        self.ANN_model = ANN_model
+        self.model_filename = model_filename
+
+        self._queue = None
+        self._batcher = None
+        self._server = None
+        self._unix_socket = None
+        # a single worker evaluates batches in order, keeping the event loop free to accept requests
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="FLiESANN_server")
+
+        self._requests = 0
+        self._errors = 0
+        self._batches = 0
+        self._started = None
+        self._latencies = deque(maxlen=metrics_window)
+        self._batch_sizes = deque(maxlen=metrics_window)
+
+        # warm the traced model so the first batch does not pay for tracing
+        self._evaluate_batch([{
+            "lat": 0.0,
+            "lon": 0.0,
+            "time_UTC": datetime(2000, 3, 20, 12),
+            "albedo": 0.1,
+            "COT": 0.0,
+            "AOT": 0.1,
+            "vapor_gccm": 1.0,
+            "ozone_cm": 0.3,
+            "elevation_m": 0.0,
+            "KG_climate": 1
+        }])
+
+    @property
+    def address(self):
+        """
+        Bound address of the listening socket, a (host, port) tuple or a Unix socket path.
+        """
+        if self._server is None:
+            return None
+
+        return self._server.sockets[0].getsockname()
+
+    async def start(self, host: str = DEFAULT_SERVER_HOST, port: int = DEFAULT_SERVER_PORT, unix_socket: str = None):
+        """
+        Start the batcher and listen for HTTP requests.
+
+        Args:
+            host (str, optional): Host to listen on. Defaults to DEFAULT_SERVER_HOST.
+            port (int, optional): TCP port to listen on, 0 for any free port. Defaults to DEFAULT_SERVER_PORT.
+            unix_socket (str, optional): Path of a Unix socket to listen on instead of TCP. Defaults to None.
+        """
+        self._start_batcher()
+
+        if unix_socket is None:
+            self._server = await asyncio.start_server(self._handle_connection, host, port, backlog=DEFAULT_SERVER_BACKLOG)
+        else:
+            self._server = await asyncio.start_unix_server(self._handle_connection, unix_socket, backlog=DEFAULT_SERVER_BACKLOG)
+            self._unix_socket = unix_socket
+
+        logger.info(f"FLiESANN server listening on {self.address} with batches of up to {self.max_batch_size} requests within {self.max_latency_seconds * 1000:.1f} ms")
+
+    async def serve_forever(self, **kwargs):
+        """
+        Start the server and serve requests until cancelled.
+        """
+        await self.start(**kwargs)
+
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def stop(self):
+        """
+        Stop listening, stop the batcher, fail the requests still queued or in the batch being evaluated,
+        and remove the Unix socket file.
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+        if self._unix_socket is not None:
+            if os.path.exists(self._unix_socket):
+                os.remove(self._unix_socket)
+
+            self._unix_socket = None
+
+        if self._batcher is not None:
+            self._batcher.cancel()
+
+            try:
+                await self._batcher
+            except asyncio.CancelledError:
+                pass
+
+            self._batcher = None
+
+        while self._queue is not None and not self._queue.empty():
+            _fail_stopped_requests([self._queue.get_nowait()])
+
+    async def evaluate(self, **inputs) -> dict:
+        """
+        Queue one point request and wait for its batch.
+
+        Args:
+            **inputs: Keyword arguments of FLiESANN_point: lat, lon, time_UTC, albedo, COT, AOT,
+                vapor_gccm, ozone_cm, elevation_m, KG_climate and optionally SZA_deg.
+
+        Returns:
+            dict: The radiation outputs of FLIESANN_OUTPUT_VARIABLES as floats.
+        """
+        self._start_batcher()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((inputs, future, time.perf_counter()))
+
+        return await future
+
+    def metrics(self) -> dict:
+        """
+        Throughput, batch size and latency of the served requests.
+
+        Returns:
+            dict: Counts of requests, errors and batches, the mean batch size, the throughput in
+                requests per second since the server started, and latency percentiles in milliseconds
+                over the recent requests.
+        """
+        elapsed = time.perf_counter() - self._started if self._started is not None else 0
+        latencies = np.array(self._latencies) * 1000
+        percentiles = np.percentile(latencies, [50, 95, 99]) if len(latencies) else [None] * 3
+
+        return {
+            "requests": self._requests,
+            "errors": self._errors,
+            "batches": self._batches,
+            "mean_batch_size": float(np.mean(self._batch_sizes)) if self._batch_sizes else None,
+            "max_batch_size": self.max_batch_size,
+            "max_latency_ms": self.max_latency_seconds * 1000,
+            "throughput_per_second": self._requests / elapsed if elapsed > 0 else None,
+            "latency_p50_ms": None if percentiles[0] is None else float(percentiles[0]),
+            "latency_p95_ms": None if percentiles[1] is None else float(percentiles[1]),
+            "latency_p99_ms": None if percentiles[2] is None else float(percentiles[2]),
+            "latency_max_ms": float(latencies.max()) if len(latencies) else None
+        }
+
+    def _start_batcher(self):
+        if self._batcher is None:
+            self._queue = asyncio.Queue()
+            self._started = time.perf_counter()
+            self._batcher = asyncio.get_running_loop().create_task(self._batch_loop())
+
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+        batch = []
+
+        try:
+            while True:
+                batch = [await self._queue.get()]
+                deadline = loop.time() + self.max_latency_seconds
+
+                while len(batch) < self.max_batch_size:
+                    if not self._queue.empty():
+                        batch.append(self._queue.get_nowait())
+                        continue
+
+                    timeout = deadline - loop.time()
+
+                    if timeout <= 0:
+                        break
+
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+
+                try:
+                    outputs = await loop.run_in_executor(self._executor, self._evaluate_batch, [inputs for inputs, _, _ in batch])
+                except Exception as e:
+                    outputs = [e] * len(batch)
+
+                finished = time.perf_counter()
+                self._batches += 1
+                self._batch_sizes.append(len(batch))
+
+                for (_, future, queued), output in zip(batch, outputs):
+                    self._requests += 1
+                    self._latencies.append(finished - queued)
+
+                    if isinstance(output, Exception):
+                        self._errors += 1
+
+                    if future.done():
+                        continue
+
+                    if isinstance(output, Exception):
+                        future.set_exception(output)
+                    else:
+                        future.set_result(output)
+
+                batch = []
+        except asyncio.CancelledError:
+            # the requests of the batch being collected or evaluated have already left the queue
+            _fail_stopped_requests(batch)
+            raise
+
+    def _evaluate_batch(self, batch: list) -> list:
+        # invalid requests fail on their own without failing the rest of the batch
+        outputs = [None] * len(batch)
+        rows = []
+        columns = {key: [] for key in ["albedo", "COT", "AOT", "vapor_gccm", "ozone_cm", "elevation_m", "KG_climate", "SZA_deg", "day_of_year", "hour_of_day"]}
+
+        for index, inputs in enumerate(batch):
+            try:
+                row = _parse_point_inputs(inputs)
+            except (KeyError, TypeError, ValueError) as e:
+                outputs[index] = ValueError(f"invalid FLiESANN request: {e}")
+                continue
+
+            rows.append(index)
+
+            for key, value in row.items():
+                columns[key].append(value)
+
+        if not rows:
+            return outputs
+
+        with trace_span("FLiESANN_server_batch", rows=len(rows)):
+            results = FLiESANN(
+                ANN_model=self.ANN_model,
+                model_filename=self.model_filename,
+                offline_mode=True,
+                **{key: np.array(values, dtype=np.int32 if key == "KG_climate" else np.float64) for key, values in columns.items()}
+            )
+
+        results = {variable: np.asarray(results[variable], dtype=np.float64).ravel() for variable in FLIESANN_OUTPUT_VARIABLES}
+
+        for position, index in enumerate(rows):
+            outputs[index] = {variable: float(values[position]) for variable, values in results.items()}
+
+        return outputs
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        # minimal HTTP/1.1 with keep-alive, enough for local clients
+        try:
+            while True:
+                request_line = await reader.readline()
+
+                if not request_line:
+                    break
+
+                method, path, version = request_line.decode("latin-1").split()
+                headers = {}
+
+                while True:
+                    line = await reader.readline()
+
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                status, payload = await self._route(method, path, body)
+                content = json.dumps(payload).encode()
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+
+                writer.write(
+                    f"HTTP/1.1 {status} {HTTP_REASONS[status]}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(content)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + content
+                )
+                await writer.drain()
+
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError, ValueError):
+            # clients disconnecting, including while their request waits for its batch
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method: str, path: str, body: bytes) -> tuple:
+        if path == "/metrics":
+            if method != "GET":
+                return 405, {"error": f"{method} not allowed on {path}"}
+
+            return 200, self.metrics()
+
+        if path != "/FLiESANN":
+            return 404, {"error": f"unknown path: {path}"}
+
+        if method != "POST":
+            return 405, {"error": f"{method} not allowed on {path}"}
+
+        try:
+            inputs = json.loads(body)
+        except ValueError as e:
+            return 400, {"error": f"invalid JSON: {e}"}
+
+        if not isinstance(inputs, dict):
+            return 400, {"error": "request body must be a JSON object"}
+
+        try:
+            outputs = await self.evaluate(**inputs)
+        except ValueError as e:
+            return 400, {"error": str(e)}
+        except Exception as e:
+            logger.exception(e)
+            return 500, {"error": str(e)}
+
+        # NaN is not valid JSON
+        return 200, {variable: None if math.isnan(value) else value for variable, value in outputs.items()}
+
+def _fail_stopped_requests(requests: list):
+    for _, future, _ in requests:
+        if not future.done():
+            future.set_exception(RuntimeError("FLiESANN server stopped"))
+
+def _parse_point_inputs(inputs: dict) -> dict:
+    time_UTC = inputs["time_UTC"]
+
+    if isinstance(time_UTC, str):
+        time_UTC = datetime.fromisoformat(time_UTC)
+
+    day_of_year, hour_of_day, SZA_deg = calculate_point_solar_geometry(float(inputs["lat"]), float(inputs["lon"]), time_UTC)
+
+    if inputs.get("SZA_deg") is not None:
+        SZA_deg = float(inputs["SZA_deg"])
+
+    return {
+        "albedo": float(inputs["albedo"]),
+        "COT": float(inputs["COT"]),
+        "AOT": float(inputs["AOT"]),
+        "vapor_gccm": float(inputs["vapor_gccm"]),
+        "ozone_cm": float(inputs["ozone_cm"]),
+        "elevation_m": float(inputs["elevation_m"]),
+        "KG_climate": int(inputs["KG_climate"]),
+        "SZA_deg": SZA_deg,
+        "day_of_year": day_of_year,
+        "hour_of_day": hour_of_day
+    }
+
+def main():
+    """
+    Serve FLiESANN point requests over HTTP until interrupted.
+    """
+    parser = argparse.ArgumentParser(description="Serve FLiESANN point requests, coalescing concurrent requests into batches.")
+    parser.add_argument("--host", default=DEFAULT_SERVER_HOST, help="host to listen on")
+    parser.add_argument("--port", type=int, default=DEFAULT_SERVER_PORT, help="TCP port to listen on")
+    parser.add_argument("--unix-socket", default=None, help="Unix socket path to listen on instead of TCP")
+    parser.add_argument("--max-batch-size", type=int, default=DEFAULT_SERVER_BATCH_SIZE, help="largest number of requests per batch")
+    parser.add_argument("--max-latency-ms", type=float, default=DEFAULT_SERVER_LATENCY_SECONDS * 1000, help="longest wait for a batch to fill")
+    parser.add_argument("--model", default=MODEL_FILENAME, help="ANN model file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    server = FLiESANNServer(
+        max_batch_size=args.max_batch_size,
+        max_latency_seconds=args.max_latency_ms / 1000,
+        model_filename=args.model
+    )
+
+    try:
+        asyncio.run(server.serve_forever(host=args.host, port=args.port, unix_socket=args.unix_socket))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
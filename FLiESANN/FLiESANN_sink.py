@@ -0,0 +1,65 @@
+from abc import ABC, abstractmethod
+from typing import List
+
+import numpy as np
+from rasters import Raster, RasterGeometry
+
+from .constants import *
+
+class FLiESANNSink(ABC):
+    """
+    Base class for outputs that receive FLiESANN results one window at a time.
+
+    A sink is created for a target geometry and a fixed list of output variables, receives the
+    results of each processed tile through `write`, and is finalized with `close`. Sinks are
+    context managers, so they are closed when the `with` block exits. Subclasses implement
+    `write_band` and set `block_shape` to the rows and columns of their storage blocks, which
+    tiled processing aligns its tile windows to.
+    """
+    # rows and columns of the storage blocks of the sink, None when writes need no alignment
+    block_shape = None
+
+    def __init__(self, geometry: RasterGeometry, variables: List[str] = None):
+        if variables is None:
+            variables = FLIESANN_OUTPUT_VARIABLES
+
+        self.geometry = geometry
+        self.variables = list(variables)
+
+    @property
+    def shape(self) -> tuple:
+        return tuple(self.geometry.shape)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write(self, window: tuple, results: dict):
+        """
+        Write the results of one tile.
+
+        Args:
+            window (tuple): (row slice, column slice) of the tile within the target geometry.
+            results (dict): FLiESANN results for the tile, as Rasters or arrays.
+        """
+        for band, variable in enumerate(self.variables):
+            value = results[variable]
+            array = value.array if isinstance(value, Raster) else np.asarray(value)
+            self.write_band(band, variable, window, array.astype(np.float32, copy=False))
+
+    @abstractmethod
+    def write_band(self, band: int, variable: str, window: tuple, array: np.ndarray):
+        """
+        Write one variable of one tile.
+
+        Args:
+            band (int): Zero-based index of the variable in `variables`.
+            variable (str): Name of the variable.
+            window (tuple): (row slice, column slice) of the tile within the target geometry.
+            array (np.ndarray): float32 values of the tile.
+        """
+
+    def close(self):
+        pass
@@ -0,0 +1,186 @@
+import inspect
+import logging
+from contextlib import contextmanager
+from functools import wraps
+from time import perf_counter
+from typing import Callable
+
+import numpy as np
+from rasters import Raster
+
+logger = logging.getLogger(__name__)
+
+# registered hooks; replaced rather than mutated so that spans can iterate without locking
+_hooks = ()
+
+class FLiESANNHook:
+    """
+    Base class for tracing hooks invoked at the start and end of FLiESANN spans.
+
+    Spans cover calls to `FLiESANN`, `retrieve_FLiESANN_inputs`, `retrieve_FLiESANN_static_inputs`,
+    `retrieve_FLiESANN_GEOS5FP_inputs` and `run_FLiESANN_inference`, and each remote retrieval within
+    them. Span attributes include the geometry type, row count, variable name, bytes returned by a
+    retrieval and cache hits where known. Subclasses override either method; exceptions raised by a
+    hook are logged and do not interrupt processing.
+    """
+    def on_span_start(self, name: str, attributes: dict):
+        pass
+
+    def on_span_end(self, name: str, attributes: dict, duration_seconds: float, error: BaseException = None):
+        pass
+
+class _NullSpan:
+    # shared span used when no hooks are registered, so tracing costs one check per span
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+    def __bool__(self):
+        return False
+
+    def __setitem__(self, key, value):
+        pass
+
+_NULL_SPAN = _NullSpan()
+
+class _Span:
+    def __init__(self, name: str, attributes: dict, hooks: tuple):
+        self.name = name
+        self.attributes = attributes
+        self.hooks = hooks
+
+    def __enter__(self):
+        for hook in self.hooks:
+            try:
+                hook.on_span_start(self.name, self.attributes)
+            except Exception as e:
+                logger.exception(f"tracing hook failed at start of span {self.name}: {e}")
+
+        self.start_time = perf_counter()
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        duration_seconds = perf_counter() - self.start_time
+
+        for hook in self.hooks:
+            try:
+                hook.on_span_end(self.name, self.attributes, duration_seconds, exc_value)
+            except Exception as e:
+                logger.exception(f"tracing hook failed at end of span {self.name}: {e}")
+
+        return False
+
+    def __bool__(self):
+        return True
+
+    def __setitem__(self, key, value):
+        self.attributes[key] = value
+
+def register_FLiESANN_hook(hook: FLiESANNHook) -> FLiESANNHook:
+    """
+    Register a tracing hook for all subsequent FLiESANN spans in this process.
+
+    Args:
+        hook (FLiESANNHook): Hook to register.
+
+    Returns:
+        FLiESANNHook: The registered hook.
+    """
+    global _hooks
+    _hooks = _hooks + (hook,)
+
+    return hook
+
+def unregister_FLiESANN_hook(hook: FLiESANNHook):
+    """
+    Remove a previously registered tracing hook.
+
+    Args:
+        hook (FLiESANNHook): Hook to remove.
+    """
+    global _hooks
+    _hooks = tuple(registered for registered in _hooks if registered is not hook)
+
+@contextmanager
+def FLiESANN_hooks(*hooks: FLiESANNHook):
+    """
+    Register tracing hooks for the duration of a `with` block.
+
+    Args:
+        *hooks (FLiESANNHook): Hooks to register.
+    """
+    for hook in hooks:
+        register_FLiESANN_hook(hook)
+
+    try:
+        yield hooks
+    finally:
+        for hook in hooks:
+            unregister_FLiESANN_hook(hook)
+
+def trace_span(name: str, **attributes):
+    """
+    Open a span notifying the registered hooks at its start and end.
+
+    The span supports item assignment to add attributes before it ends, and is falsy when no hooks
+    are registered, so attributes that are costly to compute can be guarded with `if span:`.
+
+    Args:
+        name (str): Name of the span.
+        **attributes: Attributes passed to the hooks.
+
+    Returns:
+        Context manager for the span.
+    """
+    if not _hooks:
+        return _NULL_SPAN
+
+    return _Span(name, attributes, _hooks)
+
+def nbytes(value) -> int:
+    """
+    Size in bytes of a retrieved array, Raster or DataFrame, or 0 for other values.
+    """
+    if isinstance(value, Raster):
+        value = value.array
+
+    if hasattr(value, "memory_usage"):
+        return int(value.memory_usage(deep=True).sum())
+
+    return int(getattr(value, "nbytes", 0))
+
+def _call_attributes(arguments: dict) -> dict:
+    geometry = arguments.get("geometry")
+    attributes = {"geometry_type": type(geometry).__name__}
+
+    for key in ("albedo", "COT", "atype"):
+        value = arguments.get(key)
+
+        if value is not None:
+            attributes["rows"] = int(np.size(value.array if isinstance(value, Raster) else value))
+            break
+
+    return attributes
+
+def traced(function: Callable) -> Callable:
+    """
+    Wrap a function in a span named after it, with geometry type and row count attributes.
+
+    When no hooks are registered the wrapped function is called directly.
+    """
+    signature = inspect.signature(function)
+
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        if not _hooks:
+            return function(*args, **kwargs)
+
+        arguments = signature.bind_partial(*args, **kwargs).arguments
+
+        with trace_span(function.__name__, **_call_attributes(arguments)):
+            return function(*args, **kwargs)
+
+    return wrapper
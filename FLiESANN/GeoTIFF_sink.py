@@ -0,0 +1,71 @@
+from typing import List
+
+import numpy as np
+from rasters import RasterGeometry, RasterGrid
+
+from .constants import *
+from .FLiESANN_sink import FLiESANNSink
+
+class GeoTIFFSink(FLiESANNSink):
+    """
+    Streams FLiESANN results into a tiled, compressed multi-band float32 GeoTIFF.
+
+    Each output variable is written to its own band, named by the band description, and each tile
+    is written to its window as it arrives, so the full output arrays are never held in memory.
+
+    Args:
+        filename (str): Path of the GeoTIFF to create.
+        geometry (RasterGrid): Target raster grid.
+        variables (List[str], optional): Output variables, one band each. Defaults to FLIESANN_OUTPUT_VARIABLES.
+        block_size (int, optional): Internal tile size of the GeoTIFF in pixels. Defaults to 256.
+        compress (str, optional): GeoTIFF compression. Defaults to "zstd".
+
+    Raises:
+        TypeError: If the geometry is not a RasterGrid.
+    """
+    def __init__(
+            self,
+            filename: str,
+            geometry: RasterGrid,
+            variables: List[str] = None,
+            block_size: int = 256,
+            compress: str = "zstd"):
+        import rasterio
+
+        if not isinstance(geometry, RasterGrid):
+            raise TypeError(f"GeoTIFF output requires a RasterGrid, not {type(geometry)}")
+
+        super().__init__(geometry, variables)
+        self.filename = filename
+        self.block_shape = (block_size, block_size)
+
+        self.dataset = rasterio.open(
+            filename,
+            "w",
+            driver="GTiff",
+            width=geometry.cols,
+            height=geometry.rows,
+            count=len(self.variables),
+            dtype="float32",
+            crs=geometry.crs.to_wkt(),
+            transform=geometry.affine,
+            nodata=np.nan,
+            tiled=True,
+            blockxsize=block_size,
+            blockysize=block_size,
+            compress=compress,
+            BIGTIFF="IF_SAFER"
+        )
+
+        for band, variable in enumerate(self.variables, start=1):
+            self.dataset.set_band_description(band, variable)
+
+    def write_band(self, band: int, variable: str, window: tuple, array: np.ndarray):
+        from rasterio.windows import Window
+
+        rows, cols = window
+        self.dataset.write(array, indexes=band + 1, window=Window(cols.start, rows.start, cols.stop - cols.start, rows.stop - rows.start))
+
+    def close(self):
+        if not self.dataset.closed:
+            self.dataset.close()
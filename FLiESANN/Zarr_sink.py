@@ -0,0 +1,54 @@
+from typing import List
+
+import numpy as np
+from rasters import RasterGeometry, RasterGrid
+
+from .constants import *
+from .FLiESANN_sink import FLiESANNSink
+
+class ZarrSink(FLiESANNSink):
+    """
+    Streams FLiESANN results into a Zarr store with one chunked float32 array per output variable.
+
+    Arrays are chunked by `chunk_size` and filled with NaN until written, and each tile is written
+    to its window as it arrives. The CRS and affine transform of a RasterGrid are stored in the
+    group attributes. Requires the optional `zarr` package.
+
+    Args:
+        store (str): Path or store of the Zarr group to create.
+        geometry (RasterGeometry): Target raster geometry.
+        variables (List[str], optional): Output variables, one array each. Defaults to FLIESANN_OUTPUT_VARIABLES.
+        chunk_size (int, optional): Chunk size of the arrays in pixels. Defaults to 512.
+    """
+    def __init__(
+            self,
+            store,
+            geometry: RasterGeometry,
+            variables: List[str] = None,
+            chunk_size: int = 512):
+        import zarr
+
+        super().__init__(geometry, variables)
+        self.store = store
+        self.group = zarr.open_group(store, mode="w")
+
+        if isinstance(geometry, RasterGrid):
+            self.group.attrs["crs"] = geometry.crs.to_wkt()
+            self.group.attrs["transform"] = list(geometry.affine)[:6]
+
+        chunks = (min(chunk_size, self.shape[0]), min(chunk_size, self.shape[1]))
+        self.block_shape = chunks
+
+        self.arrays = {
+            variable: self.group.create_array(
+                name=variable,
+                shape=self.shape,
+                chunks=chunks,
+                dtype="float32",
+                fill_value=np.nan
+            )
+            for variable in self.variables
+        }
+
+    def write_band(self, band: int, variable: str, window: tuple, array: np.ndarray):
+        self.arrays[variable][window] = array
@@ -0,0 +1,355 @@
+import argparse
+import json
+import logging
+import subprocess
+import sys
+from datetime import datetime
+from math import ceil, sqrt
+from os.path import exists
+from time import perf_counter
+from typing import Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+import rasters as rt
+
+from .constants import *
+from .load_FLiESANN_model import load_FLiESANN_model
+from .prepare_FLiESANN_inputs import prepare_FLiESANN_inputs
+from .process_FLiESANN import FLiESANN
+from .process_FLiESANN_table import process_FLiESANN_table
+from .ECOv002_calval_FLiESANN_inputs import load_ECOv002_calval_FLiESANN_inputs
+from .FLiESANN_tracing import FLiESANNHook, FLiESANN_hooks
+from .fake_GEOS5FP import FakeGEOS5FP
+from .fake_NASADEM import FakeNASADEM
+from .FLiESANN_reduced_precision import FLiESANNReducedPrecision
+from .predict_FLiESANN_model import predict_FLiESANN_model
+from .process_FLiESANN_point import FLiESANN_point
+from .FLiESANN_point_engine import FLiESANNPointEngine
+
+logger = logging.getLogger(__name__)
+
+BENCHMARK_COLUMNS = ["benchmark", "size", "seconds", "throughput"]
+
+def _predict_keras(ANN_model, inputs_array: np.ndarray) -> np.ndarray:
+    return ANN_model.predict(inputs_array, verbose=0)
+
+def _predict_keras_direct(ANN_model, inputs_array: np.ndarray) -> np.ndarray:
+    return predict_FLiESANN_model(ANN_model, inputs_array)
+
+def _predict_float32(ANN_model, inputs_array: np.ndarray) -> np.ndarray:
+    return FLiESANNReducedPrecision.for_model(ANN_model, "float32").predict(inputs_array)
+
+def _predict_float16(ANN_model, inputs_array: np.ndarray) -> np.ndarray:
+    return FLiESANNReducedPrecision.for_model(ANN_model, "float16").predict(inputs_array)
+
+def _predict_int8(ANN_model, inputs_array: np.ndarray) -> np.ndarray:
+    return FLiESANNReducedPrecision.for_model(ANN_model, "int8").predict(inputs_array)
+
+# inference engines timed on the same prepared feature matrix
+INFERENCE_ENGINES: Dict[str, Callable] = {
+    "keras_predict": _predict_keras,
+    "keras_direct": _predict_keras_direct,
+    "numpy_float32": _predict_float32,
+    "numpy_float16": _predict_float16,
+    "numpy_int8": _predict_int8
+}
+
+def synthetic_FLiESANN_inputs(n_pixels: int, seed: int = 0) -> dict:
+    """
+    Generate a synthetic raster of FLiESANN inputs with every input given, for offline benchmarking.
+
+    Args:
+        n_pixels (int): Approximate number of pixels; the raster is the smallest near-square grid of at least this size.
+        seed (int, optional): Seed of the random generator. Defaults to 0.
+
+    Returns:
+        dict: Keyword arguments for `FLiESANN`, including a geographic `geometry` and `time_UTC`.
+    """
+    rows = max(int(sqrt(n_pixels)), 1)
+    cols = ceil(n_pixels / rows)
+    geometry = rt.RasterGrid(x_origin=-120, y_origin=40, cell_width=0.001, cell_height=-0.001, rows=rows, cols=cols)
+    rng = np.random.default_rng(seed)
+
+    def uniform(low: float, high: float) -> np.ndarray:
+        return rng.uniform(low, high, geometry.shape).astype(np.float32)
+
+    return {
+        "albedo": uniform(0.05, 0.4),
+        "COT": uniform(0, 20),
+        "AOT": uniform(0, 1),
+        "vapor_gccm": uniform(0, 5),
+        "ozone_cm": uniform(0.2, 0.5),
+        "elevation_m": uniform(0, 3000),
+        "KG_climate": rng.integers(1, 6, geometry.shape).astype(np.float32),
+        "geometry": geometry,
+        "time_UTC": datetime(2024, 7, 15, 20),
+        "offline_mode": True
+    }
+
+def _best_seconds(function: Callable, repeats: int) -> float:
+    timings = []
+
+    for _ in range(repeats):
+        start = perf_counter()
+        function()
+        timings.append(perf_counter() - start)
+
+    return min(timings)
+
+class _FLiESANNSpanTimer(FLiESANNHook):
+    # accumulates time spent inside FLiESANN calls, to separate table assembly from the model run
+    def __init__(self):
+        self.seconds = 0.0
+
+    def on_span_end(self, name, attributes, duration_seconds, error=None):
+        if name == "FLiESANN":
+            self.seconds += duration_seconds
+
+def benchmark_FLiESANN(
+        sizes: List[int] = None,
+        repeats: int = DEFAULT_BENCHMARK_REPEATS,
+        engines: List[str] = None,
+        include_import: bool = True,
+        include_table: bool = True,
+        ANN_model=None,
+        model_filename: str = MODEL_FILENAME) -> pd.DataFrame:
+    """
+    Benchmark the FLiESANN hot paths on synthetic rasters and the packaged cal/val table.
+
+    Every benchmark reports the fastest of `repeats` runs. The synthetic rasters and the cal/val table
+    provide every input, so no GEOS-5 FP, NASADEM or Köppen-Geiger data are retrieved. For each raster
+    size the benchmarks are:
+
+    - feature_preparation, post_processing, raster_wrapping: stages of a profiled `FLiESANN` run
+    - inference_<engine>: each engine in INFERENCE_ENGINES on the same prepared feature matrix
+    - FLiESANN: an unprofiled end-to-end `FLiESANN` run
+
+    Independent of size, import measures importing the package in a fresh interpreter and model_load
+    measures loading the model, and FLiESANN_point a batch of `FLiESANN_point` queries on a warm engine
+    (size is the number of queries). On the cal/val table, process_FLiESANN_table measures end-to-end table
+    processing, table_assembly the part of it spent outside `FLiESANN`, and table_retrieval the same
+    table with its atmospheric and elevation inputs retrieved from `FakeGEOS5FP` and `FakeNASADEM`.
+
+    Args:
+        sizes (List[int], optional): Raster sizes in pixels. Defaults to DEFAULT_BENCHMARK_SIZES; the larger
+            rasters of LARGE_BENCHMARK_SIZES are opt-in.
+        repeats (int, optional): Number of runs of each benchmark. Defaults to DEFAULT_BENCHMARK_REPEATS.
+        engines (List[str], optional): Inference engines to time. Defaults to all of INFERENCE_ENGINES.
+        include_import (bool, optional): Whether to time the package import. Defaults to True.
+        include_table (bool, optional): Whether to time cal/val table processing. Defaults to True.
+        ANN_model (optional): Pre-loaded ANN model. Loaded from `model_filename` if not given.
+        model_filename (str, optional): Filename of the ANN model.
+
+    Returns:
+        pd.DataFrame: One row per benchmark and size with benchmark, size, seconds and throughput
+            (size per second) columns.
+
+    Raises:
+        ValueError: If an unrecognized inference engine is requested.
+    """
+    if sizes is None:
+        sizes = DEFAULT_BENCHMARK_SIZES
+
+    if engines is None:
+        engines = list(INFERENCE_ENGINES)
+
+    for engine in engines:
+        if engine not in INFERENCE_ENGINES:
+            raise ValueError(f"unrecognized inference engine: {engine} (expected one of {', '.join(INFERENCE_ENGINES)})")
+
+    records = []
+
+    def record(benchmark: str, size: int, seconds: float):
+        logger.info(f"benchmark {benchmark} size {size}: {seconds:.4f} s ({size / seconds:.1f} per second)")
+        records.append({"benchmark": benchmark, "size": size, "seconds": seconds, "throughput": size / seconds})
+
+    if include_import:
+        record("import", 1, _best_seconds(lambda: subprocess.run([sys.executable, "-c", "import FLiESANN"], check=True), repeats))
+
+    record("model_load", 1, _best_seconds(lambda: load_FLiESANN_model(model_filename), repeats))
+
+    if ANN_model is None:
+        ANN_model = load_FLiESANN_model(model_filename)
+
+    point_engine = FLiESANNPointEngine(ANN_model)
+    point_inputs = {"albedo": 0.15, "COT": 0.5, "AOT": 0.1, "vapor_gccm": 1.0, "ozone_cm": 0.3, "elevation_m": 100.0, "KG_climate": 3}
+
+    def run_point_queries():
+        for _ in range(BENCHMARK_POINT_QUERIES):
+            FLiESANN_point(34.0, -118.0, datetime(2024, 7, 15, 20), engine=point_engine, **point_inputs)
+
+    record("FLiESANN_point", BENCHMARK_POINT_QUERIES, _best_seconds(run_point_queries, repeats))
+
+    for size in sizes:
+        inputs = synthetic_FLiESANN_inputs(size)
+        n_pixels = int(np.prod(inputs["geometry"].shape))
+        FLiESANN(ANN_model=ANN_model, **inputs)
+
+        stage_seconds = {}
+
+        for _ in range(repeats):
+            profile = FLiESANN(ANN_model=ANN_model, profile=True, **inputs)["profile"]
+
+            for stage, seconds in profile.groupby("stage").wall_seconds.sum().items():
+                stage_seconds[stage] = min(seconds, stage_seconds.get(stage, np.inf))
+
+        for stage in ["feature_preparation", "post_processing", "raster_wrapping"]:
+            record(stage, n_pixels, stage_seconds[stage])
+
+        inputs_array = prepare_FLiESANN_inputs(
+            atype=np.ones(n_pixels),
+            ctype=np.ones(n_pixels),
+            COT=inputs["COT"],
+            AOT=inputs["AOT"],
+            vapor_gccm=inputs["vapor_gccm"],
+            ozone_cm=inputs["ozone_cm"],
+            albedo=inputs["albedo"],
+            elevation_km=inputs["elevation_m"] / 1000,
+            SZA=np.full(n_pixels, 30, dtype=np.float32)
+        ).astype(np.float32).values
+
+        # match the (rows, 1, features) input of sequence-shaped models, as in run_FLiESANN_inference
+        if len(ANN_model.input_shape) == 3:
+            inputs_array = inputs_array[:, None, :]
+
+        for engine in engines:
+            predict = INFERENCE_ENGINES[engine]
+            predict(ANN_model, inputs_array)
+            record(f"inference_{engine}", n_pixels, _best_seconds(lambda: predict(ANN_model, inputs_array), repeats))
+
+        record("FLiESANN", n_pixels, _best_seconds(lambda: FLiESANN(ANN_model=ANN_model, **inputs), repeats))
+
+    if include_table:
+        input_df = load_ECOv002_calval_FLiESANN_inputs()
+        timer = _FLiESANNSpanTimer()
+        table_seconds = np.inf
+        assembly_seconds = np.inf
+
+        with FLiESANN_hooks(timer):
+            for _ in range(repeats):
+                timer.seconds = 0.0
+                start = perf_counter()
+                process_FLiESANN_table(input_df, offline_mode=True, ANN_model=ANN_model)
+                seconds = perf_counter() - start
+                table_seconds = min(table_seconds, seconds)
+                assembly_seconds = min(assembly_seconds, seconds - timer.seconds)
+
+        record("process_FLiESANN_table", len(input_df), table_seconds)
+        record("table_assembly", len(input_df), assembly_seconds)
+
+        # the retrieval path, with the remote inputs served by zero-latency stand-in connections
+        retrieval_df = input_df.drop(columns=[column for column in ["COT", "AOT", "vapor_gccm", "ozone_cm", "elevation_m"] if column in input_df])
+
+        record("table_retrieval", len(input_df), _best_seconds(lambda: process_FLiESANN_table(
+            retrieval_df,
+            GEOS5FP_connection=FakeGEOS5FP(),
+            NASADEM_connection=FakeNASADEM(),
+            ANN_model=ANN_model
+        ), repeats))
+
+    return pd.DataFrame(records, columns=BENCHMARK_COLUMNS)
+
+def load_FLiESANN_benchmark_baseline(filename: str = BENCHMARK_BASELINE_FILENAME) -> pd.DataFrame:
+    """
+    Load stored benchmark results to compare against.
+
+    Args:
+        filename (str, optional): JSON baseline file. Defaults to the baseline of the source tree.
+
+    Returns:
+        pd.DataFrame: Baseline benchmark results.
+
+    Raises:
+        FileNotFoundError: If there is no baseline, as in installed packages, which do not ship one.
+    """
+    if not exists(filename):
+        raise FileNotFoundError(f"no benchmark baseline at {filename}, record one with benchmark-FLiESANN --save-baseline")
+
+    with open(filename) as file:
+        return pd.DataFrame(json.load(file)["results"], columns=BENCHMARK_COLUMNS)
+
+def save_FLiESANN_benchmark_baseline(results: pd.DataFrame, filename: str = BENCHMARK_BASELINE_FILENAME):
+    """
+    Store benchmark results as the baseline for later comparisons.
+
+    Args:
+        results (pd.DataFrame): Results of `benchmark_FLiESANN`.
+        filename (str, optional): JSON baseline file. Defaults to the baseline of the source tree.
+    """
+    baseline = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "results": results[BENCHMARK_COLUMNS].to_dict(orient="records")
+    }
+
+    with open(filename, "w") as file:
+        json.dump(baseline, file, indent=2)
+
+def compare_FLiESANN_benchmark(
+        results: pd.DataFrame,
+        baseline: pd.DataFrame,
+        threshold: float = DEFAULT_BENCHMARK_THRESHOLD,
+        min_seconds: float = DEFAULT_BENCHMARK_MIN_SECONDS) -> pd.DataFrame:
+    """
+    Compare benchmark results against a baseline.
+
+    A benchmark regresses when it is slower than its baseline by more than `threshold` as a fraction
+    of the baseline time and by more than `min_seconds`, so that timer noise on very short benchmarks
+    is not reported. Benchmarks missing from the baseline are never regressions.
+
+    Args:
+        results (pd.DataFrame): Results of `benchmark_FLiESANN`.
+        baseline (pd.DataFrame): Baseline results.
+        threshold (float, optional): Allowed relative slowdown. Defaults to DEFAULT_BENCHMARK_THRESHOLD.
+        min_seconds (float, optional): Allowed absolute slowdown. Defaults to DEFAULT_BENCHMARK_MIN_SECONDS.
+
+    Returns:
+        pd.DataFrame: The results with baseline_seconds, ratio and regressed columns.
+    """
+    comparison = results.merge(
+        baseline[["benchmark", "size", "seconds"]].rename(columns={"seconds": "baseline_seconds"}),
+        on=["benchmark", "size"],
+        how="left"
+    )
+
+    comparison["ratio"] = comparison.seconds / comparison.baseline_seconds
+    comparison["regressed"] = (comparison.ratio > 1 + threshold) & (comparison.seconds - comparison.baseline_seconds > min_seconds)
+
+    return comparison
+
+def main():
+    """
+    Run the benchmarks, compare them to the baseline and exit with status 1 on regressions.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the FLiESANN hot paths against stored baselines.")
+    parser.add_argument("--sizes", type=float, nargs="+", default=DEFAULT_BENCHMARK_SIZES, help="raster sizes in pixels, e.g. 1e3 1e6")
+    parser.add_argument("--large", action="store_true", help=f"also run the large raster sizes {', '.join(f'{size:.0e}' for size in LARGE_BENCHMARK_SIZES)}")
+    parser.add_argument("--repeats", type=int, default=DEFAULT_BENCHMARK_REPEATS, help="runs of each benchmark")
+    parser.add_argument("--engines", nargs="+", default=None, help=f"inference engines ({', '.join(INFERENCE_ENGINES)})")
+    parser.add_argument("--baseline", default=BENCHMARK_BASELINE_FILENAME, help="baseline JSON file")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_BENCHMARK_THRESHOLD, help="allowed relative slowdown")
+    parser.add_argument("--save-baseline", action="store_true", help="store the results as the baseline instead of comparing")
+    args = parser.parse_args()
+
+    results = benchmark_FLiESANN(
+        sizes=[int(size) for size in args.sizes] + (LARGE_BENCHMARK_SIZES if args.large else []),
+        repeats=args.repeats,
+        engines=args.engines
+    )
+
+    if args.save_baseline:
+        save_FLiESANN_benchmark_baseline(results, args.baseline)
+        print(results.to_string(index=False))
+        print(f"saved baseline to {args.baseline}")
+        return
+
+    comparison = compare_FLiESANN_benchmark(results, load_FLiESANN_benchmark_baseline(args.baseline), threshold=args.threshold)
+    print(comparison.to_string(index=False))
+
+    if comparison.regressed.any():
+        print(f"benchmark regressions: {', '.join(comparison.benchmark[comparison.regressed])}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
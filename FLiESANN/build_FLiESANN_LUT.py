@@ -0,0 +1,117 @@
+import json
+import logging
+from os.path import expanduser, splitext
+from typing import Dict, List
+
+import numpy as np
+
+from .constants import *
+from .load_FLiESANN_model import load_FLiESANN_model
+from .predict_FLiESANN_model import predict_FLiESANN_model
+from .prepare_FLiESANN_inputs import prepare_FLiESANN_inputs
+from .hash_FLiESANN_model import hash_FLiESANN_model
+from .FLiESANN_LUT import FLiESANNLUT
+
+logger = logging.getLogger(__name__)
+
+def build_FLiESANN_LUT(
+        filename: str,
+        nodes: Dict[str, List[float]] = None,
+        ctypes: List[int] = None,
+        ANN_model=None,
+        model_filename: str = MODEL_FILENAME,
+        chunk_size: int = DEFAULT_LUT_BUILD_CHUNK_SIZE) -> FLiESANNLUT:
+    """
+    Tabulate the FLiES ANN on a grid of its continuous features for each cloud type.
+
+    The ANN is evaluated at every combination of the grid nodes of LUT_INPUTS for each cloud type in
+    `ctypes`. The outputs are written to a memory-mapped `.npy` file of shape (types, nodes..., 7) and
+    the grid is described in a `.json` file of the same name, with the hash of the weights of the
+    tabulated model, see `hash_FLiESANN_model`.
+
+    Args:
+        filename (str): Filename of the table, with or without the `.npy` extension.
+        nodes (Dict[str, List[float]], optional): Increasing grid nodes of each input in LUT_INPUTS.
+            Inputs that are not given use DEFAULT_LUT_NODES.
+        ctypes (List[int], optional): Cloud types to tabulate. Defaults to DEFAULT_LUT_CTYPES.
+        ANN_model (optional): Pre-loaded ANN model object. Defaults to None.
+        model_filename (str, optional): Filename of the ANN model to load. Defaults to MODEL_FILENAME.
+        chunk_size (int, optional): Number of grid nodes predicted at once. Defaults to DEFAULT_LUT_BUILD_CHUNK_SIZE.
+
+    Returns:
+        FLiESANNLUT: The lookup table emulator reading the new table.
+
+    Raises:
+        ValueError: If an input is not tabulated or its nodes are not increasing.
+    """
+    if ANN_model is None:
+        ANN_model = load_FLiESANN_model(model_filename)
+
+    if ctypes is None:
+        ctypes = DEFAULT_LUT_CTYPES
+
+    nodes = {**DEFAULT_LUT_NODES, **(nodes or {})}
+
+    for name, input_nodes in nodes.items():
+        if name not in LUT_INPUTS:
+            raise ValueError(f"unrecognized lookup table input: {name} (expected one of {', '.join(LUT_INPUTS)})")
+
+        if len(input_nodes) < 2 or np.any(np.diff(input_nodes) <= 0):
+            raise ValueError(f"lookup table nodes of {name} must be at least two increasing values")
+
+    grid = [np.asarray(nodes[name], dtype=np.float32) for name in LUT_INPUTS]
+    shape = tuple(len(input_nodes) for input_nodes in grid)
+    n_nodes = int(np.prod(shape))
+
+    filename = expanduser(filename)
+    base, extension = splitext(filename)
+
+    if extension != ".npy":
+        base = filename
+
+    table = np.lib.format.open_memmap(f"{base}.npy", mode="w+", dtype=np.float32, shape=(len(ctypes),) + shape + (len(ANN_OUTPUT_VARIABLES),))
+    rows = table.reshape(len(ctypes), n_nodes, -1)
+    patterns = []
+
+    logger.info(f"tabulating FLiESANN on {n_nodes} grid nodes for each of {len(ctypes)} cloud types")
+
+    for category, ctype in enumerate(ctypes):
+        for start in range(0, n_nodes, chunk_size):
+            stop = min(start + chunk_size, n_nodes)
+            index = np.unravel_index(np.arange(start, stop), shape)
+            values = {name: input_nodes[node_index] for name, input_nodes, node_index in zip(LUT_INPUTS, grid, index)}
+
+            features = prepare_FLiESANN_inputs(
+                atype=np.full(stop - start, ctype),
+                ctype=np.full(stop - start, ctype),
+                COT=values["COT"],
+                AOT=values["AOT"],
+                vapor_gccm=values["vapor_gccm"],
+                ozone_cm=values["ozone_cm"],
+                albedo=values["albedo"],
+                elevation_km=values["elevation_km"],
+                SZA=values["SZA"]
+            ).astype(np.float32).values
+
+            inputs_array = features[:, None, :] if len(ANN_model.input_shape) == 3 else features
+
+            rows[category, start:stop] = predict_FLiESANN_model(ANN_model, inputs_array).reshape(stop - start, -1)
+
+        patterns.append(features[0, :-len(LUT_INPUTS)].tolist())
+
+    table.flush()
+    del rows, table
+
+    metadata = {
+        "inputs": LUT_INPUTS,
+        "nodes": {name: input_nodes.tolist() for name, input_nodes in zip(LUT_INPUTS, grid)},
+        "ctypes": list(ctypes),
+        "patterns": patterns,
+        "outputs": ANN_OUTPUT_VARIABLES,
+        "model_hash": hash_FLiESANN_model(ANN_model)
+    }
+
+    with open(f"{base}.json", "w") as file:
+        json.dump(metadata, file, indent=2)
+
+    return FLiESANNLUT(f"{base}.npy", ANN_model=ANN_model)
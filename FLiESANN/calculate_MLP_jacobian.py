@@ -0,0 +1,98 @@
+import numpy as np
+
+from .constants import *
+
+def _activation(name: str, z: np.ndarray) -> tuple:
+    # activation values and their derivatives with respect to the pre-activation
+    if name == "linear":
+        return z, np.ones_like(z)
+    elif name == "relu":
+        return np.maximum(z, 0), (z > 0).astype(z.dtype)
+    elif name == "sigmoid":
+        a = 1 / (1 + np.exp(-z))
+        return a, a * (1 - a)
+    elif name == "tanh":
+        a = np.tanh(z)
+        return a, 1 - a * a
+    else:
+        raise ValueError(f"unsupported activation for forward-mode differentiation: {name}")
+
+def MLP_dense_layers(ANN_model) -> list:
+    """
+    Weights, biases and activations of a sequential model of Dense layers.
+
+    Args:
+        ANN_model: Keras Sequential model of Dense layers.
+
+    Returns:
+        list: (weights, bias, activation name) for each layer.
+
+    Raises:
+        ValueError: If the model has layers other than Dense.
+    """
+    layers = []
+
+    for layer in ANN_model.layers:
+        if type(layer).__name__ != "Dense":
+            raise ValueError(f"forward-mode differentiation supports Dense layers only, not {type(layer).__name__}")
+
+        weights, bias = layer.get_weights()
+        activation = layer.get_config()["activation"]
+
+        if isinstance(activation, dict):
+            activation = activation.get("config", {}).get("name", activation.get("class_name"))
+
+        layers.append((weights.astype(np.float32), bias.astype(np.float32), activation))
+
+    return layers
+
+def calculate_MLP_jacobian(
+        ANN_model,
+        inputs_array: np.ndarray,
+        input_columns: list,
+        tangent_scales: list = None,
+        chunk_size: int = DEFAULT_JACOBIAN_CHUNK_SIZE) -> tuple:
+    """
+    Evaluate a Dense MLP and its partial derivatives with respect to selected input columns in one forward-mode pass.
+
+    Tangents for every selected column are carried through the layers alongside the activations,
+    so the Jacobian costs one batched pass rather than two model evaluations per input. Rows are
+    processed in chunks to bound the memory of the (rows, inputs, units) tangent arrays.
+
+    Args:
+        ANN_model: Keras Sequential model of Dense layers.
+        inputs_array (np.ndarray): Feature matrix of shape (rows, features).
+        input_columns (list): Indices of the features to differentiate with respect to.
+        tangent_scales (list, optional): Derivative of each selected feature with respect to the
+            quantity of interest, e.g. 1/1000 for a feature in km differentiated per meter. Defaults to ones.
+        chunk_size (int, optional): Rows per chunk. Defaults to DEFAULT_JACOBIAN_CHUNK_SIZE.
+
+    Returns:
+        tuple: Outputs of shape (rows, outputs) and Jacobian of shape (rows, outputs, inputs).
+    """
+    layers = MLP_dense_layers(ANN_model)
+    inputs_array = np.asarray(inputs_array, dtype=np.float32)
+    n_rows, n_features = inputs_array.shape
+    n_inputs = len(input_columns)
+    n_outputs = layers[-1][0].shape[1]
+
+    # seed tangents: one unit direction per selected feature
+    seed = np.zeros((n_inputs, n_features), dtype=np.float32)
+    seed[np.arange(n_inputs), input_columns] = 1 if tangent_scales is None else tangent_scales
+
+    outputs = np.empty((n_rows, n_outputs), dtype=np.float32)
+    jacobian = np.empty((n_rows, n_outputs, n_inputs), dtype=np.float32)
+
+    for start in range(0, n_rows, chunk_size):
+        end = min(start + chunk_size, n_rows)
+        a = inputs_array[start:end]
+        tangents = np.broadcast_to(seed, (end - start, n_inputs, n_features))
+
+        for weights, bias, activation in layers:
+            a, derivative = _activation(activation, a @ weights + bias)
+            tangents = (tangents @ weights) * derivative[:, None, :]
+
+        outputs[start:end] = a
+        jacobian[start:end] = np.swapaxes(tangents, 1, 2)
+
+    return outputs, jacobian
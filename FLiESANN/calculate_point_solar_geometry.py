@@ -0,0 +1,40 @@
+from datetime import datetime, timezone
+
+from .calculate_solar_geometry import calculate_solar_declination, calculate_solar_zenith_angle
+
+def calculate_point_solar_geometry(lat: float, lon: float, time_UTC: datetime) -> tuple:
+    """
+    Calculate solar day of year, solar hour of day and solar zenith angle for one location and time.
+
+    This is the scalar counterpart of `calculate_solar_geometry` (mean solar time from longitude,
+    Duffie & Beckman declination) for point queries, sharing its declination and zenith angle formulas.
+
+    Args:
+        lat (float): Latitude in degrees.
+        lon (float): Longitude in degrees.
+        time_UTC (datetime): UTC time; aware datetimes are converted to UTC.
+
+    Returns:
+        tuple: day_of_year, hour_of_day and SZA_deg.
+    """
+    if time_UTC.tzinfo is not None:
+        time_UTC = time_UTC.astimezone(timezone.utc).replace(tzinfo=None)
+
+    hour_of_day = lon / 15 + time_UTC.hour + time_UTC.minute / 60 + time_UTC.second / 3600
+    day_of_year = time_UTC.timetuple().tm_yday
+
+    # local solar day shifts back or forward by one where solar time crosses midnight
+    if hour_of_day > 24:
+        hour_of_day -= 24
+        day_of_year += 1
+    elif hour_of_day < 0:
+        hour_of_day += 24
+        day_of_year -= 1
+
+    year = time_UTC.year
+    max_day = 366 if year % 4 == 0 and (year % 100 != 0 or year % 400 == 0) else 365
+    day_of_year = min(max(day_of_year, 1), max_day)
+
+    SZA_deg = calculate_solar_zenith_angle(lat, calculate_solar_declination(day_of_year), hour_of_day)
+
+    return day_of_year, hour_of_day, SZA_deg
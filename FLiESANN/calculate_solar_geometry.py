@@ -0,0 +1,193 @@
+import math
+from collections import OrderedDict
+from datetime import datetime
+from threading import Lock
+from typing import Union
+
+import numpy as np
+import pandas as pd
+from rasters import RasterGeometry, RasterGrid
+
+from .constants import *
+from .FLiESANN_tracing import trace_span
+
+# per-geometry coordinate grids, most recently used last
+_solar_geometry_grids = OrderedDict()
+_solar_geometry_grids_lock = Lock()
+
+def _geometry_key(geometry: RasterGeometry):
+    # regular grids are identified by their CRS, transform and shape, so that
+    # separately constructed geometries of the same tile share one cache entry
+    if isinstance(geometry, RasterGrid):
+        return (str(geometry.crs), tuple(geometry.affine), geometry.shape)
+
+    return None
+
+def load_solar_geometry_grids(geometry: RasterGeometry) -> dict:
+    """
+    Load the float32 latitude and longitude-offset grids used for solar geometry on a raster.
+
+    Grids for regular raster grids are cached by CRS, affine transform and shape, keeping up to
+    SOLAR_GEOMETRY_CACHE_SIZE geometries, so repeated runs over the same tile do not regenerate
+    the latitude/longitude arrays. Other raster geometries (e.g. swath geolocation arrays) are
+    computed on every call.
+
+    Args:
+        geometry (RasterGeometry): Target raster geometry.
+
+    Returns:
+        dict: Dictionary of arrays in the shape of the geometry:
+            - sin_lat: Sine of latitude.
+            - cos_lat: Cosine of latitude.
+            - lon_offset_hours: Longitude offset of solar time from UTC in hours.
+    """
+    key = _geometry_key(geometry)
+
+    with trace_span("solar_geometry_grids") as span:
+        grids = None
+
+        if key is not None:
+            with _solar_geometry_grids_lock:
+                grids = _solar_geometry_grids.get(key)
+
+                if grids is not None:
+                    _solar_geometry_grids.move_to_end(key)
+
+        span["cache_hit"] = grids is not None
+
+        if grids is not None:
+            return grids
+
+        lat_rad = np.radians(geometry.lat).astype(np.float32)
+        lon_offset_hours = (np.asarray(geometry.lon) / 15.0).astype(np.float32)
+
+        grids = {
+            "sin_lat": np.sin(lat_rad),
+            "cos_lat": np.cos(lat_rad),
+            "lon_offset_hours": lon_offset_hours
+        }
+
+        if key is not None:
+            with _solar_geometry_grids_lock:
+                _solar_geometry_grids[key] = grids
+                _solar_geometry_grids.move_to_end(key)
+
+                while len(_solar_geometry_grids) > SOLAR_GEOMETRY_CACHE_SIZE:
+                    _solar_geometry_grids.popitem(last=False)
+
+        return grids
+
+def _is_scalar(*values) -> bool:
+    # plain numbers are evaluated with math, which is several times faster than NumPy on scalars
+    return all(isinstance(value, (int, float)) for value in values)
+
+def calculate_solar_declination(day_of_year: Union[np.ndarray, float]) -> Union[np.ndarray, float]:
+    """
+    Calculate the solar declination with the Duffie & Beckman (2013) series, as used by sun_angles.
+
+    Args:
+        day_of_year (Union[np.ndarray, float]): Solar day of year.
+
+    Returns:
+        Union[np.ndarray, float]: Solar declination in radians, a float for a scalar day of year.
+    """
+    sin, cos = (math.sin, math.cos) if _is_scalar(day_of_year) else (np.sin, np.cos)
+    day_angle_rad = 2 * math.pi * (day_of_year - 1) / 365
+
+    return (0.006918 - 0.399912 * cos(day_angle_rad) + 0.070257 * sin(day_angle_rad)
+            - 0.006758 * cos(2 * day_angle_rad) + 0.000907 * sin(2 * day_angle_rad)
+            - 0.002697 * cos(3 * day_angle_rad) + 0.00148 * sin(3 * day_angle_rad))
+
+def calculate_solar_zenith_angle(
+        lat: Union[np.ndarray, float],
+        declination_rad: Union[np.ndarray, float],
+        hour_of_day: Union[np.ndarray, float]) -> Union[np.ndarray, float]:
+    """
+    Calculate the solar zenith angle from latitude, solar declination and solar hour of day.
+
+    Args:
+        lat (Union[np.ndarray, float]): Latitude in degrees.
+        declination_rad (Union[np.ndarray, float]): Solar declination in radians.
+        hour_of_day (Union[np.ndarray, float]): Solar hour of day.
+
+    Returns:
+        Union[np.ndarray, float]: Solar zenith angle in degrees, a float for scalar inputs.
+    """
+    if _is_scalar(lat, declination_rad, hour_of_day):
+        sin, cos, arccos, radians, degrees = math.sin, math.cos, math.acos, math.radians, math.degrees
+        clip = lambda value, lower, upper: min(max(value, lower), upper)
+    else:
+        sin, cos, arccos, radians, degrees, clip = np.sin, np.cos, np.arccos, np.radians, np.degrees, np.clip
+
+    lat_rad = radians(lat)
+    cos_SZA = sin(lat_rad) * sin(declination_rad) + cos(lat_rad) * cos(declination_rad) * cos(radians(hour_of_day * 15 - 180))
+
+    return degrees(arccos(clip(cos_SZA, -1, 1)))
+
+def calculate_solar_geometry(
+        time_UTC: Union[datetime, str],
+        geometry: RasterGeometry) -> dict:
+    """
+    Calculate solar day of year, solar hour of day and solar zenith angle over a raster for one time.
+
+    This reproduces `calculate_solar_day_of_year`, `calculate_solar_hour_of_day` and
+    `calculate_SZA_from_DOY_and_hour` (mean solar time from longitude, Duffie & Beckman
+    declination) in float32. The coordinate grids come from the per-geometry cache. The
+    declination is evaluated once per timestamp for each of the (at most three) local solar
+    days spanned by the raster, and only the per-pixel terms are evaluated over the grid,
+    reusing buffers in place.
+
+    Args:
+        time_UTC (Union[datetime, str]): UTC time of the calculation.
+        geometry (RasterGeometry): Target raster geometry.
+
+    Returns:
+        dict: Dictionary of float32 arrays in the shape of the geometry:
+            - day_of_year: Solar day of year.
+            - hour_of_day: Solar hour of day.
+            - SZA_deg: Solar zenith angle in degrees.
+    """
+    time_UTC = pd.Timestamp(time_UTC)
+
+    if time_UTC.tzinfo is not None:
+        time_UTC = time_UTC.tz_convert("UTC").tz_localize(None)
+
+    grids = load_solar_geometry_grids(geometry)
+    hour_UTC = time_UTC.hour + time_UTC.minute / 60 + time_UTC.second / 3600
+    day_of_year_UTC = time_UTC.dayofyear
+    max_day = 366 if time_UTC.is_leap_year else 365
+
+    hour_of_day = grids["lon_offset_hours"] + np.float32(hour_UTC)
+
+    # local solar day shifts back or forward by one where solar time crosses midnight
+    day_shift = (hour_of_day > 24).astype(np.int8)
+    day_shift -= (hour_of_day < 0)
+    hour_of_day[hour_of_day < 0] += 24
+    hour_of_day[hour_of_day > 24] -= 24
+
+    day_of_year = day_shift.astype(np.float32)
+    day_of_year += day_of_year_UTC
+    np.clip(day_of_year, 1, max_day, out=day_of_year)
+
+    # declination for the previous, current and next day, gathered per pixel
+    declinations = calculate_solar_declination(np.clip(day_of_year_UTC + np.arange(-1, 2), 1, max_day))
+
+    day_index = day_shift + 1
+    sin_dec = np.sin(declinations).astype(np.float32)[day_index]
+    cos_dec = np.cos(declinations).astype(np.float32)[day_index]
+
+    # calculate_solar_zenith_angle evaluated in place on float32 buffers
+    cos_SZA = np.radians(hour_of_day * np.float32(15.0) - np.float32(180.0))
+    np.cos(cos_SZA, out=cos_SZA)
+    cos_SZA *= cos_dec
+    cos_SZA *= grids["cos_lat"]
+    sin_dec *= grids["sin_lat"]
+    cos_SZA += sin_dec
+    np.clip(cos_SZA, -1, 1, out=cos_SZA)
+    SZA_deg = np.degrees(np.arccos(cos_SZA, out=cos_SZA), out=cos_SZA)
+
+    return {
+        "day_of_year": day_of_year,
+        "hour_of_day": hour_of_day,
+        "SZA_deg": SZA_deg
+    }
@@ -0,0 +1,23 @@
+import warnings
+
+with warnings.catch_warnings():
+    warnings.simplefilter("ignore")
+    from keras.models import clone_model
+
+def clone_FLiESANN_model(ANN_model):
+    """
+    Copy a loaded ANN model into an independent model with the same architecture and weights.
+
+    Keras models are not safe to call from several threads at once, so threads that run inference
+    concurrently each work on their own copy.
+
+    Args:
+        ANN_model: Loaded ANN model object.
+
+    Returns:
+        The copied model.
+    """
+    clone = clone_model(ANN_model)
+    clone.set_weights(ANN_model.get_weights())
+
+    return clone
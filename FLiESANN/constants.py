@@ -17,3 +17,126 @@ DEFAULT_SHOW_DISTRIBUTION = True
 DEFAULT_DYNAMIC_ATYPE_CTYPE = False
 
 GEOS5FP_INPUTS = ["COT", "AOT", "vapor_gccm", "ozone_cm", "PAR_albedo", "NIR_albedo"]
+
+DEFAULT_CHECKPOINT_CHUNK_SIZE = 1000
+# table partitions per worker process, so workers that finish early pick up the remaining partitions
+PARTITIONS_PER_WORKER = 4
+SOLAR_GEOMETRY_CACHE_SIZE = 8
+DEFAULT_TILE_SIZE = 1024
+# tiles submitted per worker ahead of completion, bounding the tile inputs and results held in memory
+TILES_IN_FLIGHT_PER_WORKER = 2
+DEFAULT_DAILY_QUADRATURE_NODES = 6
+DEFAULT_DAILY_DENSE_NODES = 96
+
+# radiation outputs of FLiESANN, in the order they are stacked in multi-band outputs
+FLIESANN_OUTPUT_VARIABLES = [
+    "SWin_Wm2",
+    "SWin_TOA_Wm2",
+    "SWout_Wm2",
+    "UV_Wm2",
+    "PAR_Wm2",
+    "NIR_Wm2",
+    "PAR_diffuse_Wm2",
+    "NIR_diffuse_Wm2",
+    "PAR_direct_Wm2",
+    "NIR_direct_Wm2",
+    "atmospheric_transmittance",
+    "UV_proportion",
+    "PAR_proportion",
+    "NIR_proportion",
+    "UV_diffuse_fraction",
+    "PAR_diffuse_fraction",
+    "NIR_diffuse_fraction"
+]
+
+# columns of the ANN outputs, in model output order
+ANN_OUTPUT_VARIABLES = [
+    "atmospheric_transmittance",
+    "UV_proportion",
+    "PAR_proportion",
+    "NIR_proportion",
+    "UV_diffuse_fraction",
+    "PAR_diffuse_fraction",
+    "NIR_diffuse_fraction"
+]
+
+FLIESANN_NDVI_OUTPUT_VARIABLES = [
+    "PAR_reflected_Wm2",
+    "NIR_reflected_Wm2",
+    "PAR_albedo",
+    "NIR_albedo"
+]
+
+DEFAULT_BENCHMARK_SIZES = [1000, 100000]
+# opt-in tier of large synthetic rasters (benchmark-FLiESANN --large), 1e8 pixels needs tens of GB of memory
+LARGE_BENCHMARK_SIZES = [1000000, 10000000, 100000000]
+DEFAULT_BENCHMARK_REPEATS = 3
+# a benchmark regresses when it is slower than its baseline by this fraction and by at least the minimum seconds
+DEFAULT_BENCHMARK_THRESHOLD = 0.25
+DEFAULT_BENCHMARK_MIN_SECONDS = 0.01
+# FLiESANN_point calls per timing of the point benchmark
+BENCHMARK_POINT_QUERIES = 1000
+# machine-specific baseline kept in the source tree and excluded from the wheel
+BENCHMARK_BASELINE_FILENAME = join(abspath(dirname(__file__)), "FLiESANN_benchmark_baseline.json")
+
+DEFAULT_JACOBIAN_CHUNK_SIZE = 65536
+# inputs of FLiESANN_sensitivity, differentiated per unit of the input (per meter of elevation, per degree of SZA)
+SENSITIVITY_INPUTS = ["COT", "AOT", "vapor_gccm", "ozone_cm", "albedo", "elevation_m", "SZA_deg"]
+
+DEFAULT_ENSEMBLE_MEMBERS = 100
+DEFAULT_ENSEMBLE_QUANTILES = [0.05, 0.5, 0.95]
+# rows of stacked ensemble members per inference batch
+DEFAULT_ENSEMBLE_CHUNK_SIZE = 1000000
+# physical limits that perturbed inputs are clipped to
+ENSEMBLE_INPUT_LIMITS = {
+    "albedo": (0, 1),
+    "COT": (0, None),
+    "AOT": (0, None),
+    "vapor_gccm": (0, None),
+    "ozone_cm": (0, None),
+    "elevation_m": (None, None),
+    "SZA_deg": (0, 90),
+    "NDVI": (-1, 1)
+}
+
+DEFAULT_CACHE_SIZE = 1000000
+DEFAULT_CACHE_QUANTIZATION_STEP = 1e-4
+
+# continuous ANN features tabulated by the lookup table emulator, in feature matrix order
+LUT_INPUTS = ["COT", "AOT", "vapor_gccm", "ozone_cm", "albedo", "elevation_km", "SZA"]
+# grid nodes of each tabulated feature, inputs outside the nodes are clamped to the first or last node
+DEFAULT_LUT_NODES = {
+    "COT": [0, 0.5, 1, 2, 4, 8, 16, 32, 64],
+    "AOT": [0, 0.1, 0.2, 0.4, 0.7, 1],
+    "vapor_gccm": [0, 1, 2, 3.5, 5, 7],
+    "ozone_cm": [0.2, 0.3, 0.4, 0.5],
+    "albedo": [0, 0.1, 0.2, 0.4, 0.7, 1],
+    "elevation_km": [-0.5, 0, 1, 2, 3.5, 5],
+    "SZA": [0, 10, 20, 30, 40, 50, 60, 70, 80, 90]
+}
+# cloud types tabulated by the lookup table emulator, one table per type
+DEFAULT_LUT_CTYPES = [0, 1, 3]
+DEFAULT_LUT_CHUNK_SIZE = 2048
+# grid nodes predicted at once while tabulating the lookup table
+DEFAULT_LUT_BUILD_CHUNK_SIZE = 65536
+
+# reduced-precision inference engines, see FLiESANNReducedPrecision
+REDUCED_PRECISIONS = ["float16", "int8"]
+DEFAULT_REDUCED_PRECISION_CHUNK_SIZE = 65536
+# precisions of the NumPy inference engine, float32 reproduces the Keras model
+NUMPY_PRECISIONS = ["float32"] + REDUCED_PRECISIONS
+# leading one-hot aerosol and cloud type columns of the split feature matrix
+N_CATEGORY_FEATURES = 7
+
+# rows per call of the traced model, bounding the memory of the activations
+DEFAULT_INFERENCE_BATCH_SIZE = 65536
+
+# local inference server, see FLiESANNServer
+DEFAULT_SERVER_HOST = "127.0.0.1"
+DEFAULT_SERVER_PORT = 8765
+DEFAULT_SERVER_BATCH_SIZE = 512
+DEFAULT_SERVER_LATENCY_SECONDS = 0.005
+# pending connections of the listening socket, above the default so bursts of local clients are not refused
+DEFAULT_SERVER_BACKLOG = 1024
+# recent requests covered by the latency percentiles of the server metrics
+DEFAULT_SERVER_METRICS_WINDOW = 10000
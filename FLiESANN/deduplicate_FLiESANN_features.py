@@ -0,0 +1,26 @@
+import numpy as np
+
+def deduplicate_FLiESANN_features(inputs_array: np.ndarray, tolerance: float = None) -> tuple:
+    """
+    Find the unique rows of an ANN feature matrix.
+
+    Rows are compared bit for bit, or, with a tolerance, after rounding every feature to a multiple
+    of the tolerance. Each group of matching rows is represented by its first row, so with a tolerance
+    the outputs of a group are those of its first member.
+
+    Args:
+        inputs_array (np.ndarray): Feature matrix of shape (rows, features).
+        tolerance (float, optional): Quantization step of the features. Defaults to None (exact).
+
+    Returns:
+        tuple: The unique rows and the inverse index mapping every row to its unique row,
+            such that `unique_rows[inverse]` reconstructs the (quantized) matrix.
+    """
+    inputs_array = np.ascontiguousarray(inputs_array)
+    keys = inputs_array if tolerance is None else np.ascontiguousarray(np.round(inputs_array / tolerance))
+
+    # compare whole rows as opaque byte strings, which sorts faster than np.unique over axis 0
+    rows = keys.view(np.dtype((np.void, keys.dtype.itemsize * keys.shape[1]))).ravel()
+    _, index, inverse = np.unique(rows, return_index=True, return_inverse=True)
+
+    return inputs_array[index], inverse.ravel()
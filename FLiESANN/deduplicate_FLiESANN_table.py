@@ -0,0 +1,39 @@
+from typing import Tuple
+
+import numpy as np
+from pandas import DataFrame
+
+# columns that determine the inputs retrieved for a row of a FLiESANN table
+TABLE_KEY_COLUMNS = [
+    "geometry",
+    "lat",
+    "lon",
+    "time_UTC"
+]
+
+def deduplicate_FLiESANN_table(input_df: DataFrame) -> Tuple[DataFrame, np.ndarray]:
+    """
+    Collapse rows of a FLiESANN input table that share the same retrieval key.
+
+    Rows are considered identical when they have the same location and time, the key under
+    which GEOS-5 FP, NASADEM and Köppen-Geiger inputs are retrieved (missing values compare
+    equal). Rows that share a location and time but differ in an input such as albedo share
+    one key, so their inputs are retrieved once and broadcast back to every row.
+
+    Args:
+        input_df (pd.DataFrame): Table of FLiESANN inputs.
+
+    Returns:
+        Tuple[pd.DataFrame, np.ndarray]: The first occurrence of each location and time, in order
+            of appearance, and the inverse index mapping each input row to its unique row.
+    """
+    key_columns = [column for column in TABLE_KEY_COLUMNS if column in input_df.columns]
+
+    if len(key_columns) == 0:
+        return input_df, np.arange(len(input_df))
+
+    inverse = input_df[key_columns].groupby(key_columns, sort=False, dropna=False).ngroup().to_numpy()
+    unique_positions = np.unique(inverse, return_index=True)[1]
+    unique_df = input_df.iloc[unique_positions]
+
+    return unique_df, inverse
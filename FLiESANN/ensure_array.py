@@ -54,9 +54,9 @@ def ensure_array(value, shape=None):
         # (other columns might be metadata like lat, lon, lat_used, lon_used)
         if len(value.columns) > 1:
             # Extract just the first column (the data column)
-            value_array = value.iloc[:, 0].values.astype(np.float32)
+            value_array = value.iloc[:, 0].values.astype(np.float32, copy=False)
         else:
-            value_array = value.values.astype(np.float32).squeeze()
+            value_array = value.values.astype(np.float32, copy=False).squeeze()
         
         # If shape is provided and doesn't match, try to broadcast
         if shape is not None and value_array.shape != shape:
@@ -82,7 +82,8 @@ def ensure_array(value, shape=None):
             value_copy[value_copy == None] = np.nan
             value_array = value_copy.astype(np.float32)
         else:
-            value_array = value.astype(np.float32)
+            # Avoid copying arrays that are already float32
+            value_array = value.astype(np.float32, copy=False)
         
         # Broadcast array to target shape if needed
         if shape is not None and value_array.shape != shape:
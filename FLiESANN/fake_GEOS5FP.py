@@ -0,0 +1,85 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import rasters as rt
+from rasters import RasterGeometry
+
+from .fake_connection import FakeConnection, geometry_coordinates
+
+class FakeGEOS5FP(FakeConnection):
+    """
+    Stand-in for a `GEOS5FP` connection serving the atmospheric variables FLiESANN retrieves.
+
+    Results follow the shapes returned by GEOS5FP: a Raster for a raster geometry, an array for a
+    point or for a multi-point at one time, and for a multi-point at several times a DataFrame with
+    one row per unique time and location, ordered by time and then location, with the variable in
+    the first column followed by the lat, lon, lat_used and lon_used metadata columns. The synthetic fields vary smoothly with
+    latitude, longitude and time of day within the typical range of each variable.
+
+    Args:
+        latency_seconds (float, optional): Simulated latency of each request. Defaults to 0.
+        bandwidth_bytes_per_second (float, optional): Simulated bandwidth. Defaults to None (unlimited).
+        fields (Dict[str, Union[float, Callable]], optional): Fixture fields by variable name, as constants
+            or functions of latitude, longitude and time. Defaults to the synthetic fields.
+    """
+    def synthetic_field(self, variable: str, lat: np.ndarray, lon: np.ndarray, time_UTC: datetime) -> np.ndarray:
+        hour = 0 if time_UTC is None else time_UTC.hour + time_UTC.minute / 60
+        phase = np.radians(lat * 3 + lon * 2) + hour / 24 * 2 * np.pi
+        wave = (1 + np.sin(phase)) / 2
+
+        if variable == "COT":
+            return 20 * wave ** 2
+        elif variable == "AOT":
+            return 0.05 + 0.4 * wave
+        elif variable == "vapor_gccm":
+            return 0.5 + 4 * np.cos(np.radians(lat)) ** 2 * wave
+        elif variable == "ozone_cm":
+            return 0.25 + 0.1 * np.abs(np.sin(np.radians(lat)))
+        else:
+            return super().synthetic_field(variable, lat, lon, time_UTC)
+
+    def query(self, target_variables: str, time_UTC, geometry=None, resampling: str = None):
+        """
+        Serve a variable for a geometry at one or several times, simulating the transfer.
+        """
+        variable = target_variables
+        lat, lon = geometry_coordinates(geometry)
+        times = pd.to_datetime(pd.Series(np.atleast_1d(time_UTC)))
+
+        if isinstance(geometry, RasterGeometry) or times.nunique() == 1:
+            values = self.field(variable, lat, lon, times.iloc[0].to_pydatetime())
+            result = rt.Raster(values, geometry=geometry) if isinstance(geometry, RasterGeometry) else values
+            nbytes = values.nbytes
+        else:
+            # GEOS5FP queries each unique time for every location
+            unique_times = sorted(times.unique())
+
+            result = pd.concat([
+                pd.DataFrame({
+                    variable: self.field(variable, lat, lon, time.to_pydatetime()),
+                    "lat": lat,
+                    "lon": lon,
+                    "lat_used": lat,
+                    "lon_used": lon
+                })
+                for time in unique_times
+            ], ignore_index=True)
+
+            nbytes = int(result.memory_usage(deep=True).sum())
+
+        self.transfer(variable, nbytes)
+
+        return result
+
+    def COT(self, time_UTC, geometry=None, resampling: str = None):
+        return self.query("COT", time_UTC=time_UTC, geometry=geometry, resampling=resampling)
+
+    def AOT(self, time_UTC, geometry=None, resampling: str = None):
+        return self.query("AOT", time_UTC=time_UTC, geometry=geometry, resampling=resampling)
+
+    def vapor_gccm(self, time_UTC, geometry=None, resampling: str = None):
+        return self.query("vapor_gccm", time_UTC=time_UTC, geometry=geometry, resampling=resampling)
+
+    def ozone_cm(self, time_UTC, geometry=None, resampling: str = None):
+        return self.query("ozone_cm", time_UTC=time_UTC, geometry=geometry, resampling=resampling)
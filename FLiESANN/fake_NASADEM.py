@@ -0,0 +1,34 @@
+from datetime import datetime
+
+import numpy as np
+import rasters as rt
+from rasters import RasterGeometry
+
+from .fake_connection import FakeConnection, geometry_coordinates
+
+class FakeNASADEM(FakeConnection):
+    """
+    Stand-in for a `NASADEMConnection` serving elevation, as a Raster for a raster geometry and an
+    array for points. The synthetic elevation_km field is smooth terrain between 0 and 3 km.
+
+    Args:
+        latency_seconds (float, optional): Simulated latency of each request. Defaults to 0.
+        bandwidth_bytes_per_second (float, optional): Simulated bandwidth. Defaults to None (unlimited).
+        fields (Dict[str, Union[float, Callable]], optional): Fixture `elevation_km` field, as a constant
+            or a function of latitude, longitude and time. Defaults to the synthetic field.
+    """
+    def synthetic_field(self, variable: str, lat: np.ndarray, lon: np.ndarray, time_UTC: datetime) -> np.ndarray:
+        if variable == "elevation_km":
+            return 1.5 * (1 + np.sin(np.radians(lat * 7)) * np.cos(np.radians(lon * 5)))
+        else:
+            return super().synthetic_field(variable, lat, lon, time_UTC)
+
+    def elevation_km(self, geometry):
+        lat, lon = geometry_coordinates(geometry)
+        values = self.field("elevation_km", lat, lon)
+        self.transfer("elevation_km", values.nbytes)
+
+        return rt.Raster(values, geometry=geometry) if isinstance(geometry, RasterGeometry) else values
+
+    def elevation_m(self, geometry):
+        return self.elevation_km(geometry) * 1000
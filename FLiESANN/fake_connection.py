@@ -0,0 +1,106 @@
+import logging
+from collections import Counter
+from datetime import datetime
+from time import sleep
+from typing import Callable, Dict, Union
+
+import numpy as np
+import rasters as rt
+from rasters import RasterGeometry
+import shapely
+
+logger = logging.getLogger(__name__)
+
+def geometry_coordinates(geometry) -> tuple:
+    """
+    Latitude and longitude arrays of a raster, point or multi-point geometry.
+
+    Args:
+        geometry (Union[RasterGeometry, Point, MultiPoint]): Geometry in geographic coordinates.
+
+    Returns:
+        tuple: Latitude and longitude arrays in the shape of the geometry, (1,) for a point.
+
+    Raises:
+        TypeError: If the geometry type is not supported.
+    """
+    if isinstance(geometry, RasterGeometry):
+        return np.asarray(geometry.lat, dtype=np.float64), np.asarray(geometry.lon, dtype=np.float64)
+    elif isinstance(geometry, (shapely.geometry.MultiPoint, rt.MultiPoint)):
+        return np.array([point.y for point in geometry.geoms]), np.array([point.x for point in geometry.geoms])
+    elif isinstance(geometry, (shapely.geometry.Point, rt.Point)):
+        return np.array([geometry.y]), np.array([geometry.x])
+    else:
+        raise TypeError(f"geometry must be a RasterGeometry, Point or MultiPoint, not {type(geometry)}")
+
+class FakeConnection:
+    """
+    Base class of the stand-in data connections, serving synthetic or fixture fields without network access.
+
+    Each request sleeps for `latency_seconds` plus the size of the served data divided by
+    `bandwidth_bytes_per_second`, and is counted per method in `calls` with the bytes served
+    accumulated in `bytes_served`. Fields are served from `fields`, mapping a variable name to a
+    constant or to a function of latitude, longitude and time returning an array in the shape of
+    the coordinates, and otherwise from the synthetic field of the subclass.
+    """
+    def __init__(
+            self,
+            latency_seconds: float = 0,
+            bandwidth_bytes_per_second: float = None,
+            fields: Dict[str, Union[float, Callable]] = None):
+        self.latency_seconds = latency_seconds
+        self.bandwidth_bytes_per_second = bandwidth_bytes_per_second
+        self.fields = {} if fields is None else dict(fields)
+        self.calls = Counter()
+        self.bytes_served = 0
+
+    def reset(self):
+        """
+        Reset the call and byte counters.
+        """
+        self.calls.clear()
+        self.bytes_served = 0
+
+    def synthetic_field(self, variable: str, lat: np.ndarray, lon: np.ndarray, time_UTC: datetime) -> np.ndarray:
+        """
+        Synthetic values of a variable, extended by subclasses for the variables they serve.
+
+        Raises:
+            ValueError: For a variable without a synthetic or fixture field.
+        """
+        raise ValueError(f"{type(self).__name__} has no synthetic or fixture field for {variable}")
+
+    def field(self, variable: str, lat: np.ndarray, lon: np.ndarray, time_UTC: datetime = None) -> np.ndarray:
+        """
+        Values of a variable at the given coordinates and time, from the fixture fields or the synthetic field.
+        """
+        field = self.fields.get(variable)
+
+        if field is None:
+            values = self.synthetic_field(variable, lat, lon, time_UTC)
+        elif callable(field):
+            values = field(lat, lon, time_UTC)
+        else:
+            values = np.full(lat.shape, field)
+
+        return np.asarray(values, dtype=np.float32)
+
+    def transfer(self, method: str, nbytes: int):
+        """
+        Count a request and simulate its latency and transfer time.
+
+        Args:
+            method (str): Name of the requested method.
+            nbytes (int): Size of the served data in bytes.
+        """
+        self.calls[method] += 1
+        self.bytes_served += nbytes
+        delay = self.latency_seconds
+
+        if self.bandwidth_bytes_per_second:
+            delay += nbytes / self.bandwidth_bytes_per_second
+
+        logger.debug(f"{type(self).__name__}.{method} served {nbytes} bytes in {delay:.4f} s")
+
+        if delay > 0:
+            sleep(delay)
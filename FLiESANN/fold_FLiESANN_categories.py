@@ -0,0 +1,44 @@
+import numpy as np
+
+from .constants import *
+
+def fold_FLiESANN_categories(
+        weights: np.ndarray,
+        bias: np.ndarray,
+        n_categories: int = N_CATEGORY_FEATURES) -> tuple:
+    """
+    Fold the one-hot aerosol and cloud type columns of the first Dense layer into per-category biases.
+
+    The first `n_categories` features are 0/1 indicators, so their contribution to the first layer is
+    one of 2^n_categories rows of bias. The bias of every indicator combination is precomputed, and the
+    layer is evaluated as the continuous features times the remaining weights plus the bias of the
+    combination of each row, see `FLiESANN_category_codes`.
+
+    Args:
+        weights (np.ndarray): First-layer weights of shape (features, units).
+        bias (np.ndarray): First-layer bias of shape (units,).
+        n_categories (int, optional): Number of leading indicator features. Defaults to N_CATEGORY_FEATURES.
+
+    Returns:
+        tuple: Weights of the continuous features of shape (features - n_categories, units) and biases of
+            every indicator combination of shape (2^n_categories, units), indexed by category code.
+    """
+    codes = np.arange(2 ** n_categories)
+    indicators = ((codes[:, None] >> np.arange(n_categories)) & 1).astype(np.float32)
+    category_biases = (indicators @ weights[:n_categories].astype(np.float32) + bias).astype(np.float32)
+
+    return weights[n_categories:], category_biases
+
+def FLiESANN_category_codes(features: np.ndarray, n_categories: int = N_CATEGORY_FEATURES) -> np.ndarray:
+    """
+    Encode the one-hot aerosol and cloud type columns of each feature row as an integer code.
+
+    Args:
+        features (np.ndarray): Feature matrix of shape (rows, features) with 0/1 leading indicator columns.
+        n_categories (int, optional): Number of leading indicator features. Defaults to N_CATEGORY_FEATURES.
+
+    Returns:
+        np.ndarray: Row codes in [0, 2^n_categories), the binary number of the indicator columns.
+    """
+    # a float product with the powers of two is faster than a boolean reduction over the columns
+    return (features[:, :n_categories] @ (1 << np.arange(n_categories)).astype(features.dtype)).astype(np.intp)
@@ -10,6 +10,7 @@ if __name__ == "__main__" and __package__ is None:
 from ECOv002_calval_tables import load_times_locations
 from GEOS5FP import GEOS5FP
 from FLiESANN import GEOS5FP_INPUTS
+from FLiESANN.write_FLiESANN_table import write_FLiESANN_table
 
 logger = logging.getLogger(__name__)
 
@@ -38,6 +39,7 @@ def generate_FLiESANN_GEOS5FP_inputs(
             filename = join(dirname(__file__), "ECOv002_calval_FLiESANN_GEOS5FP_inputs.csv")
 
         results_df.to_csv(filename, index=False)
+        write_FLiESANN_table(results_df, filename.replace(".csv", ".parquet"))
 
     return results_df
 
@@ -14,7 +14,9 @@ from FLiESANN import generate_FLiESANN_inputs_table, process_FLiESANN_table
 
 import logging
 
-from FLiESANN import load_ECOv002_calval_FLiESANN_inputs
+from FLiESANN import load_ECOv002_calval_FLiESANN_inputs, write_FLiESANN_table
+from FLiESANN.constants import DEFAULT_CHECKPOINT_CHUNK_SIZE
+from FLiESANN.process_table_with_checkpoints import process_table_with_checkpoints
 
 logger = logging.getLogger(__name__)
 
@@ -22,10 +24,12 @@ logger = logging.getLogger(__name__)
 def generate_input_dataset(
         inputs_df: Union[pd.DataFrame, str] = None,
         regenerate_variables: List[str] = None,
-        max_rows: int = None) -> pd.DataFrame:
+        max_rows: int = None,
+        checkpoint_directory: str = None,
+        checkpoint_chunk_size: int = DEFAULT_CHECKPOINT_CHUNK_SIZE) -> pd.DataFrame:
     if regenerate_variables is not None:
         logger.info(f"Regenerating FLiESANN inputs: {', '.join(regenerate_variables)}")
-        inputs_df = load_ECOv002_calval_FLiESANN_inputs
+        inputs_df = load_ECOv002_calval_FLiESANN_inputs()
 
         for var in regenerate_variables:
             if var in inputs_df.columns:
@@ -56,22 +60,41 @@ def generate_input_dataset(
     GEOS5FP_connection = GEOS5FP()
 
     # Generate FLiES inputs table with atmospheric parameters from GEOS-5 FP
-    inputs_df = generate_FLiESANN_inputs_table(
-        inputs_df,
-        GEOS5FP_connection=GEOS5FP_connection
-    )
+    # With a checkpoint directory, completed chunks survive a failed run and are skipped on rerun
+    if checkpoint_directory is not None:
+        inputs_df = process_table_with_checkpoints(
+            inputs_df,
+            process_function=lambda chunk_df: generate_FLiESANN_inputs_table(
+                chunk_df,
+                GEOS5FP_connection=GEOS5FP_connection
+            ),
+            checkpoint_directory=checkpoint_directory,
+            chunk_size=checkpoint_chunk_size,
+            key="generate_FLiESANN_inputs_table"
+        )
+    else:
+        inputs_df = generate_FLiESANN_inputs_table(
+            inputs_df,
+            GEOS5FP_connection=GEOS5FP_connection
+        )
 
     # Process with BESS-JPL model
-    outputs_df = process_FLiESANN_table(inputs_df)
+    outputs_df = process_FLiESANN_table(
+        inputs_df,
+        checkpoint_directory=checkpoint_directory,
+        checkpoint_chunk_size=checkpoint_chunk_size
+    )
 
     inputs_filename = join(abspath(dirname(__file__)), "ECOv002-cal-val-BESS-JPL-inputs.csv")
     outputs_filename = join(abspath(dirname(__file__)), "ECOv002-cal-val-BESS-JPL-outputs.csv")
 
-    # Save the input dataset to a CSV file
+    # Save the input dataset to CSV and Parquet files
     inputs_df.to_csv(inputs_filename, index=False)
+    write_FLiESANN_table(inputs_df, inputs_filename.replace(".csv", ".parquet"))
 
-    # Save the processed results to a CSV file
+    # Save the processed results to CSV and Parquet files
     outputs_df.to_csv(outputs_filename, index=False)
+    write_FLiESANN_table(outputs_df, outputs_filename.replace(".csv", ".parquet"))
 
     logger.info(f"Processed {len(outputs_df)} records from the full cal/val dataset")
     logger.info(f"input dataset: {inputs_filename}")
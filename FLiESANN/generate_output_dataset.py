@@ -1,6 +1,7 @@
 import os
 from .ECOv002_calval_FLiESANN_inputs import load_ECOv002_calval_FLiESANN_inputs
 from .process_FLiESANN_table import process_FLiESANN_table
+from .write_FLiESANN_table import write_FLiESANN_table
 
 def generate_output_dataset():
     """
@@ -15,9 +16,10 @@ def generate_output_dataset():
     # Determine the directory of the current script
     script_dir = os.path.dirname(os.path.abspath(__file__))
 
-    # Save the outputs to a CSV file in the same directory as this script
+    # Save the outputs to CSV and Parquet files in the same directory as this script
     output_file_path = os.path.join(script_dir, "ECOv002-cal-val-FLiESANN-outputs.csv")
     outputs_df.to_csv(output_file_path, index=False)
+    write_FLiESANN_table(outputs_df, os.path.join(script_dir, "ECOv002-cal-val-FLiESANN-outputs.parquet"))
 
 def main():
     generate_output_dataset()
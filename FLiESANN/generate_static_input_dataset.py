@@ -5,6 +5,8 @@ import rasters as rt
 from ECOv002_calval_tables import load_combined_eco_flux_ec_filtered, load_metadata_ebc_filt
 from koppengeiger import load_koppen_geiger
 
+from .write_FLiESANN_table import write_FLiESANN_table
+
 
 def generate_static_input_dataset():
     """
@@ -46,8 +48,9 @@ def generate_static_input_dataset():
         "geometry": tower_points
     })
     
-    # Save to CSV
+    # Save to CSV and Parquet
     tower_static_data_gdf.to_csv(generated_input_table_filename, index=False)
+    write_FLiESANN_table(pd.DataFrame(tower_static_data_gdf), generated_input_table_filename.replace(".csv", ".parquet"))
     
     print(f"Static input dataset saved to: {generated_input_table_filename}")
     
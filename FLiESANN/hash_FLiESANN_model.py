@@ -0,0 +1,57 @@
+import hashlib
+from threading import Lock
+from weakref import WeakKeyDictionary
+
+import numpy as np
+
+from .constants import *
+from .process_table_with_checkpoints import hash_file
+
+# digest of each loaded model, released with the model
+_model_hashes = WeakKeyDictionary()
+_model_hashes_lock = Lock()
+
+def hash_FLiESANN_model(ANN_model=None, model_filename: str = MODEL_FILENAME) -> str:
+    """
+    Compute a SHA-256 digest identifying the ANN model that produced a set of outputs.
+
+    A loaded model is identified by its weights, so models loaded from the same file share a
+    digest while a model with modified weights does not. Without a loaded model, the digest of
+    the model file is used. The digest of a loaded model is computed once and remembered for as
+    long as the model object lives, so weights changed in place afterwards are not seen.
+
+    Args:
+        ANN_model (optional): Loaded ANN model object. Defaults to None (identified by model_filename).
+        model_filename (str, optional): Filename of the ANN model. Defaults to MODEL_FILENAME.
+
+    Returns:
+        str: Hexadecimal digest of the model.
+
+    Raises:
+        ValueError: If the model does not expose its weights.
+    """
+    if ANN_model is None:
+        return hash_file(model_filename)
+
+    if not hasattr(ANN_model, "get_weights"):
+        raise ValueError(f"cannot identify ANN model of type {type(ANN_model).__name__} without its weights")
+
+    with _model_hashes_lock:
+        model_hash = _model_hashes.get(ANN_model)
+
+    if model_hash is not None:
+        return model_hash
+
+    digest = hashlib.sha256()
+
+    for weights in ANN_model.get_weights():
+        weights = np.ascontiguousarray(weights)
+        digest.update(f"{weights.dtype}{weights.shape}".encode())
+        digest.update(weights.tobytes())
+
+    model_hash = digest.hexdigest()
+
+    with _model_hashes_lock:
+        _model_hashes[ANN_model] = model_hash
+
+    return model_hash
@@ -0,0 +1,87 @@
+import warnings
+from threading import Lock
+from weakref import WeakKeyDictionary, ref
+
+import numpy as np
+from tqdm.notebook import tqdm
+
+with warnings.catch_warnings():
+    warnings.simplefilter("ignore")
+    import tensorflow as tf
+    import keras
+
+from .constants import *
+
+# traced call of each loaded model, released with the model
+_traced_calls = WeakKeyDictionary()
+_traced_calls_lock = Lock()
+
+def _traced_call(ANN_model):
+    with _traced_calls_lock:
+        traced_call = _traced_calls.get(ANN_model)
+
+        if traced_call is None:
+            # one signature with a dynamic batch dimension, so batches of any size share a single trace
+            signature = tf.TensorSpec((None,) + tuple(ANN_model.input_shape[1:]), tf.float32)
+            # the traced call refers to the model weakly, so the dictionary entry does not keep the model alive
+            model_reference = ref(ANN_model)
+            traced_call = tf.function(lambda inputs: model_reference()(inputs, training=False), input_signature=[signature], autograph=False)
+            _traced_calls[ANN_model] = traced_call
+
+    return traced_call
+
+def predict_FLiESANN_model(
+        ANN_model,
+        inputs_array: np.ndarray,
+        batch_size: int = DEFAULT_INFERENCE_BATCH_SIZE,
+        use_tqdm: bool = False) -> np.ndarray:
+    """
+    Evaluate the ANN with a cached traced call instead of `model.predict`.
+
+    `model.predict` builds a data pipeline, callbacks and a dispatch on every call, which dominates for
+    single points and small tables. Keras models are instead called through a `tf.function` traced once
+    per model with a dynamic batch dimension, in chunks of `batch_size` rows. Other model objects fall
+    back to their `predict` method.
+
+    Args:
+        ANN_model: Loaded ANN model.
+        inputs_array (np.ndarray): Model input of shape (rows, ...) matching the model input shape.
+        batch_size (int, optional): Rows per call. Defaults to DEFAULT_INFERENCE_BATCH_SIZE.
+        use_tqdm (bool, optional): Show a progress bar advancing once per chunk. Defaults to False.
+
+    Returns:
+        np.ndarray: Model outputs of shape (rows, ...).
+
+    Raises:
+        ValueError: If the input shape is incompatible with the model.
+    """
+    if not isinstance(ANN_model, keras.Model):
+        return ANN_model.predict(inputs_array)
+
+    inputs_array = np.asarray(inputs_array, dtype=np.float32)
+    expected_shape = ANN_model.input_shape
+
+    if inputs_array.ndim != len(expected_shape) or any(expected not in (None, actual) for expected, actual in zip(expected_shape[1:], inputs_array.shape[1:])):
+        raise ValueError(f"input shape {inputs_array.shape} is incompatible with the model input shape {expected_shape}")
+
+    traced_call = _traced_call(ANN_model)
+    starts = range(0, len(inputs_array), batch_size)
+
+    if use_tqdm:
+        progress = tqdm(total=len(inputs_array), desc="Running Inference", unit="rows")
+
+    outputs = []
+
+    for start in starts:
+        outputs.append(traced_call(inputs_array[start:start + batch_size]).numpy())
+
+        if use_tqdm:
+            progress.update(len(outputs[-1]))
+
+    if use_tqdm:
+        progress.close()
+
+    if not outputs:
+        return np.empty((0,) + tuple(ANN_model.output_shape[1:]), dtype=np.float32)
+
+    return np.concatenate(outputs)
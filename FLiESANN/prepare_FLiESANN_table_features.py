@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+from .prepare_FLiESANN_inputs import prepare_FLiESANN_inputs
+from .determine_atype import determine_atype
+from .determine_ctype import determine_ctype
+
+# columns of a FLiESANN input table that determine the ANN features
+FEATURE_TABLE_COLUMNS = ["COT", "AOT", "vapor_gccm", "ozone_cm", "albedo", "elevation_m", "SZA_deg", "KG_climate"]
+
+def prepare_FLiESANN_table_features(input_df: pd.DataFrame) -> np.ndarray:
+    """
+    Prepare the ANN feature matrix of a table of FLiESANN inputs, such as the ECOv002 cal/val inputs.
+
+    The aerosol and cloud types are determined from the climate and COT as in `FLiESANN`. Rows with
+    missing inputs are skipped.
+
+    Args:
+        input_df (pd.DataFrame): Table with the columns in FEATURE_TABLE_COLUMNS.
+
+    Returns:
+        np.ndarray: Feature matrix of shape (rows, 14).
+    """
+    input_df = input_df[FEATURE_TABLE_COLUMNS].dropna()
+    COT = input_df.COT.to_numpy(dtype=np.float32)
+    KG_climate = input_df.KG_climate.to_numpy(dtype=int)
+
+    return prepare_FLiESANN_inputs(
+        atype=determine_atype(KG_climate, COT),
+        ctype=determine_ctype(KG_climate, COT),
+        COT=COT,
+        AOT=input_df.AOT.to_numpy(dtype=np.float32),
+        vapor_gccm=input_df.vapor_gccm.to_numpy(dtype=np.float32),
+        ozone_cm=input_df.ozone_cm.to_numpy(dtype=np.float32),
+        albedo=input_df.albedo.to_numpy(dtype=np.float32),
+        elevation_km=input_df.elevation_m.to_numpy(dtype=np.float32) / 1000,
+        SZA=input_df.SZA_deg.to_numpy(dtype=np.float32)
+    ).astype(np.float32).values
@@ -1,13 +1,10 @@
 from typing import Union
-from time import process_time
 from datetime import datetime
 import numpy as np
 import rasters as rt
 from rasters import Raster, RasterGeometry
 from GEOS5FP import GEOS5FP
 from solar_apparent_time import solar_day_of_year_for_area, solar_hour_of_day_for_area
-from solar_apparent_time import calculate_solar_day_of_year, calculate_solar_hour_of_day
-from sun_angles import calculate_SZA_from_DOY_and_hour
 from koppengeiger import load_koppen_geiger
 from NASADEM import NASADEM, NASADEMConnection
 import shapely
@@ -20,7 +17,14 @@ from .run_FLiESANN_inference import run_FLiESANN_inference
 from .retrieve_FLiESANN_inputs import retrieve_FLiESANN_inputs
 from .ensure_array import ensure_array
 from .partition_spectral_albedo_with_NDVI import partition_spectral_albedo_with_NDVI
-
+from .resolve_FLiESANN_solar_geometry import resolve_FLiESANN_solar_geometry
+from .FLiESANN_results import FLiESANNResults
+from .FLiESANN_profiler import FLiESANNProfiler, profile_stage
+from .FLiESANN_cache import FLiESANNCache
+from .FLiESANN_LUT import FLiESANNLUT
+from .FLiESANN_tracing import traced
+
+@traced
 def FLiESANN(
         albedo: Union[Raster, np.ndarray, float],
         COT: Union[Raster, np.ndarray, float] = None,
@@ -43,7 +47,14 @@ def FLiESANN(
         model_filename: str = MODEL_FILENAME,
         split_atypes_ctypes: bool = SPLIT_ATYPES_CTYPES,
         zero_COT_correction: bool = ZERO_COT_CORRECTION,
-        offline_mode: bool = False) -> dict:
+        offline_mode: bool = False,
+        out: FLiESANNResults = None,
+        profile: bool = False,
+        deduplicate_features: bool = False,
+        deduplication_tolerance: float = None,
+        cache: FLiESANNCache = None,
+        LUT: FLiESANNLUT = None,
+        precision: str = "float32") -> dict:
     """
     Processes Forest Light Environmental Simulator (FLiES) calculations using an 
     artificial neural network (ANN) emulator.
@@ -76,9 +87,26 @@ def FLiESANN(
         model_filename (str, optional): Filename of the ANN model to load. Defaults to MODEL_FILENAME.
         split_atypes_ctypes (bool, optional): Flag for handling aerosol and cloud types separately. Defaults to SPLIT_ATYPES_CTYPES.
         zero_COT_correction (bool, optional): Flag to apply zero COT correction. Defaults to ZERO_COT_CORRECTION.
+        out (FLiESANNResults, optional): Result container to write the outputs into. The derived radiation
+            outputs it holds are computed directly into its bands, the remaining outputs it holds are copied
+            in, and it is returned in place of the dictionary, without wrapping each output in a Raster.
+            Defaults to None.
+        profile (bool, optional): Measure wall time, CPU time, peak allocated memory and size of each stage,
+            log them and return them as a DataFrame under the "profile" key (or the `profile` attribute of
+            `out`). Defaults to False.
+        deduplicate_features (bool, optional): Run the ANN on the unique rows of the feature matrix only and
+            scatter the outputs back, logging the reduction ratio. Defaults to False.
+        deduplication_tolerance (float, optional): Quantization step under which feature rows are treated as
+            identical when deduplicating. Defaults to None (bit-identical rows only).
+        cache (FLiESANNCache, optional): Cache of ANN outputs shared across calls. Only the feature rows it
+            misses are predicted. Defaults to None.
+        LUT (FLiESANNLUT, optional): Lookup table emulator interpolating the ANN outputs instead of running
+            the ANN, see `build_FLiESANN_LUT`. Defaults to None.
+        precision (str, optional): Precision of the ANN weights, "float32" (Keras), "float16" or "int8".
+            Defaults to "float32".
 
     Returns:
-        dict: A dictionary containing the calculated radiative transfer components as Raster objects or np.ndarrays, including:
+        dict: A dictionary (or the `out` container, when given) containing the calculated radiative transfer components as Raster objects or np.ndarrays, including:
             - SWin_Wm2: Shortwave incoming solar radiation at the bottom of the atmosphere.
             - SWin_TOA_Wm2: Shortwave incoming solar radiation at the top of the atmosphere.
             - SWout_Wm2: Shortwave outgoing (reflected) solar radiation.
@@ -115,245 +143,267 @@ def FLiESANN(
     if geometry is None and isinstance(albedo, Raster):
         geometry = albedo.geometry
 
-    if (day_of_year is None or hour_of_day is None) and time_UTC is not None and geometry is not None:
-        day_of_year = calculate_solar_day_of_year(time_UTC=time_UTC, geometry=geometry)
-        hour_of_day = calculate_solar_hour_of_day(time_UTC=time_UTC, geometry=geometry)
-
-    if time_UTC is None and day_of_year is None and hour_of_day is None:
-        raise ValueError("no time given between time_UTC, day_of_year, and hour_of_day")
-
-    if SZA_deg is None and geometry is not None:
-        SZA_deg = calculate_SZA_from_DOY_and_hour(
-            lat=geometry.lat,
-            lon=geometry.lon,
-            DOY=day_of_year,
-            hour=hour_of_day
+    profiler = FLiESANNProfiler() if profile else None
+    size = (int(np.prod(geometry.shape)) if isinstance(geometry, RasterGeometry) else int(np.size(albedo))) if profile else None
+
+    # tracing is stopped even when a stage fails, so tracemalloc does not slow down the rest of the process
+    try:
+        with profile_stage(profiler, "solar_geometry", size):
+            day_of_year, hour_of_day, SZA_deg = resolve_FLiESANN_solar_geometry(
+                time_UTC=time_UTC,
+                geometry=geometry,
+                day_of_year=day_of_year,
+                hour_of_day=hour_of_day,
+                SZA_deg=SZA_deg
+            )
+
+        # Retrieve and prepare all input arrays
+        inputs = retrieve_FLiESANN_inputs(
+            albedo=albedo,
+            COT=COT,
+            AOT=AOT,
+            vapor_gccm=vapor_gccm,
+            ozone_cm=ozone_cm,
+            elevation_m=elevation_m,
+            SZA_deg=SZA_deg,
+            KG_climate=KG_climate,
+            SWin_Wm2=SWin_Wm2,
+            geometry=geometry,
+            time_UTC=time_UTC,
+            day_of_year=day_of_year,
+            hour_of_day=hour_of_day,
+            GEOS5FP_connection=GEOS5FP_connection,
+            NASADEM_connection=NASADEM_connection,
+            resampling=resampling,
+            zero_COT_correction=zero_COT_correction,
+            offline_mode=offline_mode,
+            profiler=profiler
         )
-
-    if SZA_deg is None:
-        raise ValueError("solar zenith angle or geometry and time must be given")
-
-    # Retrieve and prepare all input arrays
-    inputs = retrieve_FLiESANN_inputs(
-        albedo=albedo,
-        COT=COT,
-        AOT=AOT,
-        vapor_gccm=vapor_gccm,
-        ozone_cm=ozone_cm,
-        elevation_m=elevation_m,
-        SZA_deg=SZA_deg,
-        KG_climate=KG_climate,
-        SWin_Wm2=SWin_Wm2,
-        geometry=geometry,
-        time_UTC=time_UTC,
-        day_of_year=day_of_year,
-        hour_of_day=hour_of_day,
-        GEOS5FP_connection=GEOS5FP_connection,
-        NASADEM_connection=NASADEM_connection,
-        resampling=resampling,
-        zero_COT_correction=zero_COT_correction,
-        offline_mode=offline_mode
-    )
-    
-    # Extract prepared inputs
-    albedo = inputs["albedo"]
-    COT = inputs["COT"]
-    AOT = inputs["AOT"]
-    vapor_gccm = inputs["vapor_gccm"]
-    ozone_cm = inputs["ozone_cm"]
-    elevation_m = inputs["elevation_m"]
-    elevation_km = inputs["elevation_km"]
-    KG_climate = inputs["KG_climate"]
-    SZA_deg = inputs["SZA_deg"]
-    SWin_Wm2 = inputs["SWin_Wm2"]
-    day_of_year = inputs["day_of_year"]
-    atype = inputs["atype"]
-    ctype = inputs["ctype"]
     
-    # Store key inputs in results
-    results["albedo"] = albedo
-    results["SZA_deg"] = SZA_deg
-    results["elevation_m"] = elevation_m
-    results["KG_climate"] = KG_climate
-    results["COT"] = COT
-    results["AOT"] = AOT
-    results["vapor_gccm"] = vapor_gccm
-    results["ozone_cm"] = ozone_cm
-
-    # Run ANN inference to get initial radiative transfer parameters
-    prediction_start_time = process_time()
+        # Extract prepared inputs
+        albedo = inputs["albedo"]
+        COT = inputs["COT"]
+        AOT = inputs["AOT"]
+        vapor_gccm = inputs["vapor_gccm"]
+        ozone_cm = inputs["ozone_cm"]
+        elevation_m = inputs["elevation_m"]
+        elevation_km = inputs["elevation_km"]
+        KG_climate = inputs["KG_climate"]
+        SZA_deg = inputs["SZA_deg"]
+        SWin_Wm2 = inputs["SWin_Wm2"]
+        day_of_year = inputs["day_of_year"]
+        atype = inputs["atype"]
+        ctype = inputs["ctype"]
     
-    FLiESANN_inference_results = run_FLiESANN_inference(
-        atype=atype,
-        ctype=ctype,
-        COT=COT,
-        AOT=AOT,
-        vapor_gccm=vapor_gccm,
-        ozone_cm=ozone_cm,
-        albedo=albedo,
-        elevation_m=elevation_m,
-        SZA=SZA_deg,
-        ANN_model=ANN_model,
-        model_filename=model_filename,
-        split_atypes_ctypes=split_atypes_ctypes
-    )
-
-    results.update(FLiESANN_inference_results)
-
-    # Record the end time for performance monitoring
-    prediction_end_time = process_time()
-    
-    # Calculate total time taken for the ANN inference in seconds
-    prediction_duration = prediction_end_time - prediction_start_time
-
-    # Extract individual components from the results dictionary
-    # Fraction of incoming solar radiation that reaches the surface after atmospheric attenuation (0-1) [previously: tm]
-    atmospheric_transmittance = results["atmospheric_transmittance"]
-    # Proportion of total solar radiation in the ultraviolet range (280-400 nm) (0-1) [previously: puv]
-    UV_proportion = results["UV_proportion"]
-    # Proportion of total solar radiation in the photosynthetically active range (400-700 nm) (0-1) [previously: pvis]
-    PAR_proportion = results["PAR_proportion"]
-    # Proportion of total solar radiation in the near-infrared range (700-3000 nm) (0-1) [previously: pnir]
-    NIR_proportion = results["NIR_proportion"]
-    # Fraction of UV radiation that is diffuse (scattered) rather than direct (0-1) [previously: fduv]
-    UV_diffuse_fraction = results["UV_diffuse_fraction"]
-    # Fraction of PAR radiation that is diffuse (scattered) rather than direct (0-1) [previously: fdvis]
-    PAR_diffuse_fraction = results["PAR_diffuse_fraction"]
-    # Fraction of NIR radiation that is diffuse (scattered) rather than direct (0-1) [previously: fdnir]
-    NIR_diffuse_fraction = results["NIR_diffuse_fraction"]
-
-    ## Correction for diffuse PAR
-    COT = rt.where(COT == 0.0, np.nan, COT)
-    COT = rt.where(np.isfinite(COT), COT, np.nan)
-    x = np.log(COT)
-    p1 = 0.05088
-    p2 = 0.04909
-    p3 = 0.5017
-    corr = np.array(p1 * x * x + p2 * x + p3)
-    corr[np.logical_or(np.isnan(corr), corr > 1.0)] = 1.0
-    PAR_diffuse_fraction = PAR_diffuse_fraction * corr * 0.915
-
-    ## Radiation components
-    if SWin_Wm2 is None:
-        dr = 1.0 + 0.033 * np.cos(2 * np.pi / 365.0 * day_of_year)  # Earth-sun distance correction factor
-        SWin_TOA_Wm2 = 1333.6 * dr * np.cos(SZA_deg * np.pi / 180.0)  # Extraterrestrial radiation
-        SWin_TOA_Wm2 = rt.where(SZA_deg > 90.0, 0, SWin_TOA_Wm2)  # Set Ra to 0 when the sun is below the horizon
+        # Store key inputs in results
+        results["albedo"] = albedo
+        results["SZA_deg"] = SZA_deg
+        results["elevation_m"] = elevation_m
+        results["KG_climate"] = KG_climate
+        results["COT"] = COT
+        results["AOT"] = AOT
+        results["vapor_gccm"] = vapor_gccm
+        results["ozone_cm"] = ozone_cm
+
+        # Run ANN inference to get initial radiative transfer parameters
+        FLiESANN_inference_results = run_FLiESANN_inference(
+            atype=atype,
+            ctype=ctype,
+            COT=COT,
+            AOT=AOT,
+            vapor_gccm=vapor_gccm,
+            ozone_cm=ozone_cm,
+            albedo=albedo,
+            elevation_m=elevation_m,
+            SZA=SZA_deg,
+            ANN_model=ANN_model,
+            model_filename=model_filename,
+            split_atypes_ctypes=split_atypes_ctypes,
+            profiler=profiler,
+            deduplicate_features=deduplicate_features,
+            deduplication_tolerance=deduplication_tolerance,
+            cache=cache,
+            LUT=LUT,
+            precision=precision
+        )
+
+        results.update(FLiESANN_inference_results)
+
+        # Extract individual components from the results dictionary
+        # Fraction of incoming solar radiation that reaches the surface after atmospheric attenuation (0-1) [previously: tm]
+        atmospheric_transmittance = results["atmospheric_transmittance"]
+        # Proportion of total solar radiation in the ultraviolet range (280-400 nm) (0-1) [previously: puv]
+        UV_proportion = results["UV_proportion"]
+        # Proportion of total solar radiation in the photosynthetically active range (400-700 nm) (0-1) [previously: pvis]
+        PAR_proportion = results["PAR_proportion"]
+        # Proportion of total solar radiation in the near-infrared range (700-3000 nm) (0-1) [previously: pnir]
+        NIR_proportion = results["NIR_proportion"]
+        # Fraction of UV radiation that is diffuse (scattered) rather than direct (0-1) [previously: fduv]
+        UV_diffuse_fraction = results["UV_diffuse_fraction"]
+        # Fraction of PAR radiation that is diffuse (scattered) rather than direct (0-1) [previously: fdvis]
+        PAR_diffuse_fraction = results["PAR_diffuse_fraction"]
+        # Fraction of NIR radiation that is diffuse (scattered) rather than direct (0-1) [previously: fdnir]
+        NIR_diffuse_fraction = results["NIR_diffuse_fraction"]
+
+        def output_band(variable: str):
+            # band of the caller's container that an output is written into in place, or None to allocate it
+            return out[variable] if out is not None and variable in out else None
+
+        with profile_stage(profiler, "post_processing", size):
+            ## Correction for diffuse PAR
+            COT = rt.where(COT == 0.0, np.nan, COT)
+            COT = rt.where(np.isfinite(COT), COT, np.nan)
+            x = np.log(COT)
+            p1 = 0.05088
+            p2 = 0.04909
+            p3 = 0.5017
+            corr = np.array(p1 * x * x + p2 * x + p3)
+            corr[np.logical_or(np.isnan(corr), corr > 1.0)] = 1.0
+            PAR_diffuse_fraction = np.multiply(PAR_diffuse_fraction, corr * 0.915, out=output_band("PAR_diffuse_fraction"), casting="unsafe")
+
+            ## Radiation components
+            if SWin_Wm2 is None:
+                dr = 1.0 + 0.033 * np.cos(2 * np.pi / 365.0 * day_of_year)  # Earth-sun distance correction factor
+                SWin_TOA_Wm2 = 1333.6 * dr * np.cos(SZA_deg * np.pi / 180.0)  # Extraterrestrial radiation
+                SWin_TOA_Wm2 = rt.where(SZA_deg > 90.0, 0, SWin_TOA_Wm2)  # Set Ra to 0 when the sun is below the horizon
     
-    SWin_Wm2 = SWin_TOA_Wm2 * atmospheric_transmittance  # scale top-of-atmosphere shortwave radiation to bottom-of-atmosphere
-
-    # Calculate ultraviolet radiation (UV) in W/m² by scaling the total shortwave incoming radiation (SWin_Wm2)
-    # with the proportion of UV radiation (UV_proportion). UV radiation is a small fraction of the solar spectrum. [previously: UV]
-    UV_Wm2 = SWin_Wm2 * UV_proportion
-
-    # Calculate photosynthetically active radiation (PAR) in W/m², which represents the visible portion of the solar spectrum.
-    # This is derived by scaling the total shortwave incoming radiation (SWin_Wm2) with the proportion of visible radiation (PAR_proportion). [previously: VIS, visible_Wm2]
-    PAR_Wm2 = SWin_Wm2 * PAR_proportion
-
-    # Calculate near-infrared radiation (NIR) in W/m², which represents the portion of the solar spectrum beyond visible light.
-    # This is derived by scaling the total shortwave incoming radiation (SWin_Wm2) with the proportion of NIR radiation (NIR_proportion). [previously: NIR]
-    NIR_Wm2 = SWin_Wm2 * NIR_proportion
-
-    # Calculate diffuse visible radiation (PAR_diffuse_Wm2) in W/m² by scaling the total visible radiation (PAR_Wm2)
-    # with the diffuse fraction of visible radiation (PAR_diffuse_fraction). The np.clip function ensures the value
-    # remains within the range [0, PAR_Wm2]. Diffuse radiation is scattered sunlight that reaches the surface indirectly. [previously: VISdiff, visible_diffuse_Wm2]
-    PAR_diffuse_Wm2 = np.clip(PAR_Wm2 * PAR_diffuse_fraction, 0, PAR_Wm2)
-
-    # Calculate diffuse near-infrared radiation (NIR_diffuse_Wm2) in W/m² by scaling the total NIR radiation (NIR_Wm2)
-    # with the diffuse fraction of NIR radiation (NIR_diffuse_fraction). The np.clip function ensures the value
-    # remains within the range [0, NIR_Wm2]. [previously: NIRdiff]
-    NIR_diffuse_Wm2 = np.clip(NIR_Wm2 * NIR_diffuse_fraction, 0, NIR_Wm2)
-
-    # Calculate direct visible radiation (PAR_direct_Wm2) in W/m² by subtracting the diffuse visible radiation (PAR_diffuse_Wm2)
-    # from the total visible radiation (PAR_Wm2). The np.clip function ensures the value remains within the range [0, PAR_Wm2].
-    # Direct radiation is sunlight that reaches the surface without being scattered. [previously: VISdir, visible_direct_Wm2]
-    PAR_direct_Wm2 = np.clip(PAR_Wm2 - PAR_diffuse_Wm2, 0, PAR_Wm2)
-
-    # Calculate direct near-infrared radiation (NIR_direct_Wm2) in W/m² by subtracting the diffuse NIR radiation (NIR_diffuse_Wm2)
-    # from the total NIR radiation (NIR_Wm2). The np.clip function ensures the value remains within the range [0, NIR_Wm2]. [previously: NIRdir, NIR_direct_Wm2]
-    NIR_direct_Wm2 = np.clip(NIR_Wm2 - NIR_diffuse_Wm2, 0, NIR_Wm2)
-
-    # Calculate upwelling (reflected) shortwave radiation in W/m² using broadband albedo
-    # This represents the total solar radiation reflected back from the surface
-    SWout_Wm2 = SWin_Wm2 * albedo
-
-    # Partition spectral albedos using NDVI-based method (only if NDVI is provided)
-    # Use NDVI-based spectral partitioning (Liang 2001, Schaaf et al. 2002)
-    # This accounts for vegetation's distinct spectral signature:
-    # - Low PAR reflectance due to chlorophyll absorption
-    # - High NIR reflectance due to leaf cellular structure
-    if NDVI is not None:
-        # Determine the shape from albedo array for broadcasting NDVI if needed
-        actual_shape = albedo.shape if hasattr(albedo, 'shape') else None
-        NDVI_array = ensure_array(NDVI, actual_shape)
+            SWin_Wm2 = np.multiply(SWin_TOA_Wm2, atmospheric_transmittance, out=output_band("SWin_Wm2"), casting="unsafe")  # scale top-of-atmosphere shortwave radiation to bottom-of-atmosphere
+
+            # Calculate ultraviolet radiation (UV) in W/m² by scaling the total shortwave incoming radiation (SWin_Wm2)
+            # with the proportion of UV radiation (UV_proportion). UV radiation is a small fraction of the solar spectrum. [previously: UV]
+            UV_Wm2 = np.multiply(SWin_Wm2, UV_proportion, out=output_band("UV_Wm2"), casting="unsafe")
+
+            # Calculate photosynthetically active radiation (PAR) in W/m², which represents the visible portion of the solar spectrum.
+            # This is derived by scaling the total shortwave incoming radiation (SWin_Wm2) with the proportion of visible radiation (PAR_proportion). [previously: VIS, visible_Wm2]
+            PAR_Wm2 = np.multiply(SWin_Wm2, PAR_proportion, out=output_band("PAR_Wm2"), casting="unsafe")
+
+            # Calculate near-infrared radiation (NIR) in W/m², which represents the portion of the solar spectrum beyond visible light.
+            # This is derived by scaling the total shortwave incoming radiation (SWin_Wm2) with the proportion of NIR radiation (NIR_proportion). [previously: NIR]
+            NIR_Wm2 = np.multiply(SWin_Wm2, NIR_proportion, out=output_band("NIR_Wm2"), casting="unsafe")
+
+            # Calculate diffuse visible radiation (PAR_diffuse_Wm2) in W/m² by scaling the total visible radiation (PAR_Wm2)
+            # with the diffuse fraction of visible radiation (PAR_diffuse_fraction). The np.clip function ensures the value
+            # remains within the range [0, PAR_Wm2]. Diffuse radiation is scattered sunlight that reaches the surface indirectly. [previously: VISdiff, visible_diffuse_Wm2]
+            PAR_diffuse_Wm2 = np.multiply(PAR_Wm2, PAR_diffuse_fraction, out=output_band("PAR_diffuse_Wm2"), casting="unsafe")
+            PAR_diffuse_Wm2 = np.clip(PAR_diffuse_Wm2, 0, PAR_Wm2, out=output_band("PAR_diffuse_Wm2"))
+
+            # Calculate diffuse near-infrared radiation (NIR_diffuse_Wm2) in W/m² by scaling the total NIR radiation (NIR_Wm2)
+            # with the diffuse fraction of NIR radiation (NIR_diffuse_fraction). The np.clip function ensures the value
+            # remains within the range [0, NIR_Wm2]. [previously: NIRdiff]
+            NIR_diffuse_Wm2 = np.multiply(NIR_Wm2, NIR_diffuse_fraction, out=output_band("NIR_diffuse_Wm2"), casting="unsafe")
+            NIR_diffuse_Wm2 = np.clip(NIR_diffuse_Wm2, 0, NIR_Wm2, out=output_band("NIR_diffuse_Wm2"))
+
+            # Calculate direct visible radiation (PAR_direct_Wm2) in W/m² by subtracting the diffuse visible radiation (PAR_diffuse_Wm2)
+            # from the total visible radiation (PAR_Wm2). The np.clip function ensures the value remains within the range [0, PAR_Wm2].
+            # Direct radiation is sunlight that reaches the surface without being scattered. [previously: VISdir, visible_direct_Wm2]
+            PAR_direct_Wm2 = np.subtract(PAR_Wm2, PAR_diffuse_Wm2, out=output_band("PAR_direct_Wm2"), casting="unsafe")
+            PAR_direct_Wm2 = np.clip(PAR_direct_Wm2, 0, PAR_Wm2, out=output_band("PAR_direct_Wm2"))
+
+            # Calculate direct near-infrared radiation (NIR_direct_Wm2) in W/m² by subtracting the diffuse NIR radiation (NIR_diffuse_Wm2)
+            # from the total NIR radiation (NIR_Wm2). The np.clip function ensures the value remains within the range [0, NIR_Wm2]. [previously: NIRdir, NIR_direct_Wm2]
+            NIR_direct_Wm2 = np.subtract(NIR_Wm2, NIR_diffuse_Wm2, out=output_band("NIR_direct_Wm2"), casting="unsafe")
+            NIR_direct_Wm2 = np.clip(NIR_direct_Wm2, 0, NIR_Wm2, out=output_band("NIR_direct_Wm2"))
+
+            # Calculate upwelling (reflected) shortwave radiation in W/m² using broadband albedo
+            # This represents the total solar radiation reflected back from the surface
+            SWout_Wm2 = np.multiply(SWin_Wm2, albedo, out=output_band("SWout_Wm2"), casting="unsafe")
+
+            # Partition spectral albedos using NDVI-based method (only if NDVI is provided)
+            # Use NDVI-based spectral partitioning (Liang 2001, Schaaf et al. 2002)
+            # This accounts for vegetation's distinct spectral signature:
+            # - Low PAR reflectance due to chlorophyll absorption
+            # - High NIR reflectance due to leaf cellular structure
+            if NDVI is not None:
+                # Determine the shape from albedo array for broadcasting NDVI if needed
+                actual_shape = albedo.shape if hasattr(albedo, 'shape') else None
+                NDVI_array = ensure_array(NDVI, actual_shape)
         
-        PAR_albedo, NIR_albedo = partition_spectral_albedo_with_NDVI(
-            broadband_albedo=albedo,
-            NDVI=NDVI_array,
-            PAR_proportion=PAR_proportion,
-            NIR_proportion=NIR_proportion
-        )
+                PAR_albedo, NIR_albedo = partition_spectral_albedo_with_NDVI(
+                    broadband_albedo=albedo,
+                    NDVI=NDVI_array,
+                    PAR_proportion=PAR_proportion,
+                    NIR_proportion=NIR_proportion
+                )
         
-        # Calculate reflected radiation using spectral albedos
-        PAR_reflected_Wm2 = PAR_Wm2 * PAR_albedo
-        NIR_reflected_Wm2 = NIR_Wm2 * NIR_albedo
+                # Calculate reflected radiation using spectral albedos
+                PAR_reflected_Wm2 = np.multiply(PAR_Wm2, PAR_albedo, out=output_band("PAR_reflected_Wm2"), casting="unsafe")
+                NIR_reflected_Wm2 = np.multiply(NIR_Wm2, NIR_albedo, out=output_band("NIR_reflected_Wm2"), casting="unsafe")
         
-        # Store NDVI in results
-        results["NDVI"] = NDVI
-
-    if isinstance(geometry, RasterGeometry):
-        SWin_Wm2 = rt.Raster(SWin_Wm2, geometry=geometry)
-        SWin_TOA_Wm2 = rt.Raster(SWin_TOA_Wm2, geometry=geometry)
-        UV_Wm2 = rt.Raster(UV_Wm2, geometry=geometry)
-        PAR_Wm2 = rt.Raster(PAR_Wm2, geometry=geometry)
-        NIR_Wm2 = rt.Raster(NIR_Wm2, geometry=geometry)
-        PAR_diffuse_Wm2 = rt.Raster(PAR_diffuse_Wm2, geometry=geometry)
-        NIR_diffuse_Wm2 = rt.Raster(NIR_diffuse_Wm2, geometry=geometry)
-        PAR_direct_Wm2 = rt.Raster(PAR_direct_Wm2, geometry=geometry)
-        NIR_direct_Wm2 = rt.Raster(NIR_direct_Wm2, geometry=geometry)
-        SWout_Wm2 = rt.Raster(SWout_Wm2, geometry=geometry)
+                # Store NDVI in results
+                results["NDVI"] = NDVI_array
+
+        with profile_stage(profiler, "raster_wrapping", size):
+            if isinstance(geometry, RasterGeometry) and out is None:
+                SWin_Wm2 = rt.Raster(SWin_Wm2, geometry=geometry)
+                SWin_TOA_Wm2 = rt.Raster(SWin_TOA_Wm2, geometry=geometry)
+                UV_Wm2 = rt.Raster(UV_Wm2, geometry=geometry)
+                PAR_Wm2 = rt.Raster(PAR_Wm2, geometry=geometry)
+                NIR_Wm2 = rt.Raster(NIR_Wm2, geometry=geometry)
+                PAR_diffuse_Wm2 = rt.Raster(PAR_diffuse_Wm2, geometry=geometry)
+                NIR_diffuse_Wm2 = rt.Raster(NIR_diffuse_Wm2, geometry=geometry)
+                PAR_direct_Wm2 = rt.Raster(PAR_direct_Wm2, geometry=geometry)
+                NIR_direct_Wm2 = rt.Raster(NIR_direct_Wm2, geometry=geometry)
+                SWout_Wm2 = rt.Raster(SWout_Wm2, geometry=geometry)
         
-        if NDVI is not None:
-            PAR_reflected_Wm2 = rt.Raster(PAR_reflected_Wm2, geometry=geometry)
-            NIR_reflected_Wm2 = rt.Raster(NIR_reflected_Wm2, geometry=geometry)
-            PAR_albedo = rt.Raster(PAR_albedo, geometry=geometry)
-            NIR_albedo = rt.Raster(NIR_albedo, geometry=geometry)
-
-    if isinstance(UV_Wm2, Raster):
-        UV_Wm2.cmap = UV_CMAP
-
-    # Update the results dictionary with new items instead of replacing it
-    # Update the results dictionary with new items instead of replacing it
-    results.update({
-        "SWin_Wm2": SWin_Wm2,
-        "SWin_TOA_Wm2": SWin_TOA_Wm2,
-        "SWout_Wm2": SWout_Wm2,
-        "UV_Wm2": UV_Wm2,
-        "PAR_Wm2": PAR_Wm2,
-        "NIR_Wm2": NIR_Wm2,
-        "atmospheric_transmittance": atmospheric_transmittance,
-        "UV_proportion": UV_proportion,
-        "UV_diffuse_fraction": UV_diffuse_fraction,
-        "PAR_proportion": PAR_proportion,
-        "NIR_proportion": NIR_proportion,
-        "PAR_diffuse_Wm2": PAR_diffuse_Wm2,
-        "NIR_diffuse_Wm2": NIR_diffuse_Wm2,
-        "PAR_direct_Wm2": PAR_direct_Wm2,
-        "NIR_direct_Wm2": NIR_direct_Wm2,
-        "PAR_diffuse_fraction": PAR_diffuse_fraction,
-        "NIR_diffuse_fraction": NIR_diffuse_fraction
-    })
+                if NDVI is not None:
+                    PAR_reflected_Wm2 = rt.Raster(PAR_reflected_Wm2, geometry=geometry)
+                    NIR_reflected_Wm2 = rt.Raster(NIR_reflected_Wm2, geometry=geometry)
+                    PAR_albedo = rt.Raster(PAR_albedo, geometry=geometry)
+                    NIR_albedo = rt.Raster(NIR_albedo, geometry=geometry)
+
+            if isinstance(UV_Wm2, Raster):
+                UV_Wm2.cmap = UV_CMAP
+
+            # Update the results dictionary with new items instead of replacing it
+            # Update the results dictionary with new items instead of replacing it
+            results.update({
+                "SWin_Wm2": SWin_Wm2,
+                "SWin_TOA_Wm2": SWin_TOA_Wm2,
+                "SWout_Wm2": SWout_Wm2,
+                "UV_Wm2": UV_Wm2,
+                "PAR_Wm2": PAR_Wm2,
+                "NIR_Wm2": NIR_Wm2,
+                "atmospheric_transmittance": atmospheric_transmittance,
+                "UV_proportion": UV_proportion,
+                "UV_diffuse_fraction": UV_diffuse_fraction,
+                "PAR_proportion": PAR_proportion,
+                "NIR_proportion": NIR_proportion,
+                "PAR_diffuse_Wm2": PAR_diffuse_Wm2,
+                "NIR_diffuse_Wm2": NIR_diffuse_Wm2,
+                "PAR_direct_Wm2": PAR_direct_Wm2,
+                "NIR_direct_Wm2": NIR_direct_Wm2,
+                "PAR_diffuse_fraction": PAR_diffuse_fraction,
+                "NIR_diffuse_fraction": NIR_diffuse_fraction
+            })
     
-    # Add NDVI-derived spectral albedo outputs only if NDVI was provided
-    if NDVI is not None:
-        results.update({
-            "PAR_reflected_Wm2": PAR_reflected_Wm2,
-            "NIR_reflected_Wm2": NIR_reflected_Wm2,
-            "PAR_albedo": PAR_albedo,
-            "NIR_albedo": NIR_albedo
-        })
-    # Convert results to Raster objects if raster geometry is given
-    if isinstance(geometry, RasterGeometry):
-        for key in results.keys():
-            results[key] = rt.Raster(results[key], geometry=geometry)
+            # Add NDVI-derived spectral albedo outputs only if NDVI was provided
+            if NDVI is not None:
+                results.update({
+                    "PAR_reflected_Wm2": PAR_reflected_Wm2,
+                    "NIR_reflected_Wm2": NIR_reflected_Wm2,
+                    "PAR_albedo": PAR_albedo,
+                    "NIR_albedo": NIR_albedo
+                })
+            # Copy the outputs that were not written in place into the caller's container instead of allocating Rasters
+            if out is not None:
+                out.update({key: value for key, value in results.items() if not (isinstance(value, np.ndarray) and np.may_share_memory(value, out.data))})
+
+                if out.geometry is None and isinstance(geometry, RasterGeometry):
+                    out.geometry = geometry
+
+                results = out
+            # Convert results to Raster objects if raster geometry is given
+            elif isinstance(geometry, RasterGeometry):
+                for key in results.keys():
+                    results[key] = rt.Raster(results[key], geometry=geometry)
+    finally:
+        if profiler is not None:
+            profiler.stop()
+
+    if profiler is not None:
+        if out is not None:
+            out.profile = profiler.to_dataframe()
+        else:
+            results["profile"] = profiler.to_dataframe()
 
     return results
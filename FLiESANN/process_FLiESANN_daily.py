@@ -0,0 +1,198 @@
+import logging
+from datetime import date, datetime, timedelta
+from typing import Union
+
+import numpy as np
+import rasters as rt
+from rasters import Raster, RasterGeometry
+from GEOS5FP import GEOS5FP
+from NASADEM import NASADEM, NASADEMConnection
+import shapely
+
+from .constants import *
+from .calculate_solar_geometry import calculate_solar_declination, calculate_solar_zenith_angle
+from .retrieve_FLiESANN_static_inputs import retrieve_FLiESANN_static_inputs
+from .retrieve_FLiESANN_GEOS5FP_inputs import retrieve_FLiESANN_GEOS5FP_inputs
+from .process_FLiESANN import FLiESANN
+
+logger = logging.getLogger(__name__)
+
+# instantaneous fluxes that are integrated over the day, in W/m² as returned by FLiESANN
+DAILY_VARIABLES = [
+    "SWin_TOA_Wm2",
+    "SWin_Wm2",
+    "UV_Wm2",
+    "PAR_Wm2",
+    "NIR_Wm2",
+    "PAR_diffuse_Wm2",
+    "NIR_diffuse_Wm2",
+    "PAR_direct_Wm2",
+    "NIR_direct_Wm2"
+]
+
+QUADRATURE_METHODS = ["gauss-legendre", "midpoint"]
+
+def daily_variable_name(variable: str) -> str:
+    """
+    Name of the daily-integrated output for an instantaneous flux, e.g. `SWin_Wm2` -> `SWin_daily_MJm2`.
+    """
+    return variable.replace("_Wm2", "_daily_MJm2")
+
+def _quadrature_nodes(method: str, n_nodes: int) -> tuple:
+    # nodes on [-1, 1] and weights summing to 2
+    if method == "gauss-legendre":
+        return np.polynomial.legendre.leggauss(n_nodes)
+    elif method == "midpoint":
+        return (np.arange(n_nodes) + 0.5) / n_nodes * 2 - 1, np.full(n_nodes, 2 / n_nodes)
+    else:
+        raise ValueError(f"unrecognized quadrature method: {method} (expected one of {', '.join(QUADRATURE_METHODS)})")
+
+def _geometry_lat_lon(geometry) -> tuple:
+    if isinstance(geometry, RasterGeometry):
+        return np.asarray(geometry.lat, dtype=np.float64), np.asarray(geometry.lon, dtype=np.float64)
+    elif isinstance(geometry, (shapely.geometry.MultiPoint, rt.MultiPoint)):
+        return np.array([point.y for point in geometry.geoms]), np.array([point.x for point in geometry.geoms])
+    elif isinstance(geometry, (shapely.geometry.Point, rt.Point)):
+        return np.array(geometry.y), np.array(geometry.x)
+    else:
+        raise TypeError(f"geometry must be a RasterGeometry, Point or MultiPoint, not {type(geometry)}")
+
+def FLiESANN_daily(
+        albedo: Union[Raster, np.ndarray, float],
+        geometry: Union[RasterGeometry, shapely.geometry.Point, rt.Point, shapely.geometry.MultiPoint, rt.MultiPoint],
+        date_UTC: Union[date, str],
+        COT: Union[Raster, np.ndarray, float] = None,
+        AOT: Union[Raster, np.ndarray, float] = None,
+        vapor_gccm: Union[Raster, np.ndarray, float] = None,
+        ozone_cm: Union[Raster, np.ndarray, float] = None,
+        elevation_m: Union[Raster, np.ndarray, float] = None,
+        KG_climate: Union[Raster, np.ndarray, int] = None,
+        NDVI: Union[Raster, np.ndarray, float] = None,
+        GEOS5FP_connection: GEOS5FP = None,
+        NASADEM_connection: NASADEMConnection = NASADEM,
+        resampling: str = "cubic",
+        ANN_model=None,
+        model_filename: str = MODEL_FILENAME,
+        split_atypes_ctypes: bool = SPLIT_ATYPES_CTYPES,
+        zero_COT_correction: bool = ZERO_COT_CORRECTION,
+        offline_mode: bool = False,
+        n_nodes: int = DEFAULT_DAILY_QUADRATURE_NODES,
+        method: str = "gauss-legendre") -> dict:
+    """
+    Calculate daily-integrated radiation by quadrature over the daylight period of each pixel.
+
+    Sunrise and sunset hour angles are calculated for each pixel from its latitude and the solar
+    declination of the day, using the same solar geometry as `FLiESANN` (mean solar time, Duffie &
+    Beckman declination). The daylight period is sampled at `n_nodes` quadrature nodes, FLiESANN is
+    evaluated at all nodes in one batched run, and the instantaneous fluxes are combined with the
+    quadrature weights into daily totals. Gauss-Legendre nodes integrate the smooth diurnal cycle
+    with a handful of evaluations; the midpoint rule is provided for dense reference sampling.
+
+    Atmospheric inputs are held constant over the day. Inputs that are not given are retrieved once
+    from GEOS-5 FP at local solar noon of the mean longitude of the geometry.
+
+    Args:
+        albedo (Union[Raster, np.ndarray, float]): Surface broadband albedo (0.3-5.0 μm).
+        geometry (Union[RasterGeometry, Point, MultiPoint]): Target geometry in geographic coordinates.
+        date_UTC (Union[date, str]): Date of the daily integration.
+        COT, AOT, vapor_gccm, ozone_cm, elevation_m, KG_climate, NDVI, GEOS5FP_connection,
+            NASADEM_connection, resampling, ANN_model, model_filename, split_atypes_ctypes,
+            zero_COT_correction, offline_mode: As for `FLiESANN`.
+        n_nodes (int, optional): Number of quadrature nodes per day. Defaults to DEFAULT_DAILY_QUADRATURE_NODES.
+        method (str, optional): Quadrature method, "gauss-legendre" or "midpoint". Defaults to "gauss-legendre".
+
+    Returns:
+        dict: Daily totals in MJ/m²/day for each of DAILY_VARIABLES, keyed by `daily_variable_name`
+            (e.g. `SWin_daily_MJm2`, `PAR_daily_MJm2`), and `daylight_hours`, as Rasters for a
+            RasterGeometry and arrays otherwise.
+
+    Raises:
+        ValueError: If the quadrature method is not recognized.
+    """
+    nodes, weights = _quadrature_nodes(method, n_nodes)
+
+    if isinstance(date_UTC, str):
+        date_UTC = datetime.fromisoformat(date_UTC)
+
+    if isinstance(date_UTC, datetime):
+        date_UTC = date_UTC.date()
+
+    lat, lon = _geometry_lat_lon(geometry)
+    shape = lat.shape
+    stack_shape = (n_nodes,) + shape
+    day_of_year = date_UTC.timetuple().tm_yday
+
+    # sunrise hour angle, zero through the polar night and pi through the polar day
+    declination_rad = calculate_solar_declination(day_of_year)
+    lat_rad = np.radians(lat)
+    sunset_hour_angle_rad = np.arccos(np.clip(-np.tan(lat_rad) * np.tan(declination_rad), -1, 1))
+    daylight_hours = 2 * np.degrees(sunset_hour_angle_rad) / 15
+
+    # nodes are spread symmetrically around solar noon
+    hour_of_day = 12 + nodes.reshape((-1,) + (1,) * len(shape)) * daylight_hours / 2
+    SZA_deg = calculate_solar_zenith_angle(lat, declination_rad, hour_of_day)
+
+    static_inputs = retrieve_FLiESANN_static_inputs(
+        elevation_m=elevation_m,
+        KG_climate=KG_climate,
+        geometry=geometry,
+        NASADEM_connection=NASADEM_connection,
+        resampling=resampling
+    )
+
+    solar_noon_UTC = datetime(date_UTC.year, date_UTC.month, date_UTC.day, 12) - timedelta(hours=float(np.nanmean(lon)) / 15)
+
+    GEOS5FP_inputs = retrieve_FLiESANN_GEOS5FP_inputs(
+        COT=COT,
+        AOT=AOT,
+        vapor_gccm=vapor_gccm,
+        ozone_cm=ozone_cm,
+        geometry=geometry,
+        time_UTC=solar_noon_UTC,
+        GEOS5FP_connection=GEOS5FP_connection,
+        resampling=resampling,
+        zero_COT_correction=zero_COT_correction,
+        offline_mode=offline_mode
+    )
+
+    def stack(value) -> np.ndarray:
+        if isinstance(value, Raster):
+            value = value.array
+
+        return np.broadcast_to(np.asarray(value, dtype=np.float32), stack_shape)
+
+    logger.info(f"integrating FLiESANN over the day {date_UTC} at {n_nodes} {method} nodes for {int(np.prod(shape))} locations")
+
+    results = FLiESANN(
+        albedo=stack(albedo),
+        COT=stack(GEOS5FP_inputs["COT"]),
+        AOT=stack(GEOS5FP_inputs["AOT"]),
+        vapor_gccm=stack(GEOS5FP_inputs["vapor_gccm"]),
+        ozone_cm=stack(GEOS5FP_inputs["ozone_cm"]),
+        elevation_m=stack(static_inputs["elevation_m"]),
+        SZA_deg=stack(SZA_deg),
+        KG_climate=stack(static_inputs["KG_climate"]),
+        NDVI=None if NDVI is None else stack(NDVI),
+        day_of_year=stack(day_of_year),
+        hour_of_day=stack(hour_of_day),
+        GEOS5FP_connection=GEOS5FP_connection,
+        ANN_model=ANN_model,
+        model_filename=model_filename,
+        split_atypes_ctypes=split_atypes_ctypes,
+        offline_mode=True
+    )
+
+    # the integral over the daylight period in hours is half the day length times the weighted sum
+    hours_per_node = weights.reshape((-1,) + (1,) * len(shape)) * daylight_hours / 2
+    daily_results = {}
+
+    for variable in DAILY_VARIABLES:
+        energy_Whm2 = np.sum(np.asarray(results[variable], dtype=np.float64) * hours_per_node, axis=0)
+        daily_results[daily_variable_name(variable)] = (energy_Whm2 * 3600 / 1e6).astype(np.float32)
+
+    daily_results["daylight_hours"] = daylight_hours.astype(np.float32)
+
+    if isinstance(geometry, RasterGeometry):
+        daily_results = {key: rt.Raster(value, geometry=geometry) for key, value in daily_results.items()}
+
+    return daily_results
@@ -0,0 +1,246 @@
+import logging
+import threading
+from datetime import datetime
+from functools import partial
+from typing import List
+from uuid import uuid4
+from weakref import WeakKeyDictionary
+
+import numpy as np
+from rasters import Raster, RasterGeometry
+from GEOS5FP import GEOS5FP
+from NASADEM import NASADEM, NASADEMConnection
+
+from .constants import *
+from .load_FLiESANN_model import load_FLiESANN_model
+from .clone_FLiESANN_model import clone_FLiESANN_model
+from .process_FLiESANN import FLiESANN
+
+logger = logging.getLogger(__name__)
+
+# models loaded by the dask workers in this process, keyed by filename
+_models = {}
+_models_lock = threading.Lock()
+
+def _load_model(model_filename: str):
+    with _models_lock:
+        if model_filename not in _models:
+            _models[model_filename] = load_FLiESANN_model(model_filename)
+
+        return _models[model_filename]
+
+# copies of the models used by each scheduler thread, keyed by the model they were copied from
+_thread_models = threading.local()
+
+def _thread_model(ANN_model):
+    # Keras models are not safe to call from several threads, so each thread infers on its own copy
+    if not hasattr(_thread_models, "models"):
+        _thread_models.models = WeakKeyDictionary()
+
+    thread_model = _thread_models.models.get(ANN_model)
+
+    if thread_model is None:
+        thread_model = clone_FLiESANN_model(ANN_model)
+        _thread_models.models[ANN_model] = thread_model
+
+    return thread_model
+
+def _process_block(
+        *blocks,
+        array_names: List[str],
+        scalar_inputs: dict,
+        outputs: List[str],
+        geometry: RasterGeometry,
+        ANN_model,
+        model_filename: str,
+        options: dict,
+        block_info=None) -> np.ndarray:
+    shape = blocks[0].shape
+    inputs = dict(zip(array_names, blocks))
+
+    # scalars are broadcast to the block so that array-only calls have a common shape
+    for key, value in scalar_inputs.items():
+        inputs[key] = value if value is None else np.full(shape, value, dtype=np.float32)
+
+    if geometry is not None:
+        (row_start, row_stop), (col_start, col_stop) = block_info[0]["array-location"]
+        inputs["geometry"] = geometry[row_start:row_stop, col_start:col_stop]
+
+    if ANN_model is None:
+        ANN_model = _load_model(model_filename)
+
+    results = FLiESANN(ANN_model=_thread_model(ANN_model), **inputs, **options)
+
+    return np.stack([
+        np.broadcast_to(results[key].array if isinstance(results[key], Raster) else np.asarray(results[key]), shape)
+        for key in outputs
+    ]).astype(np.float32, copy=False)
+
+def FLiESANN_dask(
+        albedo,
+        COT=None,
+        AOT=None,
+        vapor_gccm=None,
+        ozone_cm=None,
+        elevation_m=None,
+        SZA_deg=None,
+        KG_climate=None,
+        SWin_Wm2=None,
+        NDVI=None,
+        geometry: RasterGeometry = None,
+        time_UTC: datetime = None,
+        day_of_year=None,
+        hour_of_day=None,
+        GEOS5FP_connection: GEOS5FP = None,
+        NASADEM_connection: NASADEMConnection = NASADEM,
+        resampling: str = "cubic",
+        ANN_model=None,
+        model_filename: str = MODEL_FILENAME,
+        split_atypes_ctypes: bool = SPLIT_ATYPES_CTYPES,
+        zero_COT_correction: bool = ZERO_COT_CORRECTION,
+        offline_mode: bool = False,
+        outputs: List[str] = None,
+        chunks=DEFAULT_TILE_SIZE) -> dict:
+    """
+    Build a lazy FLiESANN computation over dask arrays or xarray DataArrays.
+
+    Array inputs may be dask arrays, xarray DataArrays (dask- or NumPy-backed) or NumPy arrays, and
+    scalar inputs are broadcast. Arrays are aligned to a common chunking, and `dask.array.map_blocks`
+    runs `FLiESANN` on each block, stacking the requested outputs along a new leading axis that is
+    split back into one lazy array per output. Nothing is computed until the results are computed,
+    so whole scenes can be scheduled out of core or across a dask cluster with their chunking intact.
+    The outputs share one graph, so compute them together (e.g. `dask.compute(results)`) to run each
+    block once.
+
+    When a RasterGeometry is given, each block is processed on its own window of the geometry, so
+    solar geometry and any missing GEOS-5 FP, NASADEM and Köppen-Geiger inputs are resolved per
+    block. Without a geometry, all inputs needed by `FLiESANN` (including the solar zenith angle and
+    day of year) must be given. Each worker process loads the model once on its first block unless
+    `ANN_model` is given, in which case it is shipped with the task graph. As in `FLiESANN_tiled`,
+    each scheduler thread runs inference on its own copy of the model. With a distributed
+    scheduler, the model and connection objects must be picklable.
+
+    Requires the optional `dask` and `xarray` packages.
+
+    Args:
+        albedo: Surface broadband albedo (0.3-5.0 μm) as a dask array, DataArray, NumPy array or Raster.
+        COT, AOT, vapor_gccm, ozone_cm, elevation_m, SZA_deg, KG_climate, SWin_Wm2, NDVI, day_of_year,
+            hour_of_day: As for `FLiESANN`, as arrays of the same shape as albedo or scalars.
+        geometry (RasterGeometry, optional): Raster geometry matching the shape of the inputs.
+        time_UTC (datetime, optional): UTC time for the calculation.
+        GEOS5FP_connection, NASADEM_connection, resampling, ANN_model, model_filename,
+            split_atypes_ctypes, zero_COT_correction, offline_mode: As for `FLiESANN`.
+        outputs (List[str], optional): Output variables to compute. Defaults to FLIESANN_OUTPUT_VARIABLES,
+            plus FLIESANN_NDVI_OUTPUT_VARIABLES when NDVI is given.
+        chunks (optional): Chunking applied when no input is already a dask array. Defaults to DEFAULT_TILE_SIZE.
+
+    Returns:
+        dict: Lazy outputs keyed by variable name, as xarray DataArrays with the dimensions and
+            coordinates of the first DataArray input, or as dask arrays if no DataArray was given.
+
+    Raises:
+        ValueError: If an output variable is not recognized, no input is an array or the input shape
+            does not match the geometry.
+    """
+    import dask.array as da
+    import xarray as xr
+
+    if outputs is None:
+        outputs = FLIESANN_OUTPUT_VARIABLES + (FLIESANN_NDVI_OUTPUT_VARIABLES if NDVI is not None else [])
+
+    unknown_outputs = sorted(set(outputs) - set(FLIESANN_OUTPUT_VARIABLES + FLIESANN_NDVI_OUTPUT_VARIABLES))
+
+    if unknown_outputs:
+        raise ValueError(f"unrecognized FLiESANN dask outputs: {', '.join(unknown_outputs)}")
+
+    spatial_inputs = {
+        "albedo": albedo,
+        "COT": COT,
+        "AOT": AOT,
+        "vapor_gccm": vapor_gccm,
+        "ozone_cm": ozone_cm,
+        "elevation_m": elevation_m,
+        "SZA_deg": SZA_deg,
+        "KG_climate": KG_climate,
+        "SWin_Wm2": SWin_Wm2,
+        "NDVI": NDVI,
+        "day_of_year": day_of_year,
+        "hour_of_day": hour_of_day
+    }
+
+    template = next((value for value in spatial_inputs.values() if isinstance(value, xr.DataArray)), None)
+
+    # unwrap DataArrays and Rasters to their underlying arrays, leaving dask arrays lazy
+    arrays = {}
+    scalar_inputs = {}
+
+    for key, value in spatial_inputs.items():
+        if isinstance(value, xr.DataArray):
+            value = value.data
+        elif isinstance(value, Raster):
+            value = value.array
+
+        if isinstance(value, (np.ndarray, da.Array)) and value.ndim > 0:
+            arrays[key] = value
+        else:
+            scalar_inputs[key] = value
+
+    if not arrays:
+        raise ValueError("at least one FLiESANN input must be given as an array")
+
+    shape = next(iter(arrays.values())).shape
+
+    if geometry is not None and tuple(geometry.shape) != tuple(shape):
+        raise ValueError(f"input shape {shape} does not match geometry shape {geometry.shape}")
+
+    reference_chunks = next((value.chunks for value in arrays.values() if isinstance(value, da.Array)), None)
+
+    if reference_chunks is None:
+        reference_chunks = da.empty(shape, chunks=chunks).chunks
+
+    arrays = {
+        key: value.rechunk(reference_chunks) if isinstance(value, da.Array) else da.from_array(value, chunks=reference_chunks)
+        for key, value in arrays.items()
+    }
+
+    options = {
+        "time_UTC": time_UTC,
+        "GEOS5FP_connection": GEOS5FP_connection,
+        "NASADEM_connection": NASADEM_connection,
+        "resampling": resampling,
+        "split_atypes_ctypes": split_atypes_ctypes,
+        "zero_COT_correction": zero_COT_correction,
+        "offline_mode": offline_mode
+    }
+
+    # non-array arguments are bound to the block function so dask neither traverses nor tokenizes
+    # the model and connection objects
+    process_block = partial(
+        _process_block,
+        array_names=list(arrays.keys()),
+        scalar_inputs=scalar_inputs,
+        outputs=list(outputs),
+        geometry=geometry,
+        ANN_model=ANN_model,
+        model_filename=model_filename,
+        options=options
+    )
+
+    stacked = da.map_blocks(
+        process_block,
+        *arrays.values(),
+        new_axis=0,
+        chunks=((len(outputs),),) + reference_chunks,
+        dtype=np.float32,
+        name=f"FLiESANN-{uuid4().hex}"
+    )
+
+    results = {key: stacked[index] for index, key in enumerate(outputs)}
+
+    if template is not None:
+        results = {
+            key: xr.DataArray(value, dims=template.dims, coords=template.coords, name=key)
+            for key, value in results.items()
+        }
+
+    return results
@@ -0,0 +1,193 @@
+import logging
+from datetime import datetime
+from typing import Dict, List, Union
+
+import numpy as np
+import rasters as rt
+from rasters import Raster, RasterGeometry
+from GEOS5FP import GEOS5FP
+from NASADEM import NASADEM, NASADEMConnection
+import shapely
+
+from .constants import *
+from .load_FLiESANN_model import load_FLiESANN_model
+from .resolve_FLiESANN_solar_geometry import resolve_FLiESANN_solar_geometry
+from .retrieve_FLiESANN_inputs import retrieve_FLiESANN_inputs
+from .process_FLiESANN import FLiESANN
+from .streaming_statistics import StreamingMoments, StreamingQuantiles
+
+logger = logging.getLogger(__name__)
+
+def quantile_variable_name(variable: str, quantile: float) -> str:
+    """
+    Name of an ensemble quantile output, e.g. `SWin_Wm2_p95` for the 0.95 quantile of `SWin_Wm2`.
+    """
+    return f"{variable}_p{100 * quantile:g}"
+
+def FLiESANN_ensemble(
+        albedo: Union[Raster, np.ndarray, float],
+        uncertainty: Dict[str, Union[Raster, np.ndarray, float]],
+        COT: Union[Raster, np.ndarray, float] = None,
+        AOT: Union[Raster, np.ndarray, float] = None,
+        vapor_gccm: Union[Raster, np.ndarray, float] = None,
+        ozone_cm: Union[Raster, np.ndarray, float] = None,
+        elevation_m: Union[Raster, np.ndarray, float] = None,
+        SZA_deg: Union[Raster, np.ndarray, float] = None,
+        KG_climate: Union[Raster, np.ndarray, int] = None,
+        NDVI: Union[Raster, np.ndarray, float] = None,
+        geometry: Union[RasterGeometry, shapely.geometry.Point, rt.Point, shapely.geometry.MultiPoint, rt.MultiPoint] = None,
+        time_UTC: datetime = None,
+        day_of_year: Union[Raster, np.ndarray, float] = None,
+        hour_of_day: Union[Raster, np.ndarray, float] = None,
+        GEOS5FP_connection: GEOS5FP = None,
+        NASADEM_connection: NASADEMConnection = NASADEM,
+        resampling: str = "cubic",
+        ANN_model=None,
+        model_filename: str = MODEL_FILENAME,
+        split_atypes_ctypes: bool = SPLIT_ATYPES_CTYPES,
+        zero_COT_correction: bool = ZERO_COT_CORRECTION,
+        offline_mode: bool = False,
+        n_members: int = DEFAULT_ENSEMBLE_MEMBERS,
+        quantiles: List[float] = None,
+        outputs: List[str] = None,
+        seed: int = None,
+        chunk_size: int = DEFAULT_ENSEMBLE_CHUNK_SIZE) -> dict:
+    """
+    Propagate input uncertainty through FLiESANN by Monte Carlo sampling.
+
+    Inputs are resolved once as in `FLiESANN`. Each of `n_members` ensemble members perturbs the
+    inputs in `uncertainty` with independent Gaussian noise of the given standard deviation per
+    row or pixel, clipped to the physical limits in ENSEMBLE_INPUT_LIMITS. Members are stacked along
+    the batch axis and run through FLiESANN in batches of about `chunk_size` rows. Each batch is
+    folded into streaming mean/variance accumulators and P² quantile estimators and then discarded,
+    so memory does not grow with the number of members.
+
+    The aerosol and cloud types follow the perturbed COT, as they would in separate runs.
+
+    Args:
+        albedo, COT, AOT, vapor_gccm, ozone_cm, elevation_m, SZA_deg, KG_climate, NDVI, geometry,
+            time_UTC, day_of_year, hour_of_day, GEOS5FP_connection, NASADEM_connection, resampling,
+            ANN_model, model_filename, split_atypes_ctypes, zero_COT_correction, offline_mode: As for `FLiESANN`.
+        uncertainty (Dict[str, Union[Raster, np.ndarray, float]]): Standard deviation of each perturbed input,
+            keyed by input name (one of ENSEMBLE_INPUT_LIMITS), as a scalar or per row or pixel,
+            e.g. `{"albedo": df["albedo-UQ"], "NDVI": df["NDVI-UQ"]}`.
+        n_members (int, optional): Number of ensemble members. Defaults to DEFAULT_ENSEMBLE_MEMBERS.
+        quantiles (List[float], optional): Quantiles to estimate. Defaults to DEFAULT_ENSEMBLE_QUANTILES.
+        outputs (List[str], optional): Outputs to summarize. Defaults to FLIESANN_OUTPUT_VARIABLES, plus
+            FLIESANN_NDVI_OUTPUT_VARIABLES when NDVI is given.
+        seed (int, optional): Seed of the random generators. For a given seed the results do not depend
+            on `chunk_size`. Defaults to None.
+        chunk_size (int, optional): Rows per inference batch. Defaults to DEFAULT_ENSEMBLE_CHUNK_SIZE.
+
+    Returns:
+        dict: For each output, `<output>_mean`, `<output>_std` and one `<output>_p<percent>` per quantile
+            (e.g. `SWin_Wm2_p95`), as Rasters for a RasterGeometry and arrays otherwise.
+
+    Raises:
+        ValueError: If an uncertain input is not recognized or the ensemble has fewer than two members.
+    """
+    if quantiles is None:
+        quantiles = DEFAULT_ENSEMBLE_QUANTILES
+
+    if n_members < 2:
+        raise ValueError(f"an ensemble needs at least two members, not {n_members}")
+
+    for name in uncertainty:
+        if name not in ENSEMBLE_INPUT_LIMITS:
+            raise ValueError(f"unrecognized uncertain input: {name} (expected one of {', '.join(ENSEMBLE_INPUT_LIMITS)})")
+
+    if "NDVI" in uncertainty and NDVI is None:
+        raise ValueError("NDVI uncertainty given without NDVI")
+
+    if outputs is None:
+        outputs = FLIESANN_OUTPUT_VARIABLES + (FLIESANN_NDVI_OUTPUT_VARIABLES if NDVI is not None else [])
+
+    if geometry is None and isinstance(albedo, Raster):
+        geometry = albedo.geometry
+
+    day_of_year, hour_of_day, SZA_deg = resolve_FLiESANN_solar_geometry(
+        time_UTC=time_UTC,
+        geometry=geometry,
+        day_of_year=day_of_year,
+        hour_of_day=hour_of_day,
+        SZA_deg=SZA_deg
+    )
+
+    prepared = retrieve_FLiESANN_inputs(
+        albedo=albedo,
+        COT=COT,
+        AOT=AOT,
+        vapor_gccm=vapor_gccm,
+        ozone_cm=ozone_cm,
+        elevation_m=elevation_m,
+        SZA_deg=SZA_deg,
+        KG_climate=KG_climate,
+        geometry=geometry,
+        time_UTC=time_UTC,
+        day_of_year=day_of_year,
+        hour_of_day=hour_of_day,
+        GEOS5FP_connection=GEOS5FP_connection,
+        NASADEM_connection=NASADEM_connection,
+        resampling=resampling,
+        zero_COT_correction=zero_COT_correction,
+        offline_mode=offline_mode
+    )
+
+    prepared["NDVI"] = NDVI
+    prepared["hour_of_day"] = hour_of_day
+
+    def flat(value) -> np.ndarray:
+        value = value.array if isinstance(value, Raster) else value
+        return np.asarray(value, dtype=np.float32)
+
+    shape = flat(prepared["COT"]).shape
+    size = int(np.prod(shape))
+    keys = ["albedo", "COT", "AOT", "vapor_gccm", "ozone_cm", "elevation_m", "SZA_deg", "KG_climate", "day_of_year", "hour_of_day"] + (["NDVI"] if NDVI is not None else [])
+    base = {key: np.broadcast_to(flat(prepared[key]), shape).ravel() for key in keys}
+    sigma = {key: np.broadcast_to(flat(value), shape).ravel() for key, value in uncertainty.items()}
+
+    if ANN_model is None:
+        ANN_model = load_FLiESANN_model(model_filename)
+
+    # one random stream per perturbed input, so the draws do not depend on the batching of members
+    generators = {key: np.random.default_rng(child) for key, child in zip(sigma, np.random.SeedSequence(seed).spawn(len(sigma)))}
+    members_per_batch = max(1, min(n_members, chunk_size // max(size, 1)))
+    moments = {variable: StreamingMoments() for variable in outputs}
+    estimators = {variable: StreamingQuantiles(quantiles) for variable in outputs}
+
+    logger.info(f"running {n_members} member FLiESANN ensemble over {size} samples perturbing {', '.join(uncertainty)} in batches of {members_per_batch} members")
+
+    for start in range(0, n_members, members_per_batch):
+        n_batch = min(members_per_batch, n_members - start)
+        batch = {key: np.broadcast_to(value, (n_batch, size)) for key, value in base.items()}
+
+        for key, value in sigma.items():
+            lower, upper = ENSEMBLE_INPUT_LIMITS[key]
+            perturbed = batch[key] + generators[key].standard_normal((n_batch, size), dtype=np.float32) * value
+            batch[key] = np.clip(perturbed, lower, upper) if lower is not None or upper is not None else perturbed
+
+        results = FLiESANN(
+            ANN_model=ANN_model,
+            split_atypes_ctypes=split_atypes_ctypes,
+            offline_mode=True,
+            **batch
+        )
+
+        for variable in outputs:
+            values = np.asarray(results[variable], dtype=np.float32).reshape(n_batch, size)
+            moments[variable].update(values)
+            estimators[variable].update(values)
+
+    summary = {}
+
+    for variable in outputs:
+        summary[f"{variable}_mean"] = moments[variable].mean.reshape(shape).astype(np.float32)
+        summary[f"{variable}_std"] = moments[variable].std().reshape(shape).astype(np.float32)
+
+        for quantile, estimate in zip(quantiles, estimators[variable].result()):
+            summary[quantile_variable_name(variable, quantile)] = estimate.reshape(shape).astype(np.float32)
+
+    if isinstance(geometry, RasterGeometry):
+        summary = {key: rt.Raster(value, geometry=geometry) for key, value in summary.items()}
+
+    return summary
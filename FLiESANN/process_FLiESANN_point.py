@@ -0,0 +1,133 @@
+import math
+from datetime import datetime
+from threading import Lock
+from weakref import WeakKeyDictionary
+
+from .constants import *
+from .calculate_point_solar_geometry import calculate_point_solar_geometry
+from .FLiESANN_point_engine import FLiESANNPointEngine
+from .FLiESANN_point_results import FLiESANNPointResults
+
+# warm engines of loaded models and of model files, created on first use
+_model_engines = WeakKeyDictionary()
+_file_engines = {}
+_engines_lock = Lock()
+
+def _point_engine(ANN_model, model_filename: str) -> FLiESANNPointEngine:
+    with _engines_lock:
+        engines, key = (_file_engines, model_filename) if ANN_model is None else (_model_engines, ANN_model)
+        engine = engines.get(key)
+
+        if engine is None:
+            engine = engines[key] = FLiESANNPointEngine(ANN_model, model_filename)
+
+    return engine
+
+def _clip(value: float, lower: float, upper: float) -> float:
+    # np.clip of a scalar, applying the upper bound last
+    return min(max(value, lower), upper)
+
+def FLiESANN_point(
+        lat: float,
+        lon: float,
+        time_UTC: datetime,
+        albedo: float,
+        COT: float,
+        AOT: float,
+        vapor_gccm: float,
+        ozone_cm: float,
+        elevation_m: float,
+        KG_climate: int,
+        SZA_deg: float = None,
+        engine: FLiESANNPointEngine = None,
+        ANN_model=None,
+        model_filename: str = MODEL_FILENAME) -> FLiESANNPointResults:
+    """
+    Evaluate FLiESANN for a single location and time with every input given.
+
+    This is a scalar fast path for interactive services that skips the array, DataFrame, Keras and
+    Raster machinery of `FLiESANN`: the solar geometry (`calculate_point_solar_geometry`), aerosol/cloud
+    type and post-processing are evaluated in plain Python and the ANN by a warm `FLiESANNPointEngine`, which is created on the first
+    call for each model and reused. The results match `FLiESANN` up to float32 rounding.
+
+    Args:
+        lat (float): Latitude in degrees.
+        lon (float): Longitude in degrees.
+        time_UTC (datetime): UTC time; aware datetimes are converted to UTC.
+        albedo (float): Surface albedo.
+        COT (float): Cloud optical thickness.
+        AOT (float): Aerosol optical thickness.
+        vapor_gccm (float): Water vapor in grams per square centimeter.
+        ozone_cm (float): Ozone concentration in centimeters.
+        elevation_m (float): Elevation in meters.
+        KG_climate (int): Köppen-Geiger climate class.
+        SZA_deg (float, optional): Solar zenith angle in degrees. Defaults to None (calculated from the
+            location and time).
+        engine (FLiESANNPointEngine, optional): Engine evaluating the ANN. Defaults to None (the shared
+            engine of the model).
+        ANN_model (optional): Pre-loaded ANN model object for the shared engine. Defaults to None.
+        model_filename (str, optional): Filename of the ANN model for the shared engine. Defaults to MODEL_FILENAME.
+
+    Returns:
+        FLiESANNPointResults: The radiation outputs; NaN when an input is NaN.
+    """
+    if engine is None:
+        engine = _point_engine(ANN_model, model_filename)
+
+    day_of_year, hour_of_day, calculated_SZA_deg = calculate_point_solar_geometry(lat, lon, time_UTC)
+
+    if SZA_deg is None:
+        SZA_deg = calculated_SZA_deg
+
+    # cloud type of determine_ctype, which alone sets the one-hot type features
+    if COT > 0:
+        ctype = 3 if KG_climate == 1 else 1 if KG_climate in (2, 3, 4, 5, 6) else 0
+    else:
+        ctype = 0
+
+    outputs = engine.predict(ctype, COT, AOT, vapor_gccm, ozone_cm, albedo, elevation_m / 1000, SZA_deg)
+
+    if any(math.isnan(value) for value in (albedo, COT, AOT, vapor_gccm, ozone_cm, elevation_m, SZA_deg)):
+        outputs = [math.nan] * len(outputs)
+
+    atmospheric_transmittance, UV_proportion, PAR_proportion, NIR_proportion, UV_diffuse_fraction, PAR_diffuse_fraction, NIR_diffuse_fraction = [
+        _clip(value, 0, 1) if not math.isnan(value) else value for value in outputs
+    ]
+
+    # correction for diffuse PAR
+    if COT > 0 and math.isfinite(COT):
+        x = math.log(COT)
+        corr = min(0.05088 * x * x + 0.04909 * x + 0.5017, 1.0)
+    else:
+        corr = 1.0
+
+    PAR_diffuse_fraction = PAR_diffuse_fraction * corr * 0.915
+
+    dr = 1.0 + 0.033 * math.cos(2 * math.pi / 365.0 * day_of_year)
+    SWin_TOA_Wm2 = 0.0 if SZA_deg > 90.0 else 1333.6 * dr * math.cos(math.radians(SZA_deg))
+    SWin_Wm2 = SWin_TOA_Wm2 * atmospheric_transmittance
+    UV_Wm2 = SWin_Wm2 * UV_proportion
+    PAR_Wm2 = SWin_Wm2 * PAR_proportion
+    NIR_Wm2 = SWin_Wm2 * NIR_proportion
+    PAR_diffuse_Wm2 = _clip(PAR_Wm2 * PAR_diffuse_fraction, 0, PAR_Wm2)
+    NIR_diffuse_Wm2 = _clip(NIR_Wm2 * NIR_diffuse_fraction, 0, NIR_Wm2)
+
+    return FLiESANNPointResults(
+        SWin_Wm2=SWin_Wm2,
+        SWin_TOA_Wm2=SWin_TOA_Wm2,
+        SWout_Wm2=SWin_Wm2 * albedo,
+        UV_Wm2=UV_Wm2,
+        PAR_Wm2=PAR_Wm2,
+        NIR_Wm2=NIR_Wm2,
+        PAR_diffuse_Wm2=PAR_diffuse_Wm2,
+        NIR_diffuse_Wm2=NIR_diffuse_Wm2,
+        PAR_direct_Wm2=_clip(PAR_Wm2 - PAR_diffuse_Wm2, 0, PAR_Wm2),
+        NIR_direct_Wm2=_clip(NIR_Wm2 - NIR_diffuse_Wm2, 0, NIR_Wm2),
+        atmospheric_transmittance=atmospheric_transmittance,
+        UV_proportion=UV_proportion,
+        PAR_proportion=PAR_proportion,
+        NIR_proportion=NIR_proportion,
+        UV_diffuse_fraction=UV_diffuse_fraction,
+        PAR_diffuse_fraction=PAR_diffuse_fraction,
+        NIR_diffuse_fraction=NIR_diffuse_fraction
+    )
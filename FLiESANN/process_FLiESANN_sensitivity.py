@@ -0,0 +1,238 @@
+import logging
+from datetime import datetime
+from typing import List, Union
+
+import numpy as np
+import rasters as rt
+from rasters import Raster, RasterGeometry
+from GEOS5FP import GEOS5FP
+from NASADEM import NASADEM, NASADEMConnection
+import shapely
+
+from .constants import *
+from .load_FLiESANN_model import load_FLiESANN_model
+from .prepare_FLiESANN_inputs import prepare_FLiESANN_inputs
+from .retrieve_FLiESANN_inputs import retrieve_FLiESANN_inputs
+from .resolve_FLiESANN_solar_geometry import resolve_FLiESANN_solar_geometry
+from .calculate_MLP_jacobian import calculate_MLP_jacobian
+
+logger = logging.getLogger(__name__)
+
+# ANN feature of each sensitivity input and the derivative of the feature with respect to the input
+SENSITIVITY_FEATURES = {
+    "COT": ("COT", 1.0),
+    "AOT": ("AOT", 1.0),
+    "vapor_gccm": ("vapor_gccm", 1.0),
+    "ozone_cm": ("ozone_cm", 1.0),
+    "albedo": ("albedo", 1.0),
+    "elevation_m": ("elevation_km", 1 / 1000),
+    "SZA_deg": ("SZA", 1.0)
+}
+
+def _clip_derivative(value: np.ndarray, dvalue: np.ndarray, upper: np.ndarray, dupper: np.ndarray) -> np.ndarray:
+    # derivative of np.clip(value, 0, upper): zero below the range, that of the bound above it
+    return np.where(value < 0, 0, np.where(value > upper, dupper, dvalue))
+
+def FLiESANN_sensitivity(
+        albedo: Union[Raster, np.ndarray, float],
+        COT: Union[Raster, np.ndarray, float] = None,
+        AOT: Union[Raster, np.ndarray, float] = None,
+        vapor_gccm: Union[Raster, np.ndarray, float] = None,
+        ozone_cm: Union[Raster, np.ndarray, float] = None,
+        elevation_m: Union[Raster, np.ndarray, float] = None,
+        SZA_deg: Union[Raster, np.ndarray, float] = None,
+        KG_climate: Union[Raster, np.ndarray, int] = None,
+        geometry: Union[RasterGeometry, shapely.geometry.Point, rt.Point, shapely.geometry.MultiPoint, rt.MultiPoint] = None,
+        time_UTC: datetime = None,
+        day_of_year: Union[Raster, np.ndarray, float] = None,
+        hour_of_day: Union[Raster, np.ndarray, float] = None,
+        GEOS5FP_connection: GEOS5FP = None,
+        NASADEM_connection: NASADEMConnection = NASADEM,
+        resampling: str = "cubic",
+        ANN_model=None,
+        model_filename: str = MODEL_FILENAME,
+        split_atypes_ctypes: bool = SPLIT_ATYPES_CTYPES,
+        zero_COT_correction: bool = ZERO_COT_CORRECTION,
+        offline_mode: bool = False,
+        inputs: List[str] = None) -> dict:
+    """
+    Calculate the partial derivatives of the FLiESANN outputs with respect to its continuous inputs.
+
+    Inputs are resolved as in `FLiESANN`. The derivatives are computed in a single forward-mode pass
+    through the ANN, carrying a tangent for each input alongside the activations, and then through
+    the post-processing formulas (diffuse PAR correction, top-of-atmosphere radiation, spectral
+    partitioning and the diffuse/direct split), so each sample is evaluated once rather than twice
+    per perturbed input.
+
+    The derivatives are those of the model as implemented: where an ANN output or a radiation
+    component is clipped, the derivative follows the clipped value. The aerosol and cloud types
+    depend on COT only through whether it is zero and are held fixed.
+
+    Args:
+        albedo, COT, AOT, vapor_gccm, ozone_cm, elevation_m, SZA_deg, KG_climate, geometry, time_UTC,
+            day_of_year, hour_of_day, GEOS5FP_connection, NASADEM_connection, resampling, ANN_model,
+            model_filename, split_atypes_ctypes, zero_COT_correction, offline_mode: As for `FLiESANN`.
+        inputs (List[str], optional): Inputs to differentiate with respect to. Defaults to
+            SENSITIVITY_INPUTS (COT, AOT, vapor_gccm, ozone_cm, albedo, elevation_m and SZA_deg).
+
+    Returns:
+        dict: For each output of FLIESANN_OUTPUT_VARIABLES, a dict of its partial derivatives with
+            respect to each input, per unit of the input (per meter of elevation, per degree of SZA),
+            e.g. `sensitivity["SWin_Wm2"]["COT"]`. Derivatives are Rasters for a RasterGeometry and
+            arrays otherwise.
+
+    Raises:
+        ValueError: If an input is not one of SENSITIVITY_INPUTS, or if the solar zenith angle cannot be determined.
+    """
+    if inputs is None:
+        inputs = SENSITIVITY_INPUTS
+
+    for input_name in inputs:
+        if input_name not in SENSITIVITY_FEATURES:
+            raise ValueError(f"unrecognized sensitivity input: {input_name} (expected one of {', '.join(SENSITIVITY_INPUTS)})")
+
+    if geometry is None and isinstance(albedo, Raster):
+        geometry = albedo.geometry
+
+    day_of_year, hour_of_day, SZA_deg = resolve_FLiESANN_solar_geometry(
+        time_UTC=time_UTC,
+        geometry=geometry,
+        day_of_year=day_of_year,
+        hour_of_day=hour_of_day,
+        SZA_deg=SZA_deg
+    )
+
+    prepared = retrieve_FLiESANN_inputs(
+        albedo=albedo,
+        COT=COT,
+        AOT=AOT,
+        vapor_gccm=vapor_gccm,
+        ozone_cm=ozone_cm,
+        elevation_m=elevation_m,
+        SZA_deg=SZA_deg,
+        KG_climate=KG_climate,
+        geometry=geometry,
+        time_UTC=time_UTC,
+        day_of_year=day_of_year,
+        hour_of_day=hour_of_day,
+        GEOS5FP_connection=GEOS5FP_connection,
+        NASADEM_connection=NASADEM_connection,
+        resampling=resampling,
+        zero_COT_correction=zero_COT_correction,
+        offline_mode=offline_mode
+    )
+
+    def flat(key: str) -> np.ndarray:
+        value = prepared[key]
+        value = value.array if isinstance(value, Raster) else value
+
+        return np.asarray(value, dtype=np.float32)
+
+    COT = flat("COT")
+    shape = COT.shape
+    variables = {key: np.broadcast_to(flat(key), shape).ravel() for key in ["atype", "ctype", "COT", "AOT", "vapor_gccm", "ozone_cm", "albedo", "elevation_m", "SZA_deg", "day_of_year"]}
+    nan_mask = np.any([np.isnan(value) for value in variables.values()], axis=0)
+    features = {key: np.where(nan_mask, 0, value) for key, value in variables.items()}
+
+    if ANN_model is None:
+        ANN_model = load_FLiESANN_model(model_filename)
+
+    inputs_df = prepare_FLiESANN_inputs(
+        atype=features["atype"],
+        ctype=features["ctype"],
+        COT=features["COT"],
+        AOT=features["AOT"],
+        vapor_gccm=features["vapor_gccm"],
+        ozone_cm=features["ozone_cm"],
+        albedo=features["albedo"],
+        elevation_km=features["elevation_m"] / 1000.0,
+        SZA=features["SZA_deg"],
+        split_atypes_ctypes=split_atypes_ctypes
+    ).astype(np.float32)
+
+    columns = list(inputs_df.columns)
+
+    logger.info(f"calculating FLiESANN sensitivity to {', '.join(inputs)} for {len(inputs_df)} samples")
+
+    outputs, jacobian = calculate_MLP_jacobian(
+        ANN_model,
+        inputs_df.values,
+        input_columns=[columns.index(SENSITIVITY_FEATURES[input_name][0]) for input_name in inputs],
+        tangent_scales=[SENSITIVITY_FEATURES[input_name][1] for input_name in inputs]
+    )
+
+    # values and derivatives (inputs, rows) of each quantity
+    def seed(input_name: str) -> np.ndarray:
+        return np.array([[1.0] if name == input_name else [0.0] for name in inputs], dtype=np.float32)
+
+    zero = np.zeros((len(inputs), 1), dtype=np.float32)
+    values = {}
+    derivatives = {}
+
+    for index, variable in enumerate(ANN_OUTPUT_VARIABLES):
+        output = outputs[:, index]
+        values[variable] = np.clip(output, 0, 1)
+        derivatives[variable] = np.where((output > 0) & (output < 1), jacobian[:, index, :].T, 0)
+
+    COT = variables["COT"]
+    SZA_deg = variables["SZA_deg"]
+    albedo = variables["albedo"]
+
+    # diffuse PAR correction, a quadratic in log COT capped at one
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x = np.log(COT)
+        corr = 0.05088 * x * x + 0.04909 * x + 0.5017
+        dcorr_dCOT = (2 * 0.05088 * x + 0.04909) / COT
+
+    capped = ~np.isfinite(corr) | (corr > 1.0) | (COT <= 0)
+    corr = np.where(capped, 1.0, corr)
+    dcorr = np.where(capped, 0, dcorr_dCOT) * (seed("COT") if "COT" in inputs else zero)
+
+    PAR_diffuse_fraction = values["PAR_diffuse_fraction"]
+    values["PAR_diffuse_fraction"] = PAR_diffuse_fraction * corr * 0.915
+    derivatives["PAR_diffuse_fraction"] = (derivatives["PAR_diffuse_fraction"] * corr + PAR_diffuse_fraction * dcorr) * 0.915
+
+    # top-of-atmosphere radiation
+    dr = 1.0 + 0.033 * np.cos(2 * np.pi / 365.0 * variables["day_of_year"])
+    SZA_rad = np.radians(SZA_deg)
+    daylight = SZA_deg <= 90.0
+    values["SWin_TOA_Wm2"] = np.where(daylight, 1333.6 * dr * np.cos(SZA_rad), 0)
+    derivatives["SWin_TOA_Wm2"] = np.where(daylight, -1333.6 * dr * np.sin(SZA_rad) * np.pi / 180, 0) * (seed("SZA_deg") if "SZA_deg" in inputs else zero)
+
+    def product(a: str, b: str) -> tuple:
+        return values[a] * values[b], derivatives[a] * values[b] + values[a] * derivatives[b]
+
+    values["SWin_Wm2"], derivatives["SWin_Wm2"] = product("SWin_TOA_Wm2", "atmospheric_transmittance")
+    values["UV_Wm2"], derivatives["UV_Wm2"] = product("SWin_Wm2", "UV_proportion")
+    values["PAR_Wm2"], derivatives["PAR_Wm2"] = product("SWin_Wm2", "PAR_proportion")
+    values["NIR_Wm2"], derivatives["NIR_Wm2"] = product("SWin_Wm2", "NIR_proportion")
+
+    for band in ["PAR", "NIR"]:
+        total = values[f"{band}_Wm2"]
+        dtotal = derivatives[f"{band}_Wm2"]
+        diffuse, ddiffuse = product(f"{band}_Wm2", f"{band}_diffuse_fraction")
+        derivatives[f"{band}_diffuse_Wm2"] = _clip_derivative(diffuse, ddiffuse, total, dtotal)
+        values[f"{band}_diffuse_Wm2"] = np.clip(diffuse, 0, total)
+        direct = total - values[f"{band}_diffuse_Wm2"]
+        derivatives[f"{band}_direct_Wm2"] = _clip_derivative(direct, dtotal - derivatives[f"{band}_diffuse_Wm2"], total, dtotal)
+
+    values["albedo"] = albedo
+    derivatives["albedo"] = seed("albedo") if "albedo" in inputs else zero
+    _, derivatives["SWout_Wm2"] = product("SWin_Wm2", "albedo")
+
+    sensitivity = {}
+
+    for variable in FLIESANN_OUTPUT_VARIABLES:
+        derivative = np.broadcast_to(derivatives[variable], (len(inputs), nan_mask.size))
+        derivative = np.where(nan_mask, np.nan, derivative).astype(np.float32)
+        sensitivity[variable] = {}
+
+        for index, input_name in enumerate(inputs):
+            array = derivative[index].reshape(shape)
+
+            if isinstance(geometry, RasterGeometry):
+                array = rt.Raster(array, geometry=geometry)
+
+            sensitivity[variable][input_name] = array
+
+    return sensitivity
@@ -1,4 +1,5 @@
 import logging
+from concurrent.futures import ProcessPoolExecutor
 
 import numpy as np
 import pandas as pd
@@ -9,7 +10,14 @@ from rasters import MultiPoint, WGS84
 from shapely.geometry import Point
 from GEOS5FP import GEOS5FP
 from NASADEM import NASADEMConnection
+from .constants import *
 from .process_FLiESANN import FLiESANN
+from .run_FLiESANN_table_partitions import run_FLiESANN_table_partitions, create_FLiESANN_worker_pool
+from .deduplicate_FLiESANN_table import deduplicate_FLiESANN_table
+from .retrieve_FLiESANN_inputs import retrieve_FLiESANN_inputs
+from .process_table_with_checkpoints import process_table_with_checkpoints
+from .hash_FLiESANN_model import hash_FLiESANN_model
+from .FLiESANN_cache import FLiESANNCache
 
 logger = logging.getLogger(__name__)
 
@@ -17,7 +25,15 @@ def process_FLiESANN_table(
         input_df: DataFrame,
         GEOS5FP_connection: GEOS5FP = None,
         NASADEM_connection: NASADEMConnection = None,
-        offline_mode: bool = False) -> DataFrame:
+        offline_mode: bool = False,
+        ANN_model=None,
+        model_filename: str = MODEL_FILENAME,
+        n_workers: int = None,
+        deduplicate: bool = True,
+        checkpoint_directory: str = None,
+        checkpoint_chunk_size: int = DEFAULT_CHECKPOINT_CHUNK_SIZE,
+        cache: FLiESANNCache = None,
+        worker_pool: ProcessPoolExecutor = None) -> DataFrame:
     """
     Processes a DataFrame of FLiES inputs and returns a DataFrame with FLiES outputs.
     
@@ -40,6 +56,25 @@ def process_FLiESANN_table(
         - NDVI (float, optional): Normalized Difference Vegetation Index.
     GEOS5FP_connection (GEOS5FP, optional): Connection object for GEOS-5 FP data.
     NASADEM_connection (NASADEMConnection, optional): Connection object for NASADEM data.
+    offline_mode (bool, optional): If True, missing atmospheric inputs raise instead of being retrieved.
+    ANN_model (optional): Pre-loaded ANN model object. It cannot be shared with worker processes, so it must
+        not be given together with n_workers greater than one.
+    model_filename (str, optional): Filename of the ANN model to load if ANN_model is not provided.
+    n_workers (int, optional): Number of worker processes. If greater than one, the table is partitioned
+        and processed in a process pool, with each worker loading the model from model_filename and opening
+        connections once. Results are returned in the original row order. Defaults to None (single process).
+    deduplicate (bool, optional): If True, missing inputs are retrieved once per unique location and time and
+        broadcast back to every row sharing it, and rows with identical features are inferred once.
+        Defaults to True.
+    checkpoint_directory (str, optional): If given, the table is processed in chunks and each completed chunk
+        is saved in this directory, keyed by a hash of its rows and the model (the weights of ANN_model or the
+        model file). With multiple workers, one worker pool processes all chunks. Rerunning an interrupted job
+        restores the finished chunks and only processes the rest. Defaults to None (no checkpoints).
+    checkpoint_chunk_size (int, optional): Number of rows per checkpointed chunk. Defaults to DEFAULT_CHECKPOINT_CHUNK_SIZE.
+    cache (FLiESANNCache, optional): Cache of ANN outputs shared across calls. It is not shared with worker
+        processes, so it is ignored when processing with multiple workers. Defaults to None.
+    worker_pool (ProcessPoolExecutor, optional): Pool from `create_FLiESANN_worker_pool` to process the table
+        with when n_workers is greater than one, instead of starting a pool for this call. Defaults to None.
 
     Returns:
     pd.DataFrame: A DataFrame with the same structure as the input, but with additional columns:
@@ -62,7 +97,56 @@ def process_FLiESANN_table(
 
     Raises:
     KeyError: If required columns ("geometry" or "lat" and "lon") are missing.
+    ValueError: If ANN_model is given together with n_workers greater than one.
+    FLiESANNWorkerError: If any partition fails when processing with multiple workers.
     """
+    if n_workers is not None and n_workers > 1 and ANN_model is not None:
+        raise ValueError("a loaded ANN_model cannot be shared with worker processes, pass its model_filename instead")
+
+    if checkpoint_directory is not None:
+        def process_with_checkpoints(worker_pool):
+            return process_table_with_checkpoints(
+                input_df,
+                process_function=lambda chunk_df: process_FLiESANN_table(
+                    chunk_df,
+                    GEOS5FP_connection=GEOS5FP_connection,
+                    NASADEM_connection=NASADEM_connection,
+                    offline_mode=offline_mode,
+                    ANN_model=ANN_model,
+                    model_filename=model_filename,
+                    n_workers=n_workers,
+                    deduplicate=deduplicate,
+                    cache=cache,
+                    worker_pool=worker_pool
+                ),
+                checkpoint_directory=checkpoint_directory,
+                chunk_size=checkpoint_chunk_size,
+                key=f"process_FLiESANN_table:{hash_FLiESANN_model(ANN_model, model_filename)}:{offline_mode}"
+            )
+
+        if n_workers is None or n_workers <= 1 or worker_pool is not None:
+            return process_with_checkpoints(worker_pool)
+
+        # one pool for all chunks, so workers load the model once rather than once per chunk
+        with create_FLiESANN_worker_pool(
+                n_workers,
+                GEOS5FP_connection=GEOS5FP_connection,
+                NASADEM_connection=NASADEM_connection,
+                model_filename=model_filename,
+                offline_mode=offline_mode) as worker_pool:
+            return process_with_checkpoints(worker_pool)
+
+    if n_workers is not None and n_workers > 1 and len(input_df) > 1:
+        return run_FLiESANN_table_partitions(
+            input_df,
+            n_workers=n_workers,
+            GEOS5FP_connection=GEOS5FP_connection,
+            NASADEM_connection=NASADEM_connection,
+            model_filename=model_filename,
+            offline_mode=offline_mode,
+            worker_pool=worker_pool
+        )
+
     def ensure_geometry(row):
         if "geometry" in row:
             if isinstance(row.geometry, str):
@@ -95,36 +179,85 @@ def process_FLiESANN_table(
     else:
         raise KeyError("Input DataFrame must contain either 'geometry' or both 'lat' and 'lon' columns.")
     
-    # Convert time column to datetime
-    times_UTC = pd.to_datetime(input_df.time_UTC, format='mixed')
+    # Convert time column to datetime, skipping text parsing for tables that are already typed
+    if pd.api.types.is_datetime64_any_dtype(input_df.time_UTC):
+        times_UTC = input_df.time_UTC
+
+        # solar geometry expects naive UTC timestamps
+        if times_UTC.dt.tz is not None:
+            times_UTC = times_UTC.dt.tz_convert("UTC").dt.tz_localize(None)
+    else:
+        times_UTC = pd.to_datetime(input_df.time_UTC, format='mixed')
     
     logger.info(f"processing {len(input_df)} rows")
 
     # Helper function to get column values or None if column doesn't exist
+    # Typed float32 columns (e.g. from Parquet) are returned as zero-copy NumPy views
     def get_column_or_none(df, col_name, default_col_name=None):
         if col_name in df.columns:
-            return df[col_name].values
+            return df[col_name].to_numpy()
         elif default_col_name and default_col_name in df.columns:
-            return df[default_col_name].values
+            return df[default_col_name].to_numpy()
         else:
             return None
 
+    retrieved_inputs = {
+        "COT": get_column_or_none(input_df, "COT"),
+        "AOT": get_column_or_none(input_df, "AOT"),
+        "vapor_gccm": get_column_or_none(input_df, "vapor_gccm"),
+        "ozone_cm": get_column_or_none(input_df, "ozone_cm"),
+        "elevation_m": get_column_or_none(input_df, "elevation_m"),
+        "KG_climate": get_column_or_none(input_df, "KG_climate", "KG")
+    }
+
+    missing_inputs = [name for name, values in retrieved_inputs.items() if values is None]
+
+    # retrieve missing inputs once per location and time and broadcast them back to every row,
+    # so rows that differ only in inputs such as albedo or NDVI share one retrieval
+    if deduplicate and len(missing_inputs) > 0 and len(input_df) > 1:
+        unique_df, inverse = deduplicate_FLiESANN_table(input_df)
+        unique_positions = np.unique(inverse, return_index=True)[1]
+
+        logger.info(f"deduplicated {len(input_df)} rows to {len(unique_df)} unique location/time rows for retrieval (dedup ratio {len(input_df) / len(unique_df):.2f})")
+
+        if len(unique_df) < len(input_df):
+            unique_inputs = retrieve_FLiESANN_inputs(
+                albedo=input_df.albedo.to_numpy()[unique_positions],
+                **{
+                    name: None if values is None else values[unique_positions]
+                    for name, values in retrieved_inputs.items()
+                },
+                geometry=MultiPoint([geometries.geoms[position] for position in unique_positions], crs=WGS84),
+                time_UTC=times_UTC.iloc[unique_positions],
+                GEOS5FP_connection=GEOS5FP_connection,
+                NASADEM_connection=NASADEM_connection,
+                offline_mode=offline_mode
+            )
+
+            for name in missing_inputs:
+                retrieved_inputs[name] = np.asarray(unique_inputs[name])[inverse]
+
     # Process all rows at once using vectorized FLiESANN call
+    # rows with identical inputs are inferred once through feature deduplication
     FLiES_results = FLiESANN(
         geometry=geometries,
         time_UTC=times_UTC,
-        albedo=input_df.albedo.values,
-        COT=get_column_or_none(input_df, "COT"),
-        AOT=get_column_or_none(input_df, "AOT"),
-        vapor_gccm=get_column_or_none(input_df, "vapor_gccm"),
-        ozone_cm=get_column_or_none(input_df, "ozone_cm"),
-        elevation_m=get_column_or_none(input_df, "elevation_m"),
+        albedo=input_df.albedo.to_numpy(),
+        COT=retrieved_inputs["COT"],
+        AOT=retrieved_inputs["AOT"],
+        vapor_gccm=retrieved_inputs["vapor_gccm"],
+        ozone_cm=retrieved_inputs["ozone_cm"],
+        elevation_m=retrieved_inputs["elevation_m"],
         SZA_deg=get_column_or_none(input_df, "SZA"),
-        KG_climate=get_column_or_none(input_df, "KG_climate", "KG"),
+        KG_climate=retrieved_inputs["KG_climate"],
         NDVI=get_column_or_none(input_df, "NDVI"),
+        deduplicate_features=deduplicate,
         GEOS5FP_connection=GEOS5FP_connection,
         NASADEM_connection=NASADEM_connection,
-        offline_mode=offline_mode
+        ANN_model=ANN_model,
+        model_filename=model_filename,
+        offline_mode=offline_mode,
+        cache=cache
     )
 
     # Add results to the output DataFrame
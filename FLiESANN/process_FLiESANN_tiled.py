@@ -0,0 +1,285 @@
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
+from typing import Union
+
+import numpy as np
+import rasters as rt
+from rasters import Raster, RasterGeometry
+from GEOS5FP import GEOS5FP
+from NASADEM import NASADEM, NASADEMConnection
+
+from .constants import *
+from .colors import *
+from .load_FLiESANN_model import load_FLiESANN_model
+from .clone_FLiESANN_model import clone_FLiESANN_model
+from .process_FLiESANN import FLiESANN
+from .FLiESANN_sink import FLiESANNSink
+from .FLiESANN_results import FLiESANNResults
+
+logger = logging.getLogger(__name__)
+
+# state held by each worker process for the lifetime of the pool
+_worker_state = {}
+
+def calculate_tile_windows(shape: tuple, tile_size: int, block_shape: tuple = None) -> list:
+    """
+    Split a raster shape into a grid of (row slice, column slice) windows.
+
+    Rows and columns are divided into near-equal blocks no larger than `tile_size`, so that
+    the last block along each axis is never a sliver. With a `block_shape`, such as the internal
+    tiles of a compressed GeoTIFF or the chunks of a Zarr array, windows instead start on the
+    block grid and span whole blocks, at least one block and otherwise the most blocks that fit
+    in `tile_size`, so that no storage block is written by more than one tile.
+
+    Args:
+        shape (tuple): Raster shape in rows and columns.
+        tile_size (int): Maximum number of rows and columns per tile.
+        block_shape (tuple, optional): Rows and columns of the storage blocks to align to. Defaults to None.
+
+    Returns:
+        list: List of (row slice, column slice) tuples covering the raster in row-major order.
+    """
+    def axis_boundaries(size: int, block: int = None) -> list:
+        if block is None:
+            return list(np.linspace(0, size, int(np.ceil(size / tile_size)) + 1).astype(int))
+
+        step = max(block, tile_size // block * block)
+
+        return list(range(0, size, step)) + [size]
+
+    rows, cols = shape
+    row_boundaries = axis_boundaries(rows, None if block_shape is None else block_shape[0])
+    col_boundaries = axis_boundaries(cols, None if block_shape is None else block_shape[1])
+
+    return [
+        (slice(row_start, row_stop), slice(col_start, col_stop))
+        for row_start, row_stop in zip(row_boundaries[:-1], row_boundaries[1:])
+        for col_start, col_stop in zip(col_boundaries[:-1], col_boundaries[1:])
+    ]
+
+def _subset_input(value, shape: tuple, window: tuple):
+    # rasters and arrays covering the target geometry are cut to the tile, anything else passes through
+    if isinstance(value, Raster):
+        value = value.array
+
+    if isinstance(value, np.ndarray) and value.shape == shape:
+        return value[window]
+
+    return value
+
+def _initialize_worker(model_filename: str):
+    # load the model once per worker process
+    _worker_state["ANN_model"] = load_FLiESANN_model(model_filename)
+
+def _process_tile_in_worker(window: tuple, tile_inputs: dict) -> tuple:
+    tile_results = FLiESANN(ANN_model=_worker_state["ANN_model"], **tile_inputs)
+
+    # Rasters do not survive unpickling, so tiles are returned to the parent process as arrays
+    return window, {key: value.array if isinstance(value, Raster) else np.asarray(value) for key, value in tile_results.items()}
+
+def FLiESANN_tiled(
+        albedo: Union[Raster, np.ndarray, float],
+        geometry: RasterGeometry,
+        time_UTC: datetime = None,
+        COT: Union[Raster, np.ndarray, float] = None,
+        AOT: Union[Raster, np.ndarray, float] = None,
+        vapor_gccm: Union[Raster, np.ndarray, float] = None,
+        ozone_cm: Union[Raster, np.ndarray, float] = None,
+        elevation_m: Union[Raster, np.ndarray, float] = None,
+        SZA_deg: Union[Raster, np.ndarray, float] = None,
+        KG_climate: Union[Raster, np.ndarray, int] = None,
+        SWin_Wm2: Union[Raster, np.ndarray, float] = None,
+        NDVI: Union[Raster, np.ndarray, float] = None,
+        day_of_year: Union[Raster, np.ndarray, float] = None,
+        hour_of_day: Union[Raster, np.ndarray, float] = None,
+        GEOS5FP_connection: GEOS5FP = None,
+        NASADEM_connection: NASADEMConnection = NASADEM,
+        resampling: str = "cubic",
+        ANN_model=None,
+        model_filename: str = MODEL_FILENAME,
+        split_atypes_ctypes: bool = SPLIT_ATYPES_CTYPES,
+        zero_COT_correction: bool = ZERO_COT_CORRECTION,
+        offline_mode: bool = False,
+        tile_size: int = DEFAULT_TILE_SIZE,
+        n_workers: int = None,
+        use_processes: bool = False,
+        sink: FLiESANNSink = None,
+        out: FLiESANNResults = None) -> dict:
+    """
+    Processes FLiESANN over a raster geometry in tiles and stitches the tiles into output rasters.
+
+    The target geometry is split into blocks of at most `tile_size` rows and columns. Inputs given
+    as rasters or arrays covering the geometry are cut to each tile, and missing inputs are retrieved
+    for the tile's own geometry, so GEOS-5 FP, NASADEM and Köppen-Geiger are only read for that window.
+    Solar geometry is computed within each tile task for the tile's window. Working memory for solar
+    geometry, retrieval, inference and post-processing is therefore proportional to one tile per worker.
+
+    Tiles are processed in a thread pool by default, where each thread runs inference on its own copy
+    of the model. With `use_processes`, tiles run in a spawn-based process pool where each worker loads
+    the model from `model_filename` once; inputs and connection objects must then be picklable, and a
+    loaded `ANN_model` cannot be used. At most `TILES_IN_FLIGHT_PER_WORKER` tiles per worker are
+    submitted at a time, so the inputs cut for pending tiles stay bounded as well.
+
+    With a `sink` (e.g. `GeoTIFFSink` or `ZarrSink`), each tile is written to the sink as soon as it
+    completes instead of being stitched in memory, so output memory is also bounded by the tiles in
+    flight. Tiles are written from the calling thread in completion order, and tile windows are aligned
+    to the storage blocks of the sink so that no compressed block is rewritten.
+
+    When all inputs are provided, results are identical to calling `FLiESANN` on the whole raster.
+    Retrieved inputs are resampled to each tile separately, which can differ from resampling the
+    whole raster at tile edges.
+
+    Args:
+        albedo (Union[Raster, np.ndarray, float]): Surface broadband albedo (0.3-5.0 μm).
+        geometry (RasterGeometry): Target raster geometry.
+        time_UTC (datetime, optional): UTC time for the calculation.
+        COT, AOT, vapor_gccm, ozone_cm, elevation_m, SZA_deg, KG_climate, SWin_Wm2, NDVI, day_of_year,
+            hour_of_day, GEOS5FP_connection, NASADEM_connection, resampling, ANN_model, model_filename,
+            split_atypes_ctypes, zero_COT_correction, offline_mode: As for `FLiESANN`.
+        tile_size (int, optional): Maximum tile size in rows and columns. Defaults to DEFAULT_TILE_SIZE.
+        n_workers (int, optional): Number of tiles processed concurrently. Defaults to None (sequential).
+        use_processes (bool, optional): Use a process pool instead of a thread pool, with each worker loading
+            the model from model_filename. Defaults to False.
+        sink (FLiESANNSink, optional): Output sink receiving each tile. Defaults to None (stitch in memory).
+        out (FLiESANNResults, optional): Result container for the full geometry that tiles are stitched
+            into, so repeated runs over the same grid reuse one block. Bands of outputs that are not
+            produced are left untouched. Defaults to None.
+
+    Returns:
+        dict: The same outputs as `FLiESANN`, as Raster objects on the full geometry, the `out`
+            container when given, or None when the tiles are written to a sink.
+
+    Raises:
+        ValueError: If ANN_model is given together with use_processes and more than one worker.
+    """
+    if not isinstance(geometry, RasterGeometry):
+        raise TypeError(f"tiled processing requires a RasterGeometry, not {type(geometry)}")
+
+    parallel = n_workers is not None and n_workers > 1
+
+    if parallel and use_processes and ANN_model is not None:
+        raise ValueError("a loaded ANN_model cannot be shared with worker processes, pass its model_filename instead")
+
+    shape = geometry.shape
+
+    if ANN_model is None and not (parallel and use_processes):
+        ANN_model = load_FLiESANN_model(model_filename)
+
+    spatial_inputs = {
+        "albedo": albedo,
+        "COT": COT,
+        "AOT": AOT,
+        "vapor_gccm": vapor_gccm,
+        "ozone_cm": ozone_cm,
+        "elevation_m": elevation_m,
+        "SZA_deg": SZA_deg,
+        "KG_climate": KG_climate,
+        "SWin_Wm2": SWin_Wm2,
+        "NDVI": NDVI,
+        "day_of_year": day_of_year,
+        "hour_of_day": hour_of_day
+    }
+
+    options = {
+        "time_UTC": time_UTC,
+        "GEOS5FP_connection": GEOS5FP_connection,
+        "NASADEM_connection": NASADEM_connection,
+        "resampling": resampling,
+        "model_filename": model_filename,
+        "split_atypes_ctypes": split_atypes_ctypes,
+        "zero_COT_correction": zero_COT_correction,
+        "offline_mode": offline_mode
+    }
+
+    windows = calculate_tile_windows(shape, tile_size, block_shape=None if sink is None else sink.block_shape)
+    logger.info(f"processing FLiESANN over {shape[0]} x {shape[1]} raster in {len(windows)} tiles")
+
+    def tile_inputs(window: tuple) -> dict:
+        inputs = {key: _subset_input(value, shape, window) for key, value in spatial_inputs.items()}
+        inputs["geometry"] = geometry[window]
+        inputs.update(options)
+
+        return inputs
+
+    results = {}
+
+    def stitch_tile(window: tuple, tile_results: dict):
+        if sink is not None:
+            sink.write(window, tile_results)
+            return
+
+        if out is not None:
+            # as in FLiESANNResults.update, bands of outputs that were not produced (e.g. NDVI outputs without NDVI) are left untouched
+            for key in out.variables:
+                if key in tile_results:
+                    value = tile_results[key]
+                    out[key][window] = value.array if isinstance(value, Raster) else value
+
+            return
+
+        for key, value in tile_results.items():
+            tile_array = value.array if isinstance(value, Raster) else np.asarray(value)
+
+            if key not in results:
+                results[key] = np.full(shape, np.nan, dtype=np.promote_types(tile_array.dtype, np.float32))
+
+            results[key][window] = tile_array
+
+    def process_in_pool(submit_tile):
+        # submit tiles as earlier ones complete, so only a bounded number of tile inputs and results is held
+        pending = set()
+        max_in_flight = n_workers * TILES_IN_FLIGHT_PER_WORKER
+
+        for index in range(len(windows)):
+            if len(pending) >= max_in_flight:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    stitch_tile(*future.result())
+
+            pending.add(submit_tile(index))
+
+        for future in wait(pending).done:
+            stitch_tile(*future.result())
+
+    if not parallel:
+        for window in windows:
+            stitch_tile(window, FLiESANN(ANN_model=ANN_model, **tile_inputs(window)))
+    elif use_processes:
+        with ProcessPoolExecutor(
+                max_workers=n_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_initialize_worker,
+                initargs=(model_filename,)) as executor:
+            process_in_pool(lambda index: executor.submit(_process_tile_in_worker, windows[index], tile_inputs(windows[index])))
+    else:
+        # Keras models are not safe to call from several threads, so each thread infers on its own copy
+        thread_models = threading.local()
+
+        def process_tile_in_thread(window: tuple) -> tuple:
+            if not hasattr(thread_models, "ANN_model"):
+                thread_models.ANN_model = clone_FLiESANN_model(ANN_model)
+
+            return window, FLiESANN(ANN_model=thread_models.ANN_model, **tile_inputs(window))
+
+        with ThreadPoolExecutor(max_workers=n_workers) as executor:
+            process_in_pool(lambda index: executor.submit(process_tile_in_thread, windows[index]))
+
+    if sink is not None:
+        return None
+
+    if out is not None:
+        if out.geometry is None:
+            out.geometry = geometry
+
+        return out
+
+    results = {key: rt.Raster(value, geometry=geometry) for key, value in results.items()}
+
+    if "UV_Wm2" in results:
+        results["UV_Wm2"].cmap = UV_CMAP
+
+    return results
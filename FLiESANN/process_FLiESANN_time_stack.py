@@ -0,0 +1,151 @@
+import logging
+from datetime import datetime
+from typing import List, Union
+
+import numpy as np
+from rasters import Raster, RasterGeometry
+from GEOS5FP import GEOS5FP
+from NASADEM import NASADEM, NASADEMConnection
+
+from .constants import *
+from .calculate_solar_geometry import calculate_solar_geometry
+from .retrieve_FLiESANN_static_inputs import retrieve_FLiESANN_static_inputs
+from .retrieve_FLiESANN_GEOS5FP_inputs import retrieve_FLiESANN_GEOS5FP_inputs
+from .process_FLiESANN import FLiESANN
+
+logger = logging.getLogger(__name__)
+
+def _time_slice(value, time_index: int, n_times: int):
+    # inputs with a leading time axis are indexed per time step, anything else is constant over time
+    if isinstance(value, Raster):
+        return value.array
+
+    if isinstance(value, np.ndarray) and value.ndim == 3 and value.shape[0] == n_times:
+        return value[time_index]
+
+    return value
+
+def _stack_array(value, shape: tuple) -> np.ndarray:
+    # broadcast a constant input across the time axis without copying
+    if isinstance(value, Raster):
+        value = value.array
+
+    value = np.asarray(value, dtype=np.float32)
+
+    return value if value.shape == shape else np.broadcast_to(value, shape)
+
+def FLiESANN_time_stack(
+        albedo: Union[Raster, np.ndarray, float],
+        geometry: RasterGeometry,
+        time_UTC: List[datetime],
+        COT: Union[Raster, np.ndarray, float] = None,
+        AOT: Union[Raster, np.ndarray, float] = None,
+        vapor_gccm: Union[Raster, np.ndarray, float] = None,
+        ozone_cm: Union[Raster, np.ndarray, float] = None,
+        elevation_m: Union[Raster, np.ndarray, float] = None,
+        KG_climate: Union[Raster, np.ndarray, int] = None,
+        NDVI: Union[Raster, np.ndarray, float] = None,
+        GEOS5FP_connection: GEOS5FP = None,
+        NASADEM_connection: NASADEMConnection = NASADEM,
+        resampling: str = "cubic",
+        ANN_model=None,
+        model_filename: str = MODEL_FILENAME,
+        split_atypes_ctypes: bool = SPLIT_ATYPES_CTYPES,
+        zero_COT_correction: bool = ZERO_COT_CORRECTION,
+        offline_mode: bool = False) -> dict:
+    """
+    Processes FLiESANN for one raster geometry over a sequence of times in a single batched call.
+
+    Static inputs (elevation and Köppen-Geiger climate) are retrieved once for the geometry. For each
+    time step, solar geometry is computed from the cached coordinate grids and missing GEOS-5 FP
+    inputs are retrieved through the shared connection, so time steps that fall between the same
+    GEOS-5 FP granules reuse the granules already read. The inputs are then stacked into
+    (time, rows, cols) arrays and the ANN is run once over the whole stack.
+
+    Inputs given as arrays with a leading axis of the same length as `time_UTC` vary with time;
+    rasters, two-dimensional arrays and scalars are held constant over time.
+
+    Args:
+        albedo (Union[Raster, np.ndarray, float]): Surface broadband albedo (0.3-5.0 μm).
+        geometry (RasterGeometry): Target raster geometry.
+        time_UTC (List[datetime]): UTC times to evaluate.
+        COT, AOT, vapor_gccm, ozone_cm, elevation_m, KG_climate, NDVI, GEOS5FP_connection,
+            NASADEM_connection, resampling, ANN_model, model_filename, split_atypes_ctypes,
+            zero_COT_correction, offline_mode: As for `FLiESANN`.
+
+    Returns:
+        dict: The same outputs as `FLiESANN`, as float32 arrays of shape (time, rows, cols).
+
+    Raises:
+        TypeError: If the geometry is not a RasterGeometry.
+    """
+    if not isinstance(geometry, RasterGeometry):
+        raise TypeError(f"time-stack processing requires a RasterGeometry, not {type(geometry)}")
+
+    time_UTC = list(time_UTC)
+    n_times = len(time_UTC)
+    shape = (n_times,) + tuple(geometry.shape)
+
+    logger.info(f"processing FLiESANN over {geometry.shape[0]} x {geometry.shape[1]} raster at {n_times} times")
+
+    static_inputs = retrieve_FLiESANN_static_inputs(
+        elevation_m=elevation_m,
+        KG_climate=KG_climate,
+        geometry=geometry,
+        NASADEM_connection=NASADEM_connection,
+        resampling=resampling
+    )
+
+    if GEOS5FP_connection is None and not offline_mode:
+        GEOS5FP_connection = GEOS5FP()
+
+    day_of_year = np.empty(shape, dtype=np.float32)
+    hour_of_day = np.empty(shape, dtype=np.float32)
+    SZA_deg = np.empty(shape, dtype=np.float32)
+    atmosphere = {key: np.empty(shape, dtype=np.float32) for key in ["COT", "AOT", "vapor_gccm", "ozone_cm"]}
+
+    for time_index, time_step in enumerate(time_UTC):
+        solar_geometry = calculate_solar_geometry(time_UTC=time_step, geometry=geometry)
+        day_of_year[time_index] = solar_geometry["day_of_year"]
+        hour_of_day[time_index] = solar_geometry["hour_of_day"]
+        SZA_deg[time_index] = solar_geometry["SZA_deg"]
+
+        GEOS5FP_inputs = retrieve_FLiESANN_GEOS5FP_inputs(
+            COT=_time_slice(COT, time_index, n_times),
+            AOT=_time_slice(AOT, time_index, n_times),
+            vapor_gccm=_time_slice(vapor_gccm, time_index, n_times),
+            ozone_cm=_time_slice(ozone_cm, time_index, n_times),
+            geometry=geometry,
+            time_UTC=time_step,
+            GEOS5FP_connection=GEOS5FP_connection,
+            resampling=resampling,
+            zero_COT_correction=zero_COT_correction,
+            offline_mode=offline_mode
+        )
+
+        for key, stack in atmosphere.items():
+            value = GEOS5FP_inputs[key]
+            stack[time_index] = value.array if isinstance(value, Raster) else value
+
+    # every input is now given, so the batched call does not retrieve anything
+    results = FLiESANN(
+        albedo=_stack_array(albedo, shape),
+        COT=atmosphere["COT"],
+        AOT=atmosphere["AOT"],
+        vapor_gccm=atmosphere["vapor_gccm"],
+        ozone_cm=atmosphere["ozone_cm"],
+        elevation_m=_stack_array(static_inputs["elevation_m"], shape),
+        SZA_deg=SZA_deg,
+        KG_climate=_stack_array(static_inputs["KG_climate"], shape),
+        NDVI=None if NDVI is None else _stack_array(NDVI, shape),
+        day_of_year=day_of_year,
+        hour_of_day=hour_of_day,
+        GEOS5FP_connection=GEOS5FP_connection,
+        ANN_model=ANN_model,
+        model_filename=model_filename,
+        split_atypes_ctypes=split_atypes_ctypes,
+        zero_COT_correction=False,
+        offline_mode=True
+    )
+
+    return {key: _stack_array(value, shape) for key, value in results.items()}
@@ -0,0 +1,111 @@
+import hashlib
+import logging
+import os
+from functools import lru_cache
+from os.path import exists, expanduser, join
+from typing import Callable
+
+import pandas as pd
+from pandas import DataFrame
+
+from .constants import *
+
+logger = logging.getLogger(__name__)
+
+def hash_file(filename: str) -> str:
+    """
+    Compute the SHA-256 digest of a file, such as the ANN model, for use in checkpoint keys.
+
+    Digests are cached by filename, modification time and size, so a file rewritten in the same
+    process is hashed again.
+    """
+    status = os.stat(filename)
+
+    return _hash_file(os.path.abspath(filename), status.st_mtime_ns, status.st_size)
+
+@lru_cache(maxsize=None)
+def _hash_file(filename: str, mtime_ns: int, size: int) -> str:
+    digest = hashlib.sha256()
+
+    with open(filename, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+
+    return digest.hexdigest()
+
+def hash_table(df: DataFrame) -> str:
+    """
+    Compute a SHA-256 digest of the column names and row values of a table.
+
+    Object columns (e.g. shapely geometries) are hashed through their string representation.
+    """
+    hashable_df = df.copy()
+
+    for column in hashable_df.columns:
+        if hashable_df[column].dtype == object:
+            hashable_df[column] = hashable_df[column].astype(str)
+
+    digest = hashlib.sha256()
+    digest.update(repr(list(df.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(hashable_df, index=False).to_numpy().tobytes())
+
+    return digest.hexdigest()
+
+def process_table_with_checkpoints(
+        input_df: DataFrame,
+        process_function: Callable[[DataFrame], DataFrame],
+        checkpoint_directory: str,
+        chunk_size: int = DEFAULT_CHECKPOINT_CHUNK_SIZE,
+        key: str = "") -> DataFrame:
+    """
+    Process a table in chunks of rows, persisting each completed chunk to disk.
+
+    Each chunk is identified by a hash of its rows combined with `key`, which callers use to
+    encode everything else that determines the output (for example the model file digest).
+    When a checkpoint for a chunk already exists it is loaded instead of being processed, so
+    rerunning an interrupted job only processes the unfinished chunks. Checkpoints are written
+    atomically, so a job killed mid-write never leaves a partial checkpoint behind.
+
+    Args:
+        input_df (pd.DataFrame): Table to process.
+        process_function (Callable): Function mapping a chunk of `input_df` to its output table.
+        checkpoint_directory (str): Directory in which chunk outputs are stored.
+        chunk_size (int, optional): Number of rows per chunk. Defaults to DEFAULT_CHECKPOINT_CHUNK_SIZE.
+        key (str, optional): Additional identity of the processing, mixed into each chunk hash.
+
+    Returns:
+        pd.DataFrame: Concatenated chunk outputs in the original row order.
+    """
+    checkpoint_directory = expanduser(checkpoint_directory)
+    os.makedirs(checkpoint_directory, exist_ok=True)
+
+    chunks = []
+    restored_count = 0
+
+    for start in range(0, len(input_df), chunk_size):
+        chunk_df = input_df.iloc[start:start + chunk_size]
+        stop = start + len(chunk_df)
+        chunk_hash = hashlib.sha256(f"{key}:{hash_table(chunk_df)}".encode()).hexdigest()
+        checkpoint_filename = join(checkpoint_directory, f"{chunk_hash}.pkl")
+
+        if exists(checkpoint_filename):
+            logger.info(f"restoring rows {start}-{stop - 1} from checkpoint: {checkpoint_filename}")
+            chunk_output_df = pd.read_pickle(checkpoint_filename)
+            restored_count += 1
+        else:
+            logger.info(f"processing rows {start}-{stop - 1}")
+            chunk_output_df = process_function(chunk_df)
+            temporary_filename = f"{checkpoint_filename}.tmp"
+            chunk_output_df.to_pickle(temporary_filename)
+            os.replace(temporary_filename, checkpoint_filename)
+
+        chunks.append(chunk_output_df)
+
+    logger.info(f"restored {restored_count} of {len(chunks)} chunks from checkpoints in {checkpoint_directory}")
+
+    if len(chunks) == 0:
+        return process_function(input_df)
+
+    output_df = pd.concat(chunks)
+
+    return output_df
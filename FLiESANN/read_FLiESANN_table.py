@@ -0,0 +1,48 @@
+from typing import List
+from os.path import splitext
+
+import pandas as pd
+
+from .table_schema import apply_table_schema
+
+PARQUET_EXTENSIONS = [".parquet", ".pq"]
+ARROW_EXTENSIONS = [".arrow", ".feather", ".ipc"]
+
+def read_FLiESANN_table(
+        filename: str,
+        columns: List[str] = None) -> pd.DataFrame:
+    """
+    Read a FLiESANN input or output table from Parquet, Arrow IPC (Feather) or CSV.
+
+    Parquet and Arrow files are read through pyarrow and converted to pandas with one block
+    per column, so the float32 columns can be handed to FLiESANN as NumPy arrays without
+    copying. CSV files are parsed with pandas and coerced to the same typed schema
+    (float32 variables, uint8 climate codes, UTC timestamps).
+
+    Args:
+        filename (str): Path to a `.parquet`, `.arrow`/`.feather` or `.csv` file.
+        columns (List[str], optional): Subset of columns to read. Defaults to all columns.
+
+    Returns:
+        pd.DataFrame: Typed FLiESANN table.
+
+    Raises:
+        ValueError: If the file extension is not recognized.
+    """
+    extension = splitext(filename)[1].lower()
+
+    if extension in PARQUET_EXTENSIONS:
+        import pyarrow.parquet as pq
+        table = pq.read_table(filename, columns=columns)
+    elif extension in ARROW_EXTENSIONS:
+        import pyarrow.feather as feather
+        table = feather.read_table(filename, columns=columns)
+    elif extension == ".csv":
+        df = pd.read_csv(filename, usecols=columns)
+        return apply_table_schema(df)
+    else:
+        raise ValueError(f"unrecognized FLiESANN table format: {filename}")
+
+    df = table.to_pandas(split_blocks=True, self_destruct=True)
+
+    return df
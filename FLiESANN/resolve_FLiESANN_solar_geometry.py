@@ -0,0 +1,65 @@
+from datetime import datetime
+from typing import Union
+
+import numpy as np
+import rasters as rt
+from rasters import Raster, RasterGeometry
+from solar_apparent_time import calculate_solar_day_of_year, calculate_solar_hour_of_day
+from sun_angles import calculate_SZA_from_DOY_and_hour
+import shapely
+
+from .calculate_solar_geometry import calculate_solar_geometry
+
+def resolve_FLiESANN_solar_geometry(
+        time_UTC: datetime = None,
+        geometry: Union[RasterGeometry, shapely.geometry.Point, rt.Point, shapely.geometry.MultiPoint, rt.MultiPoint] = None,
+        day_of_year: Union[Raster, np.ndarray, float] = None,
+        hour_of_day: Union[Raster, np.ndarray, float] = None,
+        SZA_deg: Union[Raster, np.ndarray, float] = None) -> tuple:
+    """
+    Fill in the day of year, hour of day and solar zenith angle that are not given.
+
+    A raster at a single time uses the cached float32 solar geometry of `calculate_solar_geometry`;
+    other geometries use the solar apparent time and sun angle packages.
+
+    Args:
+        time_UTC (datetime, optional): UTC time.
+        geometry (Union[RasterGeometry, Point, MultiPoint], optional): Target geometry.
+        day_of_year (Union[Raster, np.ndarray, float], optional): Solar day of year.
+        hour_of_day (Union[Raster, np.ndarray, float], optional): Solar hour of day.
+        SZA_deg (Union[Raster, np.ndarray, float], optional): Solar zenith angle in degrees.
+
+    Returns:
+        tuple: day_of_year, hour_of_day and SZA_deg.
+
+    Raises:
+        ValueError: If no time is given, or if the solar zenith angle cannot be determined.
+    """
+    if day_of_year is None and hour_of_day is None and isinstance(geometry, RasterGeometry) and isinstance(time_UTC, (datetime, str)):
+        # cached float32 solar geometry for a raster at a single time
+        solar_geometry = calculate_solar_geometry(time_UTC=time_UTC, geometry=geometry)
+        day_of_year = solar_geometry["day_of_year"]
+        hour_of_day = solar_geometry["hour_of_day"]
+
+        if SZA_deg is None:
+            SZA_deg = solar_geometry["SZA_deg"]
+
+    if (day_of_year is None or hour_of_day is None) and time_UTC is not None and geometry is not None:
+        day_of_year = calculate_solar_day_of_year(time_UTC=time_UTC, geometry=geometry)
+        hour_of_day = calculate_solar_hour_of_day(time_UTC=time_UTC, geometry=geometry)
+
+    if time_UTC is None and day_of_year is None and hour_of_day is None:
+        raise ValueError("no time given between time_UTC, day_of_year, and hour_of_day")
+
+    if SZA_deg is None and geometry is not None:
+        SZA_deg = calculate_SZA_from_DOY_and_hour(
+            lat=geometry.lat,
+            lon=geometry.lon,
+            DOY=day_of_year,
+            hour=hour_of_day
+        )
+
+    if SZA_deg is None:
+        raise ValueError("solar zenith angle or geometry and time must be given")
+
+    return day_of_year, hour_of_day, SZA_deg
@@ -7,11 +7,25 @@ from GEOS5FP import GEOS5FP
 import shapely
 
 from .constants import *
+from .FLiESANN_profiler import FLiESANNProfiler, profile_stage
+from .FLiESANN_tracing import trace_span, traced, nbytes
 
 class MissingOfflineParameter(Exception):
     """Custom exception for missing parameters in offline mode."""
     pass
 
+def _geometry_size(geometry) -> int:
+    # pixels or points covered by the retrieval geometry
+    if isinstance(geometry, (Raster, RasterGeometry, np.ndarray)):
+        return int(np.prod(geometry.shape))
+    elif isinstance(geometry, (shapely.geometry.MultiPoint, rt.MultiPoint)):
+        return len(geometry.geoms)
+    elif geometry is None:
+        return None
+
+    return 1
+
+@traced
 def retrieve_FLiESANN_GEOS5FP_inputs(
         COT: Union[Raster, np.ndarray, float] = None,
         AOT: Union[Raster, np.ndarray, float] = None,
@@ -22,7 +36,8 @@ def retrieve_FLiESANN_GEOS5FP_inputs(
         GEOS5FP_connection: GEOS5FP = None,
         resampling: str = DEFAULT_RESAMPLING,
         zero_COT_correction: bool = ZERO_COT_CORRECTION,
-        offline_mode: bool = False) -> dict:
+        offline_mode: bool = False,
+        profiler: FLiESANNProfiler = None) -> dict:
     """
     Retrieve GEOS-5 FP atmospheric inputs for FLiESANN model.
 
@@ -44,6 +59,7 @@ def retrieve_FLiESANN_GEOS5FP_inputs(
         resampling (str, optional): Resampling method for raster data. Defaults to "cubic".
         zero_COT_correction (bool, optional): If True, sets COT to zero (clear sky conditions). Defaults to False.
         offline_mode (bool, optional): If True, raises MissingOfflineParameter for missing parameters instead of retrieving them. Defaults to False.
+        profiler (FLiESANNProfiler, optional): Profiler measuring the retrieval of each variable. Defaults to None.
 
     Returns:
         dict: Dictionary containing the atmospheric inputs with keys:
@@ -61,6 +77,9 @@ def retrieve_FLiESANN_GEOS5FP_inputs(
     if GEOS5FP_connection is None:
         GEOS5FP_connection = GEOS5FP()
 
+    # size recorded by the profiler for each retrieved variable
+    size = _geometry_size(geometry) if profiler is not None else None
+
     # Convert rasters.MultiPoint to shapely.geometry.MultiPoint if needed
     query_geometry = geometry
     if isinstance(geometry, rt.MultiPoint):
@@ -74,7 +93,7 @@ def retrieve_FLiESANN_GEOS5FP_inputs(
     # Retrieve or validate COT
     if zero_COT_correction:
         # Determine shape for zero array
-        if isinstance(geometry, (Raster, np.ndarray)):
+        if isinstance(geometry, (Raster, RasterGeometry, np.ndarray)):
             shape = geometry.shape
         elif isinstance(geometry, (shapely.geometry.MultiPoint, rt.MultiPoint)):
             shape = (len(geometry.geoms),) if hasattr(geometry, 'geoms') else (len(geometry),)
@@ -85,11 +104,15 @@ def retrieve_FLiESANN_GEOS5FP_inputs(
         if offline_mode:
             raise MissingOfflineParameter("COT is required in offline mode but not provided.")
         if geometry is not None and time_UTC is not None:
-            COT = GEOS5FP_connection.COT(
-                time_UTC=time_UTC,
-                geometry=query_geometry,
-                resampling=resampling
-            )
+            with profile_stage(profiler, "GEOS5FP_COT", size), trace_span("GEOS5FP", variable="COT") as span:
+                COT = GEOS5FP_connection.COT(
+                    time_UTC=time_UTC,
+                    geometry=query_geometry,
+                    resampling=resampling
+                )
+
+                if span:
+                    span["bytes_read"] = nbytes(COT)
 
     if COT is None:
         raise ValueError("cloud optical thickness or geometry and time must be given")
@@ -104,11 +127,15 @@ def retrieve_FLiESANN_GEOS5FP_inputs(
         if offline_mode:
             raise MissingOfflineParameter("AOT is required in offline mode but not provided.")
         if geometry is not None and time_UTC is not None:
-            AOT = GEOS5FP_connection.AOT(
-                time_UTC=time_UTC,
-                geometry=query_geometry,
-                resampling=resampling
-            )
+            with profile_stage(profiler, "GEOS5FP_AOT", size), trace_span("GEOS5FP", variable="AOT") as span:
+                AOT = GEOS5FP_connection.AOT(
+                    time_UTC=time_UTC,
+                    geometry=query_geometry,
+                    resampling=resampling
+                )
+
+                if span:
+                    span["bytes_read"] = nbytes(AOT)
 
     if AOT is None:
         raise ValueError("aerosol optical thickness or geometry and time must be given")
@@ -120,11 +147,15 @@ def retrieve_FLiESANN_GEOS5FP_inputs(
         if offline_mode:
             raise MissingOfflineParameter("Water vapor is required in offline mode but not provided.")
         if geometry is not None and time_UTC is not None:
-            vapor_gccm = GEOS5FP_connection.vapor_gccm(
-                time_UTC=time_UTC,
-                geometry=query_geometry,
-                resampling=resampling
-            )
+            with profile_stage(profiler, "GEOS5FP_vapor_gccm", size), trace_span("GEOS5FP", variable="vapor_gccm") as span:
+                vapor_gccm = GEOS5FP_connection.vapor_gccm(
+                    time_UTC=time_UTC,
+                    geometry=query_geometry,
+                    resampling=resampling
+                )
+
+                if span:
+                    span["bytes_read"] = nbytes(vapor_gccm)
 
     if vapor_gccm is None:
         raise ValueError("water vapor or geometry and time must be given")
@@ -136,11 +167,15 @@ def retrieve_FLiESANN_GEOS5FP_inputs(
         if offline_mode:
             raise MissingOfflineParameter("Ozone concentration is required in offline mode but not provided.")
         if geometry is not None and time_UTC is not None:
-            ozone_cm = GEOS5FP_connection.ozone_cm(
-                time_UTC=time_UTC,
-                geometry=query_geometry,
-                resampling=resampling
-            )
+            with profile_stage(profiler, "GEOS5FP_ozone_cm", size), trace_span("GEOS5FP", variable="ozone_cm") as span:
+                ozone_cm = GEOS5FP_connection.ozone_cm(
+                    time_UTC=time_UTC,
+                    geometry=query_geometry,
+                    resampling=resampling
+                )
+
+                if span:
+                    span["bytes_read"] = nbytes(ozone_cm)
 
     if ozone_cm is None:
         raise ValueError("ozone concentration or geometry and time must be given")
@@ -16,9 +16,12 @@ from .retrieve_FLiESANN_GEOS5FP_inputs import retrieve_FLiESANN_GEOS5FP_inputs
 from .filter_dataframe_to_location_time_pairs import filter_dataframe_to_location_time_pairs
 from .determine_atype import determine_atype
 from .determine_ctype import determine_ctype
+from .FLiESANN_profiler import FLiESANNProfiler, profile_stage
+from .FLiESANN_tracing import traced
 from .constants import *
 
 
+@traced
 def retrieve_FLiESANN_inputs(
         albedo: Union[Raster, np.ndarray, float] = None,
         COT: Union[Raster, np.ndarray, float] = None,
@@ -37,7 +40,8 @@ def retrieve_FLiESANN_inputs(
         NASADEM_connection: NASADEMConnection = None,
         resampling: str = DEFAULT_RESAMPLING,
         zero_COT_correction: bool = ZERO_COT_CORRECTION,
-        offline_mode: bool = False) -> dict:
+        offline_mode: bool = False,
+        profiler: FLiESANNProfiler = None) -> dict:
     """
     Retrieve and prepare all input arrays for FLiESANN inference.
     
@@ -67,6 +71,7 @@ def retrieve_FLiESANN_inputs(
         NASADEM_connection: Connection to NASADEM data
         resampling: Resampling method for raster data
         zero_COT_correction: Flag to apply zero COT correction
+        profiler: Optional profiler measuring the retrieval and type determination stages
         
     Returns:
         dict: Dictionary containing all prepared input arrays with keys:
@@ -85,7 +90,7 @@ def retrieve_FLiESANN_inputs(
             - ctype: Cloud type array
     """
     # Determine shape for array operations - include MultiPoint for vectorized processing
-    if isinstance(geometry, (Raster, np.ndarray)):
+    if isinstance(geometry, (Raster, RasterGeometry, np.ndarray)):
         shape = geometry.shape
     elif isinstance(geometry, (shapely.geometry.MultiPoint, rt.MultiPoint)):
         shape = (len(geometry.geoms),) if hasattr(geometry, 'geoms') else (len(geometry),)
@@ -99,13 +104,14 @@ def retrieve_FLiESANN_inputs(
     SZA_deg = ensure_array(SZA_deg, shape)
 
     # Retrieve static inputs (elevation and climate)
-    static_inputs = retrieve_FLiESANN_static_inputs(
-        elevation_m=elevation_m,
-        KG_climate=KG_climate,
-        geometry=geometry,
-        NASADEM_connection=NASADEM_connection,
-        resampling=resampling
-    )
+    with profile_stage(profiler, "static_retrieval", None if shape is None else int(np.prod(shape))):
+        static_inputs = retrieve_FLiESANN_static_inputs(
+            elevation_m=elevation_m,
+            KG_climate=KG_climate,
+            geometry=geometry,
+            NASADEM_connection=NASADEM_connection,
+            resampling=resampling
+        )
     
     # Extract retrieved values
     elevation_m = static_inputs["elevation_m"]
@@ -123,7 +129,8 @@ def retrieve_FLiESANN_inputs(
         GEOS5FP_connection=GEOS5FP_connection,
         resampling=resampling,
         zero_COT_correction=zero_COT_correction,
-        offline_mode=offline_mode
+        offline_mode=offline_mode,
+        profiler=profiler
     )
     
     # Extract retrieved values
@@ -151,6 +158,8 @@ def retrieve_FLiESANN_inputs(
     # For raster geometries, use the shape of retrieved data
     if isinstance(geometry, (shapely.geometry.MultiPoint, rt.MultiPoint)):
         actual_shape = (len(geometry.geoms),) if hasattr(geometry, 'geoms') else shape
+    elif isinstance(geometry, RasterGeometry):
+        actual_shape = geometry.shape
     elif hasattr(COT, 'shape') and not isinstance(COT, pd.DataFrame):
         actual_shape = COT.shape
     elif hasattr(AOT, 'shape') and not isinstance(AOT, pd.DataFrame):
@@ -163,7 +172,7 @@ def retrieve_FLiESANN_inputs(
         actual_shape = shape
     
     # Ensure arrays have correct shape
-    KG_climate = ensure_array(KG_climate, actual_shape) if not isinstance(KG_climate, int) else KG_climate
+    KG_climate = ensure_array(KG_climate, actual_shape) if not isinstance(KG_climate, int) or actual_shape else KG_climate
     COT = ensure_array(COT, actual_shape)
     AOT = ensure_array(AOT, actual_shape)
     vapor_gccm = ensure_array(vapor_gccm, actual_shape)
@@ -176,12 +185,13 @@ def retrieve_FLiESANN_inputs(
     SWin_Wm2 = ensure_array(SWin_Wm2, actual_shape)
 
     # determine aerosol/cloud types
-    atype = determine_atype(KG_climate, COT)  # Determine aerosol type
-    ctype = determine_ctype(KG_climate, COT)  # Determine cloud type
-    
-    # Ensure atype and ctype match actual_shape
-    atype = ensure_array(atype, actual_shape)
-    ctype = ensure_array(ctype, actual_shape)
+    with profile_stage(profiler, "type_determination", int(np.size(COT))):
+        atype = determine_atype(KG_climate, COT)  # Determine aerosol type
+        ctype = determine_ctype(KG_climate, COT)  # Determine cloud type
+        
+        # Ensure atype and ctype match actual_shape
+        atype = ensure_array(atype, actual_shape)
+        ctype = ensure_array(ctype, actual_shape)
     
     return {
         "albedo": albedo,
@@ -6,7 +6,10 @@ from koppengeiger import load_koppen_geiger
 from NASADEM import NASADEM, NASADEMConnection
 import shapely
 
+from .FLiESANN_tracing import trace_span, traced, nbytes
 
+
+@traced
 def retrieve_FLiESANN_static_inputs(
         elevation_m: Union[Raster, np.ndarray, float] = None,
         KG_climate: Union[Raster, np.ndarray, int] = None,
@@ -41,7 +44,12 @@ def retrieve_FLiESANN_static_inputs(
     
     # Retrieve or validate elevation
     if elevation_m is None and geometry is not None:
-        elevation_km = NASADEM_connection.elevation_km(geometry=geometry)
+        with trace_span("NASADEM", variable="elevation_km") as span:
+            elevation_km = NASADEM_connection.elevation_km(geometry=geometry)
+
+            if span:
+                span["bytes_read"] = nbytes(elevation_km)
+
         elevation_m = elevation_km * 1000.0
     elif elevation_m is not None:
         elevation_km = elevation_m / 1000.0
@@ -53,7 +61,11 @@ def retrieve_FLiESANN_static_inputs(
     
     # Retrieve or validate Köppen-Geiger climate
     if KG_climate is None and geometry is not None:
-        KG_climate = load_koppen_geiger(geometry=geometry)
+        with trace_span("koppen_geiger", variable="KG_climate") as span:
+            KG_climate = load_koppen_geiger(geometry=geometry)
+
+            if span:
+                span["bytes_read"] = nbytes(KG_climate)
     
     if KG_climate is None:
         raise ValueError("Köppen-Geiger climate classification or geometry must be given")
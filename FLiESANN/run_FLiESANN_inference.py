@@ -1,10 +1,22 @@
+import logging
+
 import numpy as np
-from tqdm.notebook import tqdm
 
 from .constants import *
 from .load_FLiESANN_model import load_FLiESANN_model
 from .prepare_FLiESANN_inputs import prepare_FLiESANN_inputs
+from .FLiESANN_profiler import FLiESANNProfiler, profile_stage
+from .FLiESANN_tracing import traced, trace_span
+from .deduplicate_FLiESANN_features import deduplicate_FLiESANN_features
+from .FLiESANN_cache import FLiESANNCache
+from .hash_FLiESANN_model import hash_FLiESANN_model
+from .FLiESANN_LUT import FLiESANNLUT
+from .FLiESANN_reduced_precision import FLiESANNReducedPrecision
+from .predict_FLiESANN_model import predict_FLiESANN_model
+
+logger = logging.getLogger(__name__)
 
+@traced
 def run_FLiESANN_inference(
         atype: np.ndarray,
         ctype: np.ndarray,
@@ -18,7 +30,13 @@ def run_FLiESANN_inference(
         ANN_model=None,
         model_filename=MODEL_FILENAME,
         split_atypes_ctypes=SPLIT_ATYPES_CTYPES,
-        use_tqdm=False  # New parameter to toggle TQDM progress bar
+        use_tqdm=False,  # New parameter to toggle TQDM progress bar
+        profiler: FLiESANNProfiler = None,
+        deduplicate_features: bool = False,
+        deduplication_tolerance: float = None,
+        cache: FLiESANNCache = None,
+        LUT: FLiESANNLUT = None,
+        precision: str = "float32"
 ) -> dict:
     """
     Runs inference for an artificial neural network (ANN) emulator of the Forest Light
@@ -43,7 +61,18 @@ def run_FLiESANN_inference(
         model_filename (str, optional): Filename of the ANN model to load if ANN_model is not provided.
         split_atypes_ctypes (bool, optional): Flag indicating how aerosol and cloud types are 
                                              handled in input preparation.
-        use_tqdm (bool, optional): Flag to enable or disable the TQDM progress bar for predictions.
+        use_tqdm (bool, optional): Flag to enable or disable the TQDM progress bar for predictions, advancing once per chunk.
+        profiler (FLiESANNProfiler, optional): Profiler measuring the feature preparation and inference stages.
+        deduplicate_features (bool, optional): If True, inference runs on the unique rows of the feature matrix
+            only and the outputs are scattered back to every row. The reduction ratio is logged. Defaults to False.
+        deduplication_tolerance (float, optional): Quantization step under which feature rows are treated
+            as identical when deduplicating. Defaults to None (bit-identical rows only).
+        cache (FLiESANNCache, optional): Cache of ANN outputs shared across calls. Only the rows it misses are
+            predicted, and their outputs are added to it. Defaults to None.
+        LUT (FLiESANNLUT, optional): Lookup table emulator interpolating the outputs instead of running the ANN.
+            Defaults to None.
+        precision (str, optional): "float32" runs the Keras model, "float16" or "int8" run a NumPy engine with
+            weights stored in reduced precision, see `FLiESANNReducedPrecision`. Defaults to "float32".
 
     Returns:
         dict: A dictionary containing the predicted radiative transfer parameters:
@@ -56,7 +85,8 @@ def run_FLiESANN_inference(
               - 'NIR_diffuse_fraction' (np.ndarray): Diffuse fraction of radiation in the near-infrared band.
 
     Raises:
-        ValueError: If the input data shapes are incompatible with the model.
+        ValueError: If the input data shapes are incompatible with the model, or a cache is combined with a lookup table,
+            reduced precision or a different model.
 
     Notes:
         - The function automatically adjusts the input shape to match the model's expected input dimensions.
@@ -75,59 +105,88 @@ def run_FLiESANN_inference(
         old_logger_level = None
 
     try:
-        if ANN_model is None:
+        if cache is not None and LUT is not None:
+            raise ValueError("the cache holds ANN outputs and cannot be combined with a lookup table")
+
+        if cache is not None and precision != "float32":
+            raise ValueError(f"the cache holds float32 ANN outputs and cannot be combined with {precision} precision")
+
+        if ANN_model is None and LUT is None:
             # Load the ANN model if not provided
             ANN_model = load_FLiESANN_model(model_filename)
 
+        if cache is not None and hash_FLiESANN_model(ANN_model) != cache.model_hash:
+            raise ValueError("the cache holds the outputs of a different ANN model")
+
         # Ensure all inputs are of numerical type
-        atype = np.asarray(atype, dtype=np.float32)
-        ctype = np.asarray(ctype, dtype=np.float32)
-        COT = np.asarray(COT, dtype=np.float32)
-        AOT = np.asarray(AOT, dtype=np.float32)
-        vapor_gccm = np.asarray(vapor_gccm, dtype=np.float32)
-        ozone_cm = np.asarray(ozone_cm, dtype=np.float32)
-        albedo = np.asarray(albedo, dtype=np.float32)
-        elevation_m = np.asarray(elevation_m, dtype=np.float32)
-        SZA = np.asarray(SZA, dtype=np.float32)
-
-        # Check for NaN values and create a mask
-        nan_mask = np.isnan(atype) | np.isnan(ctype) | np.isnan(COT) | \
-                   np.isnan(AOT) | np.isnan(vapor_gccm) | np.isnan(ozone_cm) | \
-                   np.isnan(albedo) | np.isnan(elevation_m) | np.isnan(SZA)
-
-        # Replace NaNs with a placeholder value (e.g., 0) for processing
-        atype = np.where(nan_mask, 0, atype)
-        ctype = np.where(nan_mask, 0, ctype)
-        COT = np.where(nan_mask, 0, COT)
-        AOT = np.where(nan_mask, 0, AOT)
-        vapor_gccm = np.where(nan_mask, 0, vapor_gccm)
-        ozone_cm = np.where(nan_mask, 0, ozone_cm)
-        albedo = np.where(nan_mask, 0, albedo)
-        elevation_m = np.where(nan_mask, 0, elevation_m)
-        SZA = np.where(nan_mask, 0, SZA)
-
-        # Convert elevation from meters to kilometers after all array processing
-        elevation_km = elevation_m / 1000.0
-
-        # Prepare inputs for the ANN model
-        inputs = prepare_FLiESANN_inputs(
-            atype=atype,
-            ctype=ctype,
-            COT=COT,
-            AOT=AOT,
-            vapor_gccm=vapor_gccm,
-            ozone_cm=ozone_cm,
-            albedo=albedo,
-            elevation_km=elevation_km,
-            SZA=SZA,
-            split_atypes_ctypes=split_atypes_ctypes
-        )
-
-        # Ensure all columns in the DataFrame are numerical
-        inputs = inputs.astype(np.float32)
-
-        # Convert DataFrame to numpy array and reshape for the model
-        inputs_array = inputs.values
+        with profile_stage(profiler, "feature_preparation", int(np.size(COT))):
+            atype = np.asarray(atype, dtype=np.float32)
+            ctype = np.asarray(ctype, dtype=np.float32)
+            COT = np.asarray(COT, dtype=np.float32)
+            AOT = np.asarray(AOT, dtype=np.float32)
+            vapor_gccm = np.asarray(vapor_gccm, dtype=np.float32)
+            ozone_cm = np.asarray(ozone_cm, dtype=np.float32)
+            albedo = np.asarray(albedo, dtype=np.float32)
+            elevation_m = np.asarray(elevation_m, dtype=np.float32)
+            SZA = np.asarray(SZA, dtype=np.float32)
+
+            # Check for NaN values and create a mask
+            nan_mask = np.isnan(atype) | np.isnan(ctype) | np.isnan(COT) | \
+                       np.isnan(AOT) | np.isnan(vapor_gccm) | np.isnan(ozone_cm) | \
+                       np.isnan(albedo) | np.isnan(elevation_m) | np.isnan(SZA)
+
+            # Replace NaNs with a placeholder value (e.g., 0) for processing
+            atype = np.where(nan_mask, 0, atype)
+            ctype = np.where(nan_mask, 0, ctype)
+            COT = np.where(nan_mask, 0, COT)
+            AOT = np.where(nan_mask, 0, AOT)
+            vapor_gccm = np.where(nan_mask, 0, vapor_gccm)
+            ozone_cm = np.where(nan_mask, 0, ozone_cm)
+            albedo = np.where(nan_mask, 0, albedo)
+            elevation_m = np.where(nan_mask, 0, elevation_m)
+            SZA = np.where(nan_mask, 0, SZA)
+
+            # Convert elevation from meters to kilometers after all array processing
+            elevation_km = elevation_m / 1000.0
+
+            # Prepare inputs for the ANN model
+            inputs = prepare_FLiESANN_inputs(
+                atype=atype,
+                ctype=ctype,
+                COT=COT,
+                AOT=AOT,
+                vapor_gccm=vapor_gccm,
+                ozone_cm=ozone_cm,
+                albedo=albedo,
+                elevation_km=elevation_km,
+                SZA=SZA,
+                split_atypes_ctypes=split_atypes_ctypes
+            )
+
+            # Ensure all columns in the DataFrame are numerical
+            inputs = inputs.astype(np.float32)
+
+            # Convert DataFrame to numpy array and reshape for the model
+            inputs_array = inputs.values
+
+        if deduplicate_features:
+            n_rows = inputs_array.shape[0]
+
+            with profile_stage(profiler, "deduplication", n_rows), trace_span("deduplication", rows=n_rows) as span:
+                inputs_array, inverse = deduplicate_FLiESANN_features(inputs_array, deduplication_tolerance)
+                reduction_ratio = n_rows / max(inputs_array.shape[0], 1)
+                span["unique_rows"] = inputs_array.shape[0]
+                span["reduction_ratio"] = reduction_ratio
+
+            logger.info(f"deduplicated {n_rows} feature rows to {inputs_array.shape[0]} unique rows (reduction ratio {reduction_ratio:.2f})")
+
+        if cache is not None:
+            # predict only the rows the cache does not hold
+            cached_outputs, missing = cache.lookup(inputs_array)
+            inputs_array = inputs_array[missing]
+
+        # two-dimensional feature matrix the model input is shaped from
+        features = inputs_array
 
         # Check what input shape the model expects and adapt accordingly
         # Different TensorFlow/Keras versions may have different input requirements
@@ -149,50 +208,50 @@ def run_FLiESANN_inference(
             # If input_shape is not available, try 2D first
             expects_3d = False
 
-        # Run inference using the ANN model with warnings suppressed
-        try:
-            with warnings.catch_warnings():
-                warnings.simplefilter("ignore")
-
-                if use_tqdm:
-                    # Use TQDM progress bar for predictions
-                    outputs = []
-                    for batch in tqdm(inputs_array, desc="Running Inference", unit="batch"):
-                        batch_output = ANN_model.predict(batch[None, ...])  # Add batch dimension
-                        outputs.append(batch_output)
-
-                    outputs = np.vstack(outputs)  # Combine all batch outputs
-                else:
-                    # Run prediction without progress bar
-                    outputs = ANN_model.predict(inputs_array)
-        except ValueError as e:
-            error_msg = str(e)
-            if not expects_3d and ("expected shape" in error_msg or "incompatible" in error_msg):
-                # Try reshaping to 3D if 2D failed
-                inputs_array = inputs.values  # Reset to original 2D shape
-                inputs_array = inputs_array.reshape(inputs_array.shape[0], 1, inputs_array.shape[1])
-                with warnings.catch_warnings():
-                    warnings.simplefilter("ignore")
-
-                    if use_tqdm:
-                        # Use TQDM progress bar for predictions
-                        outputs = []
-                        for batch in tqdm(inputs_array, desc="Running Inference", unit="batch"):
-                            batch_output = ANN_model.predict(batch[None, ...])  # Add batch dimension
-                            outputs.append(batch_output)
-
-                        outputs = np.vstack(outputs)  # Combine all batch outputs
+        if features.shape[0] == 0:
+            # every row was served from the cache, or there are no rows; ANN_model is not loaded with a LUT
+            outputs = np.empty((0, len(ANN_OUTPUT_VARIABLES)), dtype=np.float32)
+        elif LUT is not None:
+            with profile_stage(profiler, "inference", int(features.shape[0])):
+                outputs = LUT.predict(features)
+        elif precision != "float32":
+            with profile_stage(profiler, "inference", int(features.shape[0])):
+                outputs = FLiESANNReducedPrecision.for_model(ANN_model, precision).predict(features)
+        else:
+            # Run inference using the traced model call with warnings suppressed
+            with profile_stage(profiler, "inference", int(inputs_array.shape[0])):
+                try:
+                    with warnings.catch_warnings():
+                        warnings.simplefilter("ignore")
+                        outputs = predict_FLiESANN_model(ANN_model, inputs_array, use_tqdm=use_tqdm)
+                except ValueError as e:
+                    error_msg = str(e)
+                    if not expects_3d and ("expected shape" in error_msg or "incompatible" in error_msg):
+                        # Try reshaping to 3D if 2D failed
+                        inputs_array = features  # Reset to original 2D shape
+                        inputs_array = inputs_array.reshape(inputs_array.shape[0], 1, inputs_array.shape[1])
+                        with warnings.catch_warnings():
+                            warnings.simplefilter("ignore")
+                            outputs = predict_FLiESANN_model(ANN_model, inputs_array, use_tqdm=use_tqdm)
+                        expects_3d = True
                     else:
-                        # Run prediction without progress bar
-                        outputs = ANN_model.predict(inputs_array)
-                expects_3d = True
-            else:
-                raise e
+                        raise e
 
         # Handle output dimensions based on input dimensions used
         if expects_3d and len(outputs.shape) == 3:
             outputs = outputs.squeeze(axis=1)
 
+        if cache is not None:
+            cache.store(features, outputs)
+
+            if cached_outputs is not None:
+                cached_outputs[missing] = outputs
+                outputs = cached_outputs
+
+        if deduplicate_features:
+            # scatter the outputs of the unique rows back to every row
+            outputs = outputs[inverse]
+
         shape = COT.shape
 
         # Prepare the results dictionary
@@ -0,0 +1,176 @@
+import logging
+import multiprocessing
+import os
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from .constants import *
+
+logger = logging.getLogger(__name__)
+
+# state held by each worker process for the lifetime of the pool
+_worker_state = {}
+
+class FLiESANNWorkerError(Exception):
+    """Raised when one or more partitions of a table fail in the worker pool."""
+    def __init__(self, failures: list):
+        self.failures = failures
+        details = "\n".join(
+            f"  partition {failure['partition']} (rows {failure['start']}-{failure['stop'] - 1}, worker PID {failure['pid']}): {failure['error']}"
+            for failure in failures
+        )
+        super().__init__(f"{len(failures)} FLiESANN table partition(s) failed:\n{details}")
+
+def _initialize_worker(
+        model_filename: str,
+        GEOS5FP_connection,
+        NASADEM_connection,
+        offline_mode: bool):
+    # load the model and open connections once per worker process
+    from GEOS5FP import GEOS5FP
+    from .load_FLiESANN_model import load_FLiESANN_model
+
+    _worker_state["ANN_model"] = load_FLiESANN_model(model_filename)
+
+    if GEOS5FP_connection is None and not offline_mode:
+        GEOS5FP_connection = GEOS5FP()
+
+    _worker_state["GEOS5FP_connection"] = GEOS5FP_connection
+    _worker_state["NASADEM_connection"] = NASADEM_connection
+    _worker_state["offline_mode"] = offline_mode
+
+def _process_partition(partition: int, start: int, stop: int, partition_df: DataFrame) -> dict:
+    from .process_FLiESANN_table import process_FLiESANN_table
+
+    try:
+        output_df = process_FLiESANN_table(
+            partition_df,
+            GEOS5FP_connection=_worker_state["GEOS5FP_connection"],
+            NASADEM_connection=_worker_state["NASADEM_connection"],
+            offline_mode=_worker_state["offline_mode"],
+            ANN_model=_worker_state["ANN_model"]
+        )
+
+        error = None
+        error_traceback = None
+    except Exception as e:
+        output_df = None
+        error = f"{type(e).__name__}: {e}"
+        error_traceback = traceback.format_exc()
+
+    return {
+        "partition": partition,
+        "start": start,
+        "stop": stop,
+        "pid": os.getpid(),
+        "output_df": output_df,
+        "error": error,
+        "traceback": error_traceback
+    }
+
+def create_FLiESANN_worker_pool(
+        n_workers: int,
+        GEOS5FP_connection=None,
+        NASADEM_connection=None,
+        model_filename: str = MODEL_FILENAME,
+        offline_mode: bool = False) -> ProcessPoolExecutor:
+    """
+    Start a pool of FLiESANN worker processes that can be reused across tables.
+
+    Workers are started with the "spawn" method so that TensorFlow is initialized
+    independently in each process. Each worker loads the ANN model from `model_filename` and
+    opens its GEOS-5 FP connection once, when it starts. Connection objects passed in must be
+    picklable; when no GEOS-5 FP connection is given, each worker creates its own.
+
+    Args:
+        n_workers (int): Number of worker processes.
+        GEOS5FP_connection (GEOS5FP, optional): Connection object for GEOS-5 FP data.
+        NASADEM_connection (NASADEMConnection, optional): Connection object for NASADEM data.
+        model_filename (str, optional): Filename of the ANN model loaded by each worker.
+        offline_mode (bool, optional): Passed through to `process_FLiESANN_table`.
+
+    Returns:
+        ProcessPoolExecutor: The worker pool, to be shut down by the caller (e.g. as a context manager).
+    """
+    return ProcessPoolExecutor(
+        max_workers=n_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_initialize_worker,
+        initargs=(model_filename, GEOS5FP_connection, NASADEM_connection, offline_mode)
+    )
+
+def run_FLiESANN_table_partitions(
+        input_df: DataFrame,
+        n_workers: int,
+        GEOS5FP_connection=None,
+        NASADEM_connection=None,
+        model_filename: str = MODEL_FILENAME,
+        offline_mode: bool = False,
+        worker_pool: ProcessPoolExecutor = None) -> DataFrame:
+    """
+    Process a FLiESANN input table across a pool of worker processes.
+
+    The table is split into contiguous partitions of rows, `PARTITIONS_PER_WORKER` per worker,
+    so that a slow partition (e.g. one waiting on GEOS-5 FP) does not hold up the other workers
+    once they finish. Each worker runs `process_FLiESANN_table` on the partitions it is given.
+    Partial results are reassembled in the original row order, so the output is identical to
+    serial processing.
+
+    Workers load the model from `model_filename`; a model object loaded in the calling process
+    cannot be shared with them. Unless an existing `worker_pool` is given, a pool is started with
+    `create_FLiESANN_worker_pool` for this table and shut down afterwards.
+
+    Args:
+        input_df (pd.DataFrame): Table of FLiESANN inputs, as accepted by `process_FLiESANN_table`.
+        n_workers (int): Number of worker processes.
+        GEOS5FP_connection (GEOS5FP, optional): Connection object for GEOS-5 FP data.
+        NASADEM_connection (NASADEMConnection, optional): Connection object for NASADEM data.
+        model_filename (str, optional): Filename of the ANN model loaded by each worker.
+        offline_mode (bool, optional): Passed through to `process_FLiESANN_table`.
+        worker_pool (ProcessPoolExecutor, optional): Pool from `create_FLiESANN_worker_pool` to submit the
+            partitions to, e.g. one shared across the checkpoint chunks of a table. Defaults to None.
+
+    Returns:
+        pd.DataFrame: Table of FLiESANN outputs in the original row order.
+
+    Raises:
+        FLiESANNWorkerError: If any partition fails, listing the rows, worker and error of each failure.
+    """
+    n_partitions = max(1, min(n_workers * PARTITIONS_PER_WORKER, len(input_df)))
+    boundaries = np.linspace(0, len(input_df), n_partitions + 1).astype(int)
+
+    logger.info(f"processing {len(input_df)} rows in {n_partitions} partitions across {n_workers} worker processes")
+
+    if worker_pool is None:
+        with create_FLiESANN_worker_pool(
+                min(n_workers, n_partitions),
+                GEOS5FP_connection=GEOS5FP_connection,
+                NASADEM_connection=NASADEM_connection,
+                model_filename=model_filename,
+                offline_mode=offline_mode) as worker_pool:
+            return _run_partitions(worker_pool, input_df, boundaries)
+
+    return _run_partitions(worker_pool, input_df, boundaries)
+
+def _run_partitions(worker_pool: ProcessPoolExecutor, input_df: DataFrame, boundaries: np.ndarray) -> DataFrame:
+    futures = [
+        worker_pool.submit(_process_partition, partition, start, stop, input_df.iloc[start:stop])
+        for partition, (start, stop) in enumerate(zip(boundaries[:-1], boundaries[1:]))
+    ]
+
+    results = [future.result() for future in futures]
+    failures = [result for result in results if result["error"] is not None]
+
+    for failure in failures:
+        logger.error(f"partition {failure['partition']} (rows {failure['start']}-{failure['stop'] - 1}) failed in worker PID {failure['pid']}:\n{failure['traceback']}")
+
+    if failures:
+        raise FLiESANNWorkerError(failures)
+
+    output_df = pd.concat([result["output_df"] for result in results])
+
+    return output_df
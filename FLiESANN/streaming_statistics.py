@@ -0,0 +1,123 @@
+from typing import List
+
+import numpy as np
+
+class StreamingMoments:
+    """
+    Running mean and variance per element over a stream of batches of samples.
+
+    Batches are merged with the parallel form of Welford's algorithm (Chan et al. 1979), so only the
+    count, mean and sum of squared deviations are kept, in float64.
+    """
+    def __init__(self):
+        self.count = 0
+        self.mean = None
+        self.M2 = None
+
+    def update(self, samples: np.ndarray):
+        """
+        Add a batch of samples stacked along the first axis.
+        """
+        samples = np.asarray(samples, dtype=np.float64)
+        count = samples.shape[0]
+        mean = samples.mean(axis=0)
+        M2 = ((samples - mean) ** 2).sum(axis=0)
+
+        if self.count == 0:
+            self.count, self.mean, self.M2 = count, mean, M2
+            return
+
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean = self.mean + delta * count / total
+        self.M2 = self.M2 + M2 + delta ** 2 * self.count * count / total
+        self.count = total
+
+    def std(self, ddof: int = 1) -> np.ndarray:
+        """
+        Standard deviation of the samples seen so far.
+        """
+        return np.sqrt(self.M2 / max(self.count - ddof, 1))
+
+class StreamingQuantiles:
+    """
+    Running estimates of quantiles per element over a stream of samples, using the P² algorithm
+    (Jain & Chlamtac 1985).
+
+    Each quantile keeps five markers per element whose heights are adjusted with piecewise-parabolic
+    interpolation as samples arrive, so memory does not grow with the number of samples. The first
+    five samples are kept and give exact quantiles until the markers are initialized.
+    """
+    def __init__(self, quantiles: List[float]):
+        self.quantiles = list(quantiles)
+        self.count = 0
+        self._initial = []
+        self.heights = None
+        self.positions = None
+        self.desired = None
+        self.increments = np.array([[0, p / 2, p, (1 + p) / 2, 1] for p in self.quantiles])
+
+    def update(self, samples: np.ndarray):
+        """
+        Add a batch of samples stacked along the first axis.
+        """
+        for sample in np.asarray(samples, dtype=np.float64):
+            self._add(sample)
+
+    def _add(self, x: np.ndarray):
+        self.count += 1
+
+        if self.heights is None:
+            self._initial.append(x)
+
+            if len(self._initial) == 5:
+                # markers for every quantile start at the sorted first five samples, at positions 1..5
+                initial = np.sort(np.stack(self._initial), axis=0)
+                self.heights = np.repeat(initial[None], len(self.quantiles), axis=0)
+                self.positions = np.broadcast_to(np.arange(1.0, 6.0)[None, :, None], self.heights.shape).copy()
+                self.desired = 1 + 4 * self.increments
+                self._initial = []
+
+            return
+
+        q = self.heights
+        n = self.positions
+
+        # markers above the cell of the sample move up one position; the last marker always moves
+        n[:, 1:4] += q[:, 1:4] > x
+        n[:, 4] += 1
+
+        # extend the extreme markers
+        q[:, 0] = np.minimum(q[:, 0], x)
+        q[:, 4] = np.maximum(q[:, 4], x)
+        self.desired = self.desired + self.increments
+
+        for i in range(1, 4):
+            d = self.desired[:, i, None] - n[:, i]
+            move = ((d >= 1) & (n[:, i + 1] - n[:, i] > 1)) | ((d <= -1) & (n[:, i - 1] - n[:, i] < -1))
+
+            if not move.any():
+                continue
+
+            s = np.sign(d)
+            parabolic = q[:, i] + s / (n[:, i + 1] - n[:, i - 1]) * (
+                (n[:, i] - n[:, i - 1] + s) * (q[:, i + 1] - q[:, i]) / (n[:, i + 1] - n[:, i]) +
+                (n[:, i + 1] - n[:, i] - s) * (q[:, i] - q[:, i - 1]) / (n[:, i] - n[:, i - 1])
+            )
+            neighbour = np.where(s > 0, i + 1, i - 1)
+            q_neighbour = np.take_along_axis(q, neighbour[:, None], axis=1)[:, 0]
+            n_neighbour = np.take_along_axis(n, neighbour[:, None], axis=1)[:, 0]
+            linear = q[:, i] + s * (q_neighbour - q[:, i]) / (n_neighbour - n[:, i])
+            adjusted = np.where((q[:, i - 1] < parabolic) & (parabolic < q[:, i + 1]), parabolic, linear)
+
+            q[:, i] = np.where(move, adjusted, q[:, i])
+            n[:, i] = np.where(move, n[:, i] + s, n[:, i])
+
+    def result(self) -> np.ndarray:
+        """
+        Current quantile estimates, stacked along the first axis in the order of `quantiles`.
+        """
+        if self.heights is None:
+            return np.stack([np.quantile(np.stack(self._initial), p, axis=0) for p in self.quantiles])
+
+        return self.heights[:, 2].copy()
@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+
+# FLiESANN inputs and outputs are stored as single precision, matching the precision used for inference
+FLOAT32_COLUMNS = [
+    "albedo",
+    "COT",
+    "AOT",
+    "vapor_gccm",
+    "ozone_cm",
+    "elevation_m",
+    "elevation_km",
+    "SZA",
+    "SZA_deg",
+    "NDVI",
+    "PAR_albedo",
+    "NIR_albedo",
+    "SWin_Wm2",
+    "SWin_TOA_Wm2",
+    "SWout_Wm2",
+    "UV_Wm2",
+    "PAR_Wm2",
+    "NIR_Wm2",
+    "PAR_diffuse_Wm2",
+    "NIR_diffuse_Wm2",
+    "PAR_direct_Wm2",
+    "NIR_direct_Wm2",
+    "PAR_reflected_Wm2",
+    "NIR_reflected_Wm2",
+    "atmospheric_transmittance",
+    "UV_proportion",
+    "PAR_proportion",
+    "NIR_proportion",
+    "UV_diffuse_fraction",
+    "PAR_diffuse_fraction",
+    "NIR_diffuse_fraction"
+]
+
+# Köppen-Geiger climate codes are small non-negative integers
+UINT8_COLUMNS = ["KG_climate"]
+
+# timestamps are stored as timezone-aware UTC
+TIME_COLUMNS = ["time_UTC"]
+
+# geometries are stored as well-known text
+GEOMETRY_COLUMNS = ["geometry"]
+
+def apply_table_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Coerce the known columns of a FLiESANN table to their typed schema.
+
+    Input and output variables are cast to float32, Köppen-Geiger climate codes to uint8
+    and `time_UTC` to a timezone-aware UTC timestamp. Geometry objects are serialized to
+    well-known text. Columns that are not part of the schema are left unchanged. Climate
+    code columns containing missing or out-of-range values are left unchanged rather than
+    being silently truncated.
+
+    Args:
+        df (pd.DataFrame): Table of FLiESANN inputs and/or outputs.
+
+    Returns:
+        pd.DataFrame: Copy of the table with typed columns.
+    """
+    df = df.copy()
+
+    for column in FLOAT32_COLUMNS:
+        if column in df.columns:
+            df[column] = pd.to_numeric(df[column], errors="coerce").astype(np.float32)
+
+    for column in UINT8_COLUMNS:
+        if column in df.columns:
+            values = pd.to_numeric(df[column], errors="coerce")
+
+            if values.notna().all() and values.between(0, 255).all():
+                df[column] = values.astype(np.uint8)
+
+    for column in TIME_COLUMNS:
+        if column in df.columns:
+            if pd.api.types.is_datetime64_any_dtype(df[column]):
+                if df[column].dt.tz is None:
+                    df[column] = df[column].dt.tz_localize("UTC")
+                else:
+                    df[column] = df[column].dt.tz_convert("UTC")
+            else:
+                df[column] = pd.to_datetime(df[column], format="mixed", utc=True)
+
+    for column in GEOMETRY_COLUMNS:
+        if column in df.columns:
+            df[column] = [geometry if geometry is None or isinstance(geometry, str) else geometry.wkt for geometry in df[column]]
+
+    return df
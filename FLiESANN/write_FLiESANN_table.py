@@ -0,0 +1,47 @@
+from os.path import splitext
+
+import pandas as pd
+
+from .table_schema import apply_table_schema
+from .read_FLiESANN_table import PARQUET_EXTENSIONS, ARROW_EXTENSIONS
+
+def write_FLiESANN_table(
+        df: pd.DataFrame,
+        filename: str,
+        compression: str = "zstd") -> str:
+    """
+    Write a FLiESANN input or output table to Parquet, Arrow IPC (Feather) or CSV.
+
+    The table is coerced to the typed FLiESANN schema before writing, so Parquet and Arrow
+    files carry float32 variables, uint8 climate codes and `timestamp[UTC]` times.
+
+    Args:
+        df (pd.DataFrame): Table to write.
+        filename (str): Destination path ending in `.parquet`, `.arrow`/`.feather` or `.csv`.
+        compression (str, optional): Compression codec for Parquet and Arrow files. Defaults to "zstd".
+
+    Returns:
+        str: The filename written.
+
+    Raises:
+        ValueError: If the file extension is not recognized.
+    """
+    extension = splitext(filename)[1].lower()
+    df = apply_table_schema(df)
+
+    if extension in PARQUET_EXTENSIONS or extension in ARROW_EXTENSIONS:
+        import pyarrow as pa
+        table = pa.Table.from_pandas(df, preserve_index=False)
+
+        if extension in PARQUET_EXTENSIONS:
+            import pyarrow.parquet as pq
+            pq.write_table(table, filename, compression=compression)
+        else:
+            import pyarrow.feather as feather
+            feather.write_feather(table, filename, compression=compression)
+    elif extension == ".csv":
+        df.to_csv(filename, index=False)
+    else:
+        raise ValueError(f"unrecognized FLiESANN table format: {filename}")
+
+    return filename
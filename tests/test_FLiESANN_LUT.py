@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+import rasters as rt
+
+from FLiESANN import FLiESANN, FLiESANNLUT, build_FLiESANN_LUT, FLiESANN_LUT_accuracy_report, load_FLiESANN_model
+from FLiESANN.prepare_FLiESANN_inputs import prepare_FLiESANN_inputs
+from FLiESANN.run_FLiESANN_inference import run_FLiESANN_inference
+
+NODES = {
+    "COT": [0, 1, 4, 16],
+    "AOT": [0, 0.2, 1],
+    "vapor_gccm": [0, 2, 5],
+    "ozone_cm": [0.2, 0.5],
+    "albedo": [0, 0.2, 0.5],
+    "elevation_km": [0, 3],
+    "SZA": [0, 30, 60, 90]
+}
+
+def test_FLiESANN_LUT(tmp_path):
+    ANN_model = load_FLiESANN_model()
+    LUT = build_FLiESANN_LUT(tmp_path / "FLiESANN_LUT.npy", nodes=NODES, ANN_model=ANN_model)
+
+    # the table reproduces the ANN at the grid nodes
+    features = prepare_FLiESANN_inputs(
+        atype=np.array([1, 1]),
+        ctype=np.array([0, 3]),
+        COT=np.array([1, 16]),
+        AOT=np.array([0.2, 0]),
+        vapor_gccm=np.array([2, 5]),
+        ozone_cm=np.array([0.5, 0.2]),
+        albedo=np.array([0, 0.2]),
+        elevation_km=np.array([3, 0]),
+        SZA=np.array([30, 60])
+    ).astype(np.float32).values
+
+    expected = ANN_model.predict(features[:, None, :], verbose=0).squeeze(axis=1)
+    assert np.allclose(LUT.predict(features), expected, atol=1e-6)
+
+    # empty inputs do not need the model, which is not loaded with a lookup table
+    empty = np.empty(0, dtype=np.float32)
+    empty_results = run_FLiESANN_inference(empty, empty, empty, empty, empty, empty, empty, empty, empty, LUT=LUT)
+    assert empty_results["atmospheric_transmittance"].shape == (0,)
+
+    geometry = rt.RasterGrid(x_origin=-117, y_origin=35, cell_width=0.01, cell_height=-0.01, rows=10, cols=10)
+    albedo = np.random.default_rng(0).uniform(0.05, 0.3, geometry.shape).astype(np.float32)
+
+    inputs = {
+        "albedo": albedo,
+        "COT": 0.5,
+        "AOT": 0.1,
+        "vapor_gccm": 1.0,
+        "ozone_cm": 0.3,
+        "elevation_m": 100.0,
+        "SZA_deg": 30.0,
+        "KG_climate": 3,
+        "day_of_year": 190.0,
+        "hour_of_day": 12.0,
+        "geometry": geometry,
+        "offline_mode": True,
+        "ANN_model": ANN_model
+    }
+
+    reference = FLiESANN(**inputs)
+    interpolated = FLiESANN(LUT=LUT, **inputs)
+
+    assert np.allclose(interpolated["SWin_Wm2"], reference["SWin_Wm2"], rtol=0.05)
+
+    report = FLiESANN_LUT_accuracy_report(LUT, ANN_model=ANN_model)
+    assert list(report.variable) == LUT.outputs
+    assert (report.RMS_error <= report.max_absolute_error).all()
+
+    # a table is only loaded for the model it was built from
+    assert FLiESANNLUT(tmp_path / "FLiESANN_LUT.npy").outputs == LUT.outputs
+
+    modified = load_FLiESANN_model()
+    weights = modified.get_weights()
+    weights[-1] = weights[-1] + 0.1
+    modified.set_weights(weights)
+
+    with pytest.raises(ValueError):
+        FLiESANNLUT(tmp_path / "FLiESANN_LUT.npy", ANN_model=modified)
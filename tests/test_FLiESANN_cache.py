@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+import rasters as rt
+
+from FLiESANN import FLiESANN, FLiESANNCache, load_FLiESANN_model
+
+def test_FLiESANN_cache(tmp_path):
+    geometry = rt.RasterGrid(x_origin=-117, y_origin=35, cell_width=0.01, cell_height=-0.01, rows=10, cols=10)
+    albedo = np.random.default_rng(0).uniform(0.05, 0.3, geometry.shape).astype(np.float32)
+
+    inputs = {
+        "COT": 0.5,
+        "AOT": 0.1,
+        "vapor_gccm": 1.0,
+        "ozone_cm": 0.3,
+        "elevation_m": 100.0,
+        "SZA_deg": 30.0,
+        "KG_climate": 3,
+        "day_of_year": 190.0,
+        "hour_of_day": 12.0,
+        "geometry": geometry,
+        "offline_mode": True,
+        "ANN_model": load_FLiESANN_model()
+    }
+
+    expected = FLiESANN(albedo=albedo, **inputs)
+    cache = FLiESANNCache(directory=tmp_path)
+
+    first = FLiESANN(albedo=albedo, cache=cache, **inputs)
+    assert cache.statistics()["hits"] == 0
+
+    second = FLiESANN(albedo=albedo, cache=cache, **inputs)
+    statistics = cache.statistics()
+    assert statistics["hits"] == statistics["misses"] == geometry.rows * geometry.cols
+    assert statistics["hit_rate"] == 0.5
+
+    # half of the rows are new
+    changed = albedo.copy()
+    changed[:5] += 0.01
+    FLiESANN(albedo=changed, cache=cache, **inputs)
+    assert cache.statistics()["misses"] == geometry.rows * geometry.cols * 3 // 2
+
+    # a new cache in the same directory is served from disk
+    reopened = FLiESANNCache(directory=tmp_path)
+    third = FLiESANN(albedo=albedo, cache=reopened, **inputs)
+    assert reopened.statistics()["disk_hits"] == geometry.rows * geometry.cols
+
+    for results in [first, second, third]:
+        for variable in ["SWin_Wm2", "PAR_diffuse_Wm2", "NIR_direct_Wm2"]:
+            assert np.allclose(results[variable], expected[variable], rtol=1e-4)
+
+    # the cache only serves float32 outputs of the model it was built for
+    with pytest.raises(ValueError):
+        FLiESANN(albedo=albedo, cache=cache, precision="int8", **inputs)
+
+    modified = load_FLiESANN_model()
+    weights = modified.get_weights()
+    weights[-1] = weights[-1] + 0.1
+    modified.set_weights(weights)
+
+    with pytest.raises(ValueError):
+        FLiESANN(albedo=albedo, cache=cache, **{**inputs, "ANN_model": modified})
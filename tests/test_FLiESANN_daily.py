@@ -0,0 +1,47 @@
+from datetime import date
+
+import numpy as np
+import rasters as rt
+
+from FLiESANN import FLiESANN_daily, FLiESANN_daily_accuracy_report, load_FLiESANN_model
+from FLiESANN.calculate_solar_geometry import calculate_solar_declination
+
+def test_FLiESANN_daily_quadrature():
+    geometry = rt.RasterGrid(x_origin=-120, y_origin=80, cell_width=10, cell_height=-10, rows=16, cols=2)
+    date_UTC = date(2024, 6, 21)
+    ANN_model = load_FLiESANN_model()
+
+    inputs = {
+        "albedo": 0.15,
+        "geometry": geometry,
+        "date_UTC": date_UTC,
+        "COT": 0.5,
+        "AOT": 0.1,
+        "vapor_gccm": 1.0,
+        "ozone_cm": 0.3,
+        "elevation_m": 100.0,
+        "KG_climate": 3,
+        "offline_mode": True,
+        "ANN_model": ANN_model
+    }
+
+    results = FLiESANN_daily(**inputs)
+
+    # daily top-of-atmosphere radiation has a closed form in the sunset hour angle
+    day_of_year = date_UTC.timetuple().tm_yday
+    declination_rad = calculate_solar_declination(day_of_year)
+    lat_rad = np.radians(geometry.lat)
+    sunset_hour_angle_rad = np.arccos(np.clip(-np.tan(lat_rad) * np.tan(declination_rad), -1, 1))
+    dr = 1.0 + 0.033 * np.cos(2 * np.pi / 365.0 * day_of_year)
+    SWin_TOA_daily_MJm2 = 24 / np.pi * 1333.6 * dr * (
+        sunset_hour_angle_rad * np.sin(lat_rad) * np.sin(declination_rad) +
+        np.cos(lat_rad) * np.cos(declination_rad) * np.sin(sunset_hour_angle_rad)
+    ) * 3600 / 1e6
+
+    assert np.allclose(results["SWin_TOA_daily_MJm2"].array, SWin_TOA_daily_MJm2, rtol=1e-3, atol=1e-3)
+    assert np.all(results["SWin_daily_MJm2"].array <= results["SWin_TOA_daily_MJm2"].array)
+
+    report = FLiESANN_daily_accuracy_report(dense_nodes=48, **inputs)
+    SWin_report = report.set_index("variable").loc["SWin_daily_MJm2"]
+
+    assert SWin_report["max_relative_error"] < 0.05
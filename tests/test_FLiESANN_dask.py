@@ -0,0 +1,42 @@
+from datetime import datetime
+
+import dask
+import dask.array as da
+import numpy as np
+import rasters as rt
+import xarray as xr
+
+from FLiESANN import FLiESANN, FLiESANN_dask, load_FLiESANN_model
+
+def test_FLiESANN_dask_matches_eager():
+    geometry = rt.RasterGrid(x_origin=-120, y_origin=40, cell_width=0.01, cell_height=-0.01, rows=37, cols=53)
+    rng = np.random.default_rng(0)
+    albedo = rng.uniform(0.05, 0.3, geometry.shape).astype(np.float32)
+    COT = rng.uniform(0, 5, geometry.shape).astype(np.float32)
+
+    inputs = {
+        "AOT": 0.1,
+        "vapor_gccm": 1.0,
+        "ozone_cm": 0.3,
+        "elevation_m": 100.0,
+        "KG_climate": 3,
+        "time_UTC": datetime(2024, 7, 15, 20),
+        "geometry": geometry,
+        "offline_mode": True
+    }
+
+    eager = FLiESANN(albedo=rt.Raster(albedo, geometry=geometry), COT=COT, ANN_model=load_FLiESANN_model(), **inputs)
+
+    lazy = FLiESANN_dask(
+        albedo=xr.DataArray(da.from_array(albedo, chunks=(16, 20)), dims=("y", "x")),
+        COT=da.from_array(COT, chunks=(10, 10)),
+        **inputs
+    )
+
+    assert isinstance(lazy["SWin_Wm2"].data, da.Array)
+    assert lazy["SWin_Wm2"].chunks == ((16, 16, 5), (20, 20, 13))
+
+    computed, = dask.compute(lazy)
+
+    for key, value in computed.items():
+        assert np.allclose(value.values, eager[key].array, equal_nan=True, atol=1e-4), key
@@ -0,0 +1,40 @@
+import numpy as np
+
+from FLiESANN import FLiESANN, FLiESANN_ensemble, load_FLiESANN_model
+
+def test_FLiESANN_ensemble():
+    rng = np.random.default_rng(0)
+    n = 50
+
+    inputs = {
+        "albedo": rng.uniform(0.05, 0.3, n).astype(np.float32),
+        "COT": rng.uniform(0, 10, n).astype(np.float32),
+        "AOT": 0.1,
+        "vapor_gccm": 1.5,
+        "ozone_cm": 0.3,
+        "elevation_m": 500.0,
+        "SZA_deg": rng.uniform(10, 60, n).astype(np.float32),
+        "KG_climate": 3,
+        "day_of_year": 190.0,
+        "hour_of_day": 12.0,
+        "offline_mode": True,
+        "ANN_model": load_FLiESANN_model()
+    }
+
+    deterministic = FLiESANN(**inputs)
+    unperturbed = FLiESANN_ensemble(uncertainty={"albedo": 0.0}, n_members=4, **inputs)
+
+    assert np.allclose(unperturbed["SWin_Wm2_mean"], deterministic["SWin_Wm2"], rtol=1e-5)
+    assert np.allclose(unperturbed["SWin_Wm2_std"], 0, atol=1e-3)
+
+    uncertainty = {"albedo": 0.02, "COT": np.full(n, 1.0)}
+    batched = FLiESANN_ensemble(uncertainty=uncertainty, n_members=40, seed=1, chunk_size=7 * n, **inputs)
+    single = FLiESANN_ensemble(uncertainty=uncertainty, n_members=40, seed=1, **inputs)
+
+    # streaming accumulation over batches of members matches one batch of all members
+    for key in ["SWin_Wm2_mean", "SWin_Wm2_std", "SWin_Wm2_p5", "SWin_Wm2_p50", "SWin_Wm2_p95"]:
+        assert np.allclose(batched[key], single[key], rtol=1e-4, atol=1e-3)
+
+    assert (batched["SWin_Wm2_std"] > 0).all()
+    assert (batched["SWin_Wm2_p5"] <= batched["SWin_Wm2_p50"]).all()
+    assert (batched["SWin_Wm2_p50"] <= batched["SWin_Wm2_p95"]).all()
@@ -0,0 +1,45 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from rasters import MultiPoint, WGS84
+
+from FLiESANN import FLiESANN, FLiESANN_point, FLiESANNPointResults, load_FLiESANN_model
+
+def test_FLiESANN_point():
+    ANN_model = load_FLiESANN_model()
+
+    # the second site crosses into the next solar day, the third is cloud-free in an arid climate
+    sites = [
+        (34.0, -118.0, datetime(2024, 7, 15, 20), 2.0, 3),
+        (-40.0, 170.0, datetime(2024, 12, 31, 20), 0.5, 5),
+        (25.0, 30.0, datetime(2024, 3, 1, 9, 30), 0.0, 1)
+    ]
+
+    for lat, lon, time_UTC, COT, KG_climate in sites:
+        inputs = {
+            "albedo": 0.15,
+            "COT": COT,
+            "AOT": 0.1,
+            "vapor_gccm": 1.0,
+            "ozone_cm": 0.3,
+            "elevation_m": 100.0,
+            "KG_climate": KG_climate
+        }
+
+        point = FLiESANN_point(lat, lon, time_UTC, ANN_model=ANN_model, **inputs)
+
+        expected = FLiESANN(
+            geometry=MultiPoint([(lon, lat)], crs=WGS84),
+            time_UTC=time_UTC,
+            ANN_model=ANN_model,
+            offline_mode=True,
+            **{key: np.array([value]) for key, value in inputs.items()}
+        )
+
+        assert isinstance(point, FLiESANNPointResults)
+
+        for variable in point._fields:
+            assert np.isclose(getattr(point, variable), np.asarray(expected[variable]).item(), rtol=1e-4, atol=1e-4), variable
+
+    aware = FLiESANN_point(34.0, -118.0, datetime(2024, 7, 15, 13, tzinfo=timezone(timedelta(hours=-7))), ANN_model=ANN_model, **inputs)
+    assert aware == FLiESANN_point(34.0, -118.0, datetime(2024, 7, 15, 20), ANN_model=ANN_model, **inputs)
@@ -0,0 +1,60 @@
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pytest
+import rasters as rt
+
+from FLiESANN import FLiESANN, FakeGEOS5FP, FakeNASADEM, load_FLiESANN_model
+from FLiESANN.retrieve_FLiESANN_GEOS5FP_inputs import MissingOfflineParameter
+
+def test_FLiESANN_profile():
+    geometry = rt.RasterGrid(x_origin=-120, y_origin=40, cell_width=0.01, cell_height=-0.01, rows=9, cols=11)
+
+    results = FLiESANN(
+        albedo=np.full(geometry.shape, 0.15, dtype=np.float32),
+        COT=0.5,
+        AOT=0.1,
+        vapor_gccm=1.0,
+        ozone_cm=0.3,
+        elevation_m=100.0,
+        KG_climate=3,
+        time_UTC=datetime(2024, 7, 15, 20),
+        geometry=geometry,
+        offline_mode=True,
+        ANN_model=load_FLiESANN_model(),
+        profile=True
+    )
+
+    profile = results["profile"]
+    stages = list(profile.stage)
+
+    for stage in ["solar_geometry", "static_retrieval", "type_determination", "feature_preparation", "inference", "post_processing", "raster_wrapping"]:
+        assert stage in stages
+
+    assert (profile.wall_seconds >= 0).all()
+    assert profile.set_index("stage").loc["inference", "size"] == geometry.rows * geometry.cols
+
+    # retrieval stages record the pixels they retrieve
+    results = FLiESANN(
+        albedo=np.full(geometry.shape, 0.15, dtype=np.float32),
+        elevation_m=100.0,
+        KG_climate=3,
+        time_UTC=datetime(2024, 7, 15, 20),
+        geometry=geometry,
+        GEOS5FP_connection=FakeGEOS5FP(),
+        NASADEM_connection=FakeNASADEM(),
+        ANN_model=load_FLiESANN_model(),
+        profile=True
+    )
+
+    sizes = results["profile"].set_index("stage")["size"]
+
+    for stage in ["static_retrieval", "GEOS5FP_COT", "GEOS5FP_AOT", "GEOS5FP_vapor_gccm", "GEOS5FP_ozone_cm"]:
+        assert sizes[stage] == geometry.rows * geometry.cols, stage
+
+    # memory tracing started by the profiler stops when a stage fails
+    with pytest.raises(MissingOfflineParameter):
+        FLiESANN(albedo=0.15, time_UTC=datetime(2024, 7, 15, 20), geometry=geometry, NASADEM_connection=FakeNASADEM(), offline_mode=True, profile=True)
+
+    assert not tracemalloc.is_tracing()
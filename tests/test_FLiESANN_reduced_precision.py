@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+import rasters as rt
+
+from FLiESANN import FLiESANN, FLiESANNReducedPrecision, FLiESANN_precision_accuracy_report, load_FLiESANN_model
+from FLiESANN.fold_FLiESANN_categories import fold_FLiESANN_categories, FLiESANN_category_codes
+
+def test_FLiESANN_precision_accuracy_report():
+    ANN_model = load_FLiESANN_model()
+    report = FLiESANN_precision_accuracy_report(ANN_model=ANN_model).set_index(["precision", "variable"])
+
+    assert report.loc["float16", "max_absolute_error"].max() < 0.01
+    assert report.loc["int8", "max_absolute_error"].max() < 0.1
+    assert report.loc["int8", "weight_bytes"].iloc[0] < report.loc["float16", "weight_bytes"].iloc[0]
+
+def test_FLiESANN_reduced_precision():
+    ANN_model = load_FLiESANN_model()
+    geometry = rt.RasterGrid(x_origin=-117, y_origin=35, cell_width=0.01, cell_height=-0.01, rows=10, cols=10)
+
+    inputs = {
+        "albedo": np.random.default_rng(0).uniform(0.05, 0.3, geometry.shape).astype(np.float32),
+        "COT": 0.5,
+        "AOT": 0.1,
+        "vapor_gccm": 1.0,
+        "ozone_cm": 0.3,
+        "elevation_m": 100.0,
+        "SZA_deg": 30.0,
+        "KG_climate": 3,
+        "day_of_year": 190.0,
+        "hour_of_day": 12.0,
+        "geometry": geometry,
+        "offline_mode": True,
+        "ANN_model": ANN_model
+    }
+
+    reference = FLiESANN(**inputs)
+    float16 = FLiESANN(precision="float16", **inputs)
+
+    assert np.allclose(float16["SWin_Wm2"], reference["SWin_Wm2"], rtol=0.01)
+
+    with pytest.raises(ValueError):
+        FLiESANNReducedPrecision(ANN_model, "int4")
+
+def test_fold_FLiESANN_categories():
+    rng = np.random.default_rng(0)
+    features = rng.uniform(0, 5, (100, 14)).astype(np.float32)
+    features[:, :7] = rng.random((100, 7)) < 0.3
+    weights = rng.normal(size=(14, 14)).astype(np.float32)
+    bias = rng.normal(size=14).astype(np.float32)
+
+    continuous_weights, category_biases = fold_FLiESANN_categories(weights, bias)
+    folded = features[:, 7:] @ continuous_weights + category_biases[FLiESANN_category_codes(features)]
+
+    assert np.allclose(folded, features @ weights + bias, atol=1e-5)
+
+    ANN_model = load_FLiESANN_model()
+    features[:, :7] = 0
+    features[:, [1, 3]] = 1
+    expected = ANN_model.predict(features[:, None, :], verbose=0).squeeze(axis=1)
+
+    assert np.allclose(FLiESANNReducedPrecision(ANN_model, "float32").predict(features), expected, atol=1e-5)
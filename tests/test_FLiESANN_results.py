@@ -0,0 +1,41 @@
+from datetime import datetime
+
+import numpy as np
+import rasters as rt
+
+from FLiESANN import FLiESANN, FLiESANNResults, load_FLiESANN_model
+
+def test_FLiESANN_writes_into_out_container():
+    geometry = rt.RasterGrid(x_origin=-120, y_origin=40, cell_width=0.01, cell_height=-0.01, rows=9, cols=11)
+    rng = np.random.default_rng(0)
+
+    inputs = {
+        "albedo": rng.uniform(0.05, 0.3, geometry.shape).astype(np.float32),
+        "COT": 0.5,
+        "AOT": 0.1,
+        "vapor_gccm": 1.0,
+        "ozone_cm": 0.3,
+        "elevation_m": 100.0,
+        "KG_climate": 3,
+        "time_UTC": datetime(2024, 7, 15, 20),
+        "geometry": geometry,
+        "offline_mode": True,
+        "ANN_model": load_FLiESANN_model()
+    }
+
+    expected = FLiESANN(**inputs)
+    out = FLiESANNResults.allocate(geometry)
+    block = out.data
+
+    for _ in range(2):
+        results = FLiESANN(out=out, **inputs)
+
+        assert results is out
+        assert results.data is block
+
+    assert results.data.shape == (len(results.variables),) + geometry.shape
+    assert results.geometry == geometry
+
+    for variable in results:
+        assert np.shares_memory(results[variable], block)
+        assert np.allclose(results[variable], expected[variable].array, equal_nan=True)
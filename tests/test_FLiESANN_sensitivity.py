@@ -0,0 +1,35 @@
+import numpy as np
+
+from FLiESANN import FLiESANN, FLiESANN_sensitivity, load_FLiESANN_model
+
+def test_FLiESANN_sensitivity_matches_finite_differences():
+    rng = np.random.default_rng(1)
+    n = 100
+
+    inputs = {
+        "albedo": rng.uniform(0.05, 0.3, n).astype(np.float32),
+        "COT": rng.uniform(0.5, 15, n).astype(np.float32),
+        "AOT": rng.uniform(0.05, 0.5, n).astype(np.float32),
+        "vapor_gccm": rng.uniform(0.5, 4, n).astype(np.float32),
+        "ozone_cm": rng.uniform(0.25, 0.4, n).astype(np.float32),
+        "elevation_m": rng.uniform(0, 2000, n).astype(np.float32),
+        "SZA_deg": rng.uniform(10, 70, n).astype(np.float32),
+        "KG_climate": np.full(n, 3),
+        "day_of_year": np.full(n, 190.0),
+        "hour_of_day": np.full(n, 12.0),
+        "offline_mode": True,
+        "ANN_model": load_FLiESANN_model()
+    }
+
+    sensitivity = FLiESANN_sensitivity(**inputs)
+    # small steps, since the ReLU network is only piecewise smooth
+    steps = {"COT": 0.002, "AOT": 0.001, "albedo": 0.001, "elevation_m": 2, "SZA_deg": 0.05}
+
+    for input_name, step in steps.items():
+        upper = FLiESANN(**{**inputs, input_name: inputs[input_name] + step})
+        lower = FLiESANN(**{**inputs, input_name: inputs[input_name] - step})
+
+        for output in ["SWin_Wm2", "PAR_diffuse_Wm2", "SWout_Wm2"]:
+            finite_difference = (np.asarray(upper[output]) - np.asarray(lower[output])) / (2 * step)
+            error = np.median(np.abs(sensitivity[output][input_name] - finite_difference)) / np.median(np.abs(finite_difference))
+            assert error < 0.02, f"d{output}/d{input_name} relative error {error:.3f}"
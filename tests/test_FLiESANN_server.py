@@ -0,0 +1,102 @@
+import asyncio
+import json
+import os
+import time
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from FLiESANN import FLiESANN_point, FLiESANNServer, load_FLiESANN_model
+
+async def _post(host: str, port: int, path: str, payload=None) -> tuple:
+    reader, writer = await asyncio.open_connection(host, port)
+    body = b"" if payload is None else json.dumps(payload).encode()
+    method = "GET" if payload is None else "POST"
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, content = response.partition(b"\r\n\r\n")
+
+    return int(head.split()[1]), json.loads(content)
+
+def test_FLiESANN_server():
+    ANN_model = load_FLiESANN_model()
+    time_UTC = datetime(2024, 7, 15, 20)
+
+    requests = [
+        {
+            "lat": 34.0 + index / 10,
+            "lon": -118.0,
+            "time_UTC": time_UTC.isoformat(),
+            "albedo": 0.15,
+            "COT": [0.0, 2.0][index % 2],
+            "AOT": 0.1,
+            "vapor_gccm": 1.0,
+            "ozone_cm": 0.3,
+            "elevation_m": 100.0,
+            "KG_climate": [1, 3][index % 2]
+        }
+        for index in range(32)
+    ]
+
+    async def run():
+        server = FLiESANNServer(max_batch_size=16, max_latency_seconds=0.05, ANN_model=ANN_model)
+        await server.start(port=0)
+        host, port = server.address[:2]
+
+        try:
+            responses = await asyncio.gather(*[_post(host, port, "/FLiESANN", request) for request in requests])
+            invalid = await _post(host, port, "/FLiESANN", {"lat": 0.0})
+            metrics = await _post(host, port, "/metrics")
+        finally:
+            await server.stop()
+
+        return responses, invalid, metrics
+
+    responses, invalid, metrics = asyncio.run(run())
+
+    for request, (status, outputs) in zip(requests, responses):
+        assert status == 200
+        expected = FLiESANN_point(**{**request, "time_UTC": time_UTC}, ANN_model=ANN_model)
+
+        for variable in expected._fields:
+            assert np.isclose(outputs[variable], getattr(expected, variable), rtol=1e-4, atol=1e-4), variable
+
+    assert invalid[0] == 400
+
+    status, metrics = metrics
+    assert status == 200
+    assert metrics["requests"] == len(requests) + 1
+    # concurrent requests are coalesced instead of evaluated one by one
+    assert metrics["batches"] < len(requests)
+    assert metrics["latency_p95_ms"] > 0
+
+def test_FLiESANN_server_stop(tmp_path):
+    server = FLiESANNServer(ANN_model=load_FLiESANN_model())
+    evaluate_batch = server._evaluate_batch
+
+    def slow_evaluate_batch(batch: list) -> list:
+        time.sleep(0.5)
+        return evaluate_batch(batch)
+
+    server._evaluate_batch = slow_evaluate_batch
+    unix_socket = str(tmp_path / "FLiESANN.sock")
+
+    async def run():
+        await server.start(unix_socket=unix_socket)
+        assert os.path.exists(unix_socket)
+
+        request = asyncio.ensure_future(server.evaluate(lat=34.0, lon=-118.0, time_UTC=datetime(2024, 7, 15, 20), albedo=0.15, COT=0.0, AOT=0.1, vapor_gccm=1.0, ozone_cm=0.3, elevation_m=100.0, KG_climate=1))
+        # let the batcher take the request off the queue and start evaluating it
+        await asyncio.sleep(0.2)
+        await server.stop()
+
+        # the request of the batch in flight fails instead of waiting forever
+        with pytest.raises(RuntimeError):
+            await asyncio.wait_for(request, 1)
+
+    asyncio.run(run())
+
+    assert not os.path.exists(unix_socket)
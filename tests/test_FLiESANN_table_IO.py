@@ -0,0 +1,13 @@
+import numpy as np
+import pandas as pd
+from FLiESANN import load_ECOv002_calval_FLiESANN_inputs, read_FLiESANN_table, write_FLiESANN_table
+
+def test_parquet_round_trip(tmp_path):
+    inputs_df = load_ECOv002_calval_FLiESANN_inputs()
+    filename = write_FLiESANN_table(inputs_df, str(tmp_path / "inputs.parquet"))
+    round_trip_df = read_FLiESANN_table(filename)
+
+    assert round_trip_df.albedo.dtype == np.float32
+    assert round_trip_df.KG_climate.dtype == np.uint8
+    assert str(round_trip_df.time_UTC.dt.tz) == "UTC"
+    pd.testing.assert_frame_equal(inputs_df, round_trip_df)
@@ -0,0 +1,119 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+import rasters as rt
+
+from FLiESANN import FLiESANN, FLiESANN_tiled, FLiESANNResults, GeoTIFFSink, ZarrSink, load_FLiESANN_model
+from FLiESANN.constants import FLIESANN_OUTPUT_VARIABLES, FLIESANN_NDVI_OUTPUT_VARIABLES
+from FLiESANN.process_FLiESANN_tiled import calculate_tile_windows
+
+def test_FLiESANN_tiled_matches_monolithic():
+    geometry = rt.RasterGrid(x_origin=-120, y_origin=40, cell_width=0.01, cell_height=-0.01, rows=37, cols=53)
+    rng = np.random.default_rng(0)
+    ANN_model = load_FLiESANN_model()
+
+    inputs = {
+        "albedo": rt.Raster(rng.uniform(0.05, 0.3, geometry.shape).astype(np.float32), geometry=geometry),
+        "COT": rng.uniform(0, 5, geometry.shape).astype(np.float32),
+        "AOT": 0.1,
+        "vapor_gccm": 1.0,
+        "ozone_cm": 0.3,
+        "elevation_m": 100.0,
+        "KG_climate": 3,
+        "time_UTC": datetime(2024, 7, 15, 20),
+        "geometry": geometry,
+        "offline_mode": True,
+        "ANN_model": ANN_model
+    }
+
+    monolithic = FLiESANN(**inputs)
+    tiled = FLiESANN_tiled(tile_size=16, n_workers=2, **inputs)
+
+    assert set(tiled) == set(monolithic)
+
+    for key, value in monolithic.items():
+        assert tiled[key].geometry == geometry
+        assert np.allclose(tiled[key].array, np.asarray(value), equal_nan=True, atol=1e-4), key
+
+    # bands of outputs that are not produced, here the NDVI outputs, are left untouched
+    out = FLiESANNResults.allocate(geometry, variables=FLIESANN_OUTPUT_VARIABLES + FLIESANN_NDVI_OUTPUT_VARIABLES)
+    assert FLiESANN_tiled(tile_size=16, out=out, **inputs) is out
+    assert np.allclose(out["SWin_Wm2"], np.asarray(monolithic["SWin_Wm2"]), equal_nan=True, atol=1e-4)
+    assert np.isnan(out["PAR_albedo"]).all()
+
+    # worker processes load the model from its file, so a loaded model cannot be used with them
+    with pytest.raises(ValueError):
+        FLiESANN_tiled(tile_size=16, n_workers=2, use_processes=True, **inputs)
+
+def test_FLiESANN_tiled_streams_to_GeoTIFF(tmp_path):
+    import rasterio
+
+    geometry = rt.RasterGrid(x_origin=-120, y_origin=40, cell_width=0.01, cell_height=-0.01, rows=37, cols=53)
+    rng = np.random.default_rng(0)
+
+    inputs = {
+        "albedo": rng.uniform(0.05, 0.3, geometry.shape).astype(np.float32),
+        "COT": 0.5,
+        "AOT": 0.1,
+        "vapor_gccm": 1.0,
+        "ozone_cm": 0.3,
+        "elevation_m": 100.0,
+        "KG_climate": 3,
+        "time_UTC": datetime(2024, 7, 15, 20),
+        "geometry": geometry,
+        "offline_mode": True,
+        "ANN_model": load_FLiESANN_model()
+    }
+
+    expected = FLiESANN_tiled(tile_size=16, **inputs)
+    filename = str(tmp_path / "FLiESANN.tif")
+    variables = ["SWin_Wm2", "PAR_diffuse_Wm2"]
+
+    with GeoTIFFSink(filename, geometry, variables=variables, block_size=16) as sink:
+        assert FLiESANN_tiled(tile_size=16, n_workers=2, sink=sink, **inputs) is None
+
+    with rasterio.open(filename) as dataset:
+        assert dataset.descriptions == tuple(variables)
+        assert dataset.transform == geometry.affine
+
+        for band, variable in enumerate(variables, start=1):
+            assert np.allclose(dataset.read(band), expected[variable].array, equal_nan=True)
+
+def test_FLiESANN_tiled_streams_to_Zarr(tmp_path):
+    zarr = pytest.importorskip("zarr")
+
+    geometry = rt.RasterGrid(x_origin=-120, y_origin=40, cell_width=0.01, cell_height=-0.01, rows=37, cols=53)
+    rng = np.random.default_rng(0)
+
+    inputs = {
+        "albedo": rng.uniform(0.05, 0.3, geometry.shape).astype(np.float32),
+        "COT": 0.5,
+        "AOT": 0.1,
+        "vapor_gccm": 1.0,
+        "ozone_cm": 0.3,
+        "elevation_m": 100.0,
+        "KG_climate": 3,
+        "time_UTC": datetime(2024, 7, 15, 20),
+        "geometry": geometry,
+        "offline_mode": True,
+        "ANN_model": load_FLiESANN_model()
+    }
+
+    expected = FLiESANN_tiled(tile_size=16, **inputs)
+    store = str(tmp_path / "FLiESANN.zarr")
+    variables = ["SWin_Wm2", "NIR_direct_Wm2"]
+
+    # tiles are aligned to the 8 x 8 chunks, so no chunk is written twice
+    windows = calculate_tile_windows(geometry.shape, 20, block_shape=(8, 8))
+    assert all(rows.start % 8 == 0 and cols.start % 8 == 0 for rows, cols in windows)
+    assert all(rows.stop - rows.start == 16 or rows.stop == geometry.rows for rows, _ in windows)
+
+    with ZarrSink(store, geometry, variables=variables, chunk_size=8) as sink:
+        assert FLiESANN_tiled(tile_size=20, n_workers=2, sink=sink, **inputs) is None
+
+    group = zarr.open_group(store, mode="r")
+    assert group.attrs["transform"] == list(geometry.affine)[:6]
+
+    for variable in variables:
+        assert np.allclose(group[variable][:], expected[variable].array, equal_nan=True)
@@ -0,0 +1,34 @@
+from datetime import datetime
+
+import numpy as np
+import rasters as rt
+
+from FLiESANN import FLiESANN, FLiESANN_time_stack, load_FLiESANN_model
+
+def test_FLiESANN_time_stack_matches_per_time_calls():
+    geometry = rt.RasterGrid(x_origin=-120, y_origin=40, cell_width=0.05, cell_height=-0.05, rows=11, cols=13)
+    rng = np.random.default_rng(0)
+    ANN_model = load_FLiESANN_model()
+    times_UTC = [datetime(2024, 7, 15, hour) for hour in (14, 18, 22)]
+    albedo = rt.Raster(rng.uniform(0.05, 0.3, geometry.shape).astype(np.float32), geometry=geometry)
+    COT = rng.uniform(0, 5, (len(times_UTC),) + geometry.shape).astype(np.float32)
+
+    inputs = {
+        "AOT": 0.1,
+        "vapor_gccm": 1.0,
+        "ozone_cm": 0.3,
+        "elevation_m": 100.0,
+        "KG_climate": 3,
+        "NDVI": 0.6,
+        "offline_mode": True,
+        "ANN_model": ANN_model
+    }
+
+    stack = FLiESANN_time_stack(albedo=albedo, geometry=geometry, time_UTC=times_UTC, COT=COT, **inputs)
+
+    for time_index, time_UTC in enumerate(times_UTC):
+        results = FLiESANN(albedo=albedo, geometry=geometry, time_UTC=time_UTC, COT=COT[time_index], **inputs)
+
+        for key in ["SWin_Wm2", "PAR_Wm2", "PAR_diffuse_Wm2", "NIR_direct_Wm2", "PAR_albedo", "atmospheric_transmittance"]:
+            assert stack[key].shape == (len(times_UTC),) + geometry.shape
+            assert np.allclose(stack[key][time_index], np.asarray(results[key]), equal_nan=True, atol=1e-3), key
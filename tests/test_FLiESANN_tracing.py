@@ -0,0 +1,52 @@
+from datetime import datetime
+
+import numpy as np
+import rasters as rt
+
+from FLiESANN import FLiESANN, FLiESANNHook, FLiESANN_hooks, load_FLiESANN_model
+from FLiESANN.FLiESANN_tracing import trace_span
+
+class RecordingHook(FLiESANNHook):
+    def __init__(self):
+        self.started = []
+        self.ended = []
+
+    def on_span_start(self, name, attributes):
+        self.started.append(name)
+
+    def on_span_end(self, name, attributes, duration_seconds, error=None):
+        self.ended.append((name, dict(attributes)))
+
+def test_FLiESANN_tracing_hooks():
+    geometry = rt.RasterGrid(x_origin=-117, y_origin=35, cell_width=0.01, cell_height=-0.01, rows=7, cols=5)
+    hook = RecordingHook()
+
+    with FLiESANN_hooks(hook):
+        FLiESANN(
+            albedo=np.full(geometry.shape, 0.15, dtype=np.float32),
+            COT=0.5,
+            AOT=0.1,
+            vapor_gccm=1.0,
+            ozone_cm=0.3,
+            elevation_m=100.0,
+            KG_climate=3,
+            time_UTC=datetime(2024, 7, 15, 20),
+            geometry=geometry,
+            offline_mode=True,
+            ANN_model=load_FLiESANN_model()
+        )
+
+    names = [name for name, attributes in hook.ended]
+
+    for name in ["FLiESANN", "retrieve_FLiESANN_inputs", "retrieve_FLiESANN_static_inputs", "retrieve_FLiESANN_GEOS5FP_inputs", "run_FLiESANN_inference", "solar_geometry_grids"]:
+        assert name in names
+
+    assert sorted(hook.started) == sorted(names)
+
+    attributes = dict(hook.ended)["FLiESANN"]
+    assert attributes["geometry_type"] == "RasterGrid"
+    assert attributes["rows"] == geometry.rows * geometry.cols
+    assert "cache_hit" in dict(hook.ended)["solar_geometry_grids"]
+
+    # hooks are removed when the block exits, leaving the shared no-op span
+    assert not trace_span("FLiESANN")
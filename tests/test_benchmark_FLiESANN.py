@@ -0,0 +1,13 @@
+from FLiESANN import benchmark_FLiESANN, compare_FLiESANN_benchmark, load_FLiESANN_model
+
+def test_benchmark_FLiESANN():
+    results = benchmark_FLiESANN(sizes=[100], repeats=1, include_import=False, include_table=False, ANN_model=load_FLiESANN_model())
+
+    for benchmark in ["model_load", "feature_preparation", "inference_keras_predict", "post_processing", "raster_wrapping", "FLiESANN"]:
+        assert benchmark in set(results.benchmark)
+
+    assert (results.seconds > 0).all()
+    assert not compare_FLiESANN_benchmark(results, results).regressed.any()
+
+    baseline = results.assign(seconds=results.seconds / 10)
+    assert compare_FLiESANN_benchmark(results, baseline, min_seconds=0).regressed.all()
@@ -0,0 +1,44 @@
+import numpy as np
+import rasters as rt
+from datetime import datetime
+
+from FLiESANN import FLiESANN, load_FLiESANN_model
+from FLiESANN.deduplicate_FLiESANN_features import deduplicate_FLiESANN_features
+
+def test_deduplicate_FLiESANN_features():
+    features = np.array([[1, 2], [3, 4], [1, 2], [1.0004, 2]], dtype=np.float32)
+
+    unique, inverse = deduplicate_FLiESANN_features(features)
+    assert len(unique) == 3
+    assert np.array_equal(unique[inverse], features)
+
+    unique, inverse = deduplicate_FLiESANN_features(features, tolerance=0.01)
+    assert len(unique) == 2
+    assert np.allclose(unique[inverse], features, atol=0.01)
+
+def test_FLiESANN_deduplicate_features():
+    geometry = rt.RasterGrid(x_origin=-117, y_origin=35, cell_width=0.01, cell_height=-0.01, rows=20, cols=20)
+    albedo = np.full(geometry.shape, 0.15, dtype=np.float32)
+    albedo[:, 10:] = 0.2
+
+    inputs = {
+        "albedo": albedo,
+        "COT": 0.5,
+        "AOT": 0.1,
+        "vapor_gccm": 1.0,
+        "ozone_cm": 0.3,
+        "elevation_m": 100.0,
+        "SZA_deg": 30.0,
+        "KG_climate": 3,
+        "day_of_year": 190.0,
+        "hour_of_day": 12.0,
+        "geometry": geometry,
+        "offline_mode": True,
+        "ANN_model": load_FLiESANN_model()
+    }
+
+    expected = FLiESANN(**inputs)
+    deduplicated = FLiESANN(deduplicate_features=True, **inputs)
+
+    for variable in ["SWin_Wm2", "PAR_diffuse_Wm2", "NIR_direct_Wm2"]:
+        assert np.allclose(deduplicated[variable], expected[variable], rtol=1e-5)
@@ -0,0 +1,71 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+import rasters as rt
+
+from FLiESANN import FLiESANN, FakeGEOS5FP, FakeNASADEM, load_ECOv002_calval_FLiESANN_inputs, load_FLiESANN_model, process_FLiESANN_table
+
+def test_process_FLiESANN_table_with_fake_connections():
+    input_df = load_ECOv002_calval_FLiESANN_inputs().iloc[:40].drop(columns=["COT", "AOT", "vapor_gccm", "ozone_cm", "elevation_m"])
+    GEOS5FP_connection = FakeGEOS5FP()
+    NASADEM_connection = FakeNASADEM(fields={"elevation_km": 0.5})
+
+    output_df = process_FLiESANN_table(
+        input_df,
+        GEOS5FP_connection=GEOS5FP_connection,
+        NASADEM_connection=NASADEM_connection,
+        ANN_model=load_FLiESANN_model()
+    )
+
+    assert GEOS5FP_connection.calls == {"COT": 1, "AOT": 1, "vapor_gccm": 1, "ozone_cm": 1}
+    assert NASADEM_connection.calls == {"elevation_km": 1}
+    assert np.allclose(output_df.elevation_m, 500)
+
+    # each row receives the value at its own location and time out of the multi-time DataFrame
+    times = pd.to_datetime(input_df.time_UTC)
+    lat = np.array([point.y for point in output_df.geometry])
+    lon = np.array([point.x for point in output_df.geometry])
+    expected_AOT = [GEOS5FP_connection.field("AOT", lat[i:i + 1], lon[i:i + 1], times.iloc[i].to_pydatetime())[0] for i in range(len(input_df))]
+
+    assert np.allclose(output_df.AOT.astype(float), expected_AOT)
+    assert np.isfinite(output_df.SWin_Wm2.astype(float)).all()
+
+def test_FLiESANN_raster_with_fake_connections():
+    geometry = rt.RasterGrid(x_origin=-117, y_origin=35, cell_width=0.01, cell_height=-0.01, rows=6, cols=8)
+    GEOS5FP_connection = FakeGEOS5FP(latency_seconds=0.01)
+
+    results = FLiESANN(
+        albedo=np.full(geometry.shape, 0.15, dtype=np.float32),
+        geometry=geometry,
+        time_UTC=datetime(2024, 7, 15, 20),
+        GEOS5FP_connection=GEOS5FP_connection,
+        NASADEM_connection=FakeNASADEM(),
+        ANN_model=load_FLiESANN_model()
+    )
+
+    assert results["SWin_Wm2"].shape == geometry.shape
+    assert sum(GEOS5FP_connection.calls.values()) == 4
+    assert GEOS5FP_connection.bytes_served == 4 * geometry.rows * geometry.cols * 4
+
+def test_fake_connection_rejects_unknown_fields():
+    with pytest.raises(ValueError):
+        FakeGEOS5FP().field("unknown", np.zeros(1), np.zeros(1))
+
+def test_process_FLiESANN_table_retrieves_once_per_location_and_time():
+    input_df = load_ECOv002_calval_FLiESANN_inputs().iloc[:20].drop(columns=["COT", "AOT", "vapor_gccm", "ozone_cm", "elevation_m"])
+    input_df = pd.concat([input_df, input_df.assign(albedo=input_df.albedo * 0.5)], ignore_index=True)
+    ANN_model = load_FLiESANN_model()
+
+    unique_connection = FakeGEOS5FP()
+    process_FLiESANN_table(input_df.iloc[:20], GEOS5FP_connection=unique_connection, NASADEM_connection=FakeNASADEM(), ANN_model=ANN_model)
+
+    # rows at the same location and time with a different albedo share one retrieval
+    GEOS5FP_connection = FakeGEOS5FP()
+    deduplicated_df = process_FLiESANN_table(input_df, GEOS5FP_connection=GEOS5FP_connection, NASADEM_connection=FakeNASADEM(), ANN_model=ANN_model)
+    assert GEOS5FP_connection.bytes_served == unique_connection.bytes_served
+
+    full_df = process_FLiESANN_table(input_df, GEOS5FP_connection=FakeGEOS5FP(), NASADEM_connection=FakeNASADEM(), ANN_model=ANN_model, deduplicate=False)
+    pd.testing.assert_frame_equal(full_df, deduplicated_df)
+    assert not np.allclose(deduplicated_df.SWin_Wm2[:20].astype(float), deduplicated_df.SWin_Wm2[20:].astype(float))
@@ -9,6 +9,7 @@ dependencies = [
     "netCDF4",
     "numpy",
     "pandas",
+    "pyarrow",
     "rasters",
     "sentinel_tiles",
     "solar_apparent_time",
@@ -0,0 +1,30 @@
+import gc
+from weakref import ref
+
+import numpy as np
+
+from FLiESANN import load_FLiESANN_model, predict_FLiESANN_model
+from FLiESANN.predict_FLiESANN_model import _traced_call, _traced_calls
+
+def test_predict_FLiESANN_model():
+    ANN_model = load_FLiESANN_model()
+    inputs_array = np.random.default_rng(0).uniform(0, 1, (1000, 1, 14)).astype(np.float32)
+
+    expected = ANN_model.predict(inputs_array, verbose=0)
+
+    for n_rows in [1, 7, 1000]:
+        outputs = predict_FLiESANN_model(ANN_model, inputs_array[:n_rows], batch_size=256)
+        assert np.allclose(outputs, expected[:n_rows], atol=1e-5)
+
+    # batches of every size share a single trace
+    assert _traced_call(ANN_model).experimental_get_tracing_count() == 1
+
+    # the traced call does not keep the model alive
+    model_reference = ref(ANN_model)
+    gc.collect()
+    n_traced_calls = len(_traced_calls)
+    del ANN_model
+    gc.collect()
+
+    assert model_reference() is None
+    assert len(_traced_calls) == n_traced_calls - 1
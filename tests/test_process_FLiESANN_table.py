@@ -0,0 +1,56 @@
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from FLiESANN import load_ECOv002_calval_FLiESANN_inputs, load_FLiESANN_model, process_FLiESANN_table
+from FLiESANN.process_table_with_checkpoints import hash_file
+
+def test_process_FLiESANN_table_workers_match_serial():
+    inputs_df = load_ECOv002_calval_FLiESANN_inputs().head(50)
+    serial_df = process_FLiESANN_table(inputs_df, offline_mode=True)
+    parallel_df = process_FLiESANN_table(inputs_df, offline_mode=True, n_workers=2)
+    pd.testing.assert_frame_equal(serial_df, parallel_df)
+
+    # workers load the model from its file, so a loaded model cannot be used with them
+    with pytest.raises(ValueError):
+        process_FLiESANN_table(inputs_df, offline_mode=True, n_workers=2, ANN_model=load_FLiESANN_model())
+
+def test_process_FLiESANN_table_deduplication_matches_full_table():
+    inputs_df = load_ECOv002_calval_FLiESANN_inputs().head(20)
+    inputs_df = pd.concat([inputs_df, inputs_df.assign(ID="duplicate")], ignore_index=True)
+    full_df = process_FLiESANN_table(inputs_df, offline_mode=True, deduplicate=False)
+    deduplicated_df = process_FLiESANN_table(inputs_df, offline_mode=True)
+    pd.testing.assert_frame_equal(full_df, deduplicated_df)
+
+def test_process_FLiESANN_table_resumes_from_checkpoints(tmp_path, caplog):
+    inputs_df = load_ECOv002_calval_FLiESANN_inputs().head(30)
+    expected_df = process_FLiESANN_table(inputs_df, offline_mode=True)
+    first_df = process_FLiESANN_table(inputs_df, offline_mode=True, checkpoint_directory=str(tmp_path), checkpoint_chunk_size=10)
+    assert len(list(tmp_path.glob("*.pkl"))) == 3
+
+    with caplog.at_level(logging.INFO):
+        resumed_df = process_FLiESANN_table(inputs_df, offline_mode=True, checkpoint_directory=str(tmp_path), checkpoint_chunk_size=10)
+
+    assert "restored 3 of 3 chunks" in caplog.text
+    pd.testing.assert_frame_equal(expected_df, first_df)
+    pd.testing.assert_frame_equal(expected_df, resumed_df)
+
+    # a model with different weights does not reuse the checkpoints of the packaged model
+    ANN_model = load_FLiESANN_model()
+    ANN_model.layers[-1].bias.assign(ANN_model.layers[-1].bias + 0.1)
+    modified_df = process_FLiESANN_table(inputs_df, offline_mode=True, checkpoint_directory=str(tmp_path), checkpoint_chunk_size=10, ANN_model=ANN_model)
+    assert len(list(tmp_path.glob("*.pkl"))) == 6
+    assert not np.allclose(modified_df.SWin_Wm2, expected_df.SWin_Wm2)
+
+def test_hash_file_sees_rewritten_files(tmp_path):
+    filename = tmp_path / "model.bin"
+    filename.write_bytes(b"first")
+    first_hash = hash_file(str(filename))
+
+    # rewritten in place with the same size
+    filename.write_bytes(b"other")
+    os.utime(filename, ns=(0, os.stat(filename).st_mtime_ns + 1))
+
+    assert hash_file(str(filename)) != first_hash
@@ -0,0 +1,34 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import rasters as rt
+from solar_apparent_time import calculate_solar_day_of_year, calculate_solar_hour_of_day
+from sun_angles import calculate_SZA_from_DOY_and_hour
+
+from FLiESANN.calculate_solar_geometry import calculate_solar_geometry, load_solar_geometry_grids
+
+def test_calculate_solar_geometry_matches_reference():
+    # a global grid, where the local solar day differs across the raster
+    geometry = rt.RasterGrid(x_origin=-180, y_origin=80, cell_width=2, cell_height=-2, rows=80, cols=180)
+
+    for time_UTC in [datetime(2024, 1, 1, 2, 30), datetime(2024, 7, 15, 18, 0), datetime(2023, 12, 31, 22, 15)]:
+        day_of_year = calculate_solar_day_of_year(time_UTC=time_UTC, geometry=geometry)
+        hour_of_day = calculate_solar_hour_of_day(time_UTC=time_UTC, geometry=geometry)
+        SZA_deg = calculate_SZA_from_DOY_and_hour(lat=geometry.lat, lon=geometry.lon, DOY=day_of_year, hour=hour_of_day)
+
+        solar_geometry = calculate_solar_geometry(time_UTC=time_UTC, geometry=geometry)
+
+        assert np.array_equal(solar_geometry["day_of_year"], day_of_year)
+        assert np.allclose(solar_geometry["hour_of_day"], hour_of_day, atol=1e-4)
+        assert np.allclose(solar_geometry["SZA_deg"], SZA_deg, atol=1e-2)
+
+def test_solar_geometry_grids_from_threads():
+    # more geometries than cached entries, so threads keep evicting each other's grids
+    geometries = [rt.RasterGrid(x_origin=-117 + index, y_origin=35, cell_width=0.1, cell_height=-0.1, rows=4, cols=4) for index in range(32)]
+
+    with ThreadPoolExecutor(16) as executor:
+        grids = list(executor.map(load_solar_geometry_grids, geometries * 20))
+
+    for geometry, geometry_grids in zip(geometries * 20, grids):
+        assert np.allclose(geometry_grids["lon_offset_hours"], geometry.lon / 15)